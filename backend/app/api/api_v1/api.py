@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.api_v1.endpoints import login, users, purchase_orders, workflows, confirmations, outbounds, inventory, reports, notifications, test_import
+from app.api.api_v1.endpoints import login, users, purchase_orders, workflows, confirmations, outbounds, inventory, reports, notifications, test_import, imports
 # 暂时注释掉PDA模块，等数据库迁移完成后再启用
 # from app.api.api_v1.endpoints import pda
 
@@ -14,6 +14,7 @@ api_router.include_router(outbounds.router, prefix="/outbound", tags=["outbounds
 api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
+api_router.include_router(imports.router, prefix="/imports", tags=["imports"])
 api_router.include_router(test_import.router, prefix="/test", tags=["test"])
 # 暂时注释掉PDA路由，等数据库迁移完成后再启用
 # api_router.include_router(pda.router, prefix="/pda", tags=["pda"])
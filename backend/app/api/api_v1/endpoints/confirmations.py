@@ -1,6 +1,6 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, date
 
 from app.api.deps import get_db, get_current_user
@@ -12,6 +12,7 @@ from app.schemas.confirmation import (
     ConfirmationGenerate,
     ConfirmationPrintResponse
 )
+from app.utils.search import apply_search_filters
 
 router = APIRouter()
 
@@ -144,10 +145,10 @@ def list_confirmations(
     )
 
     # 应用过滤条件
-    if order_no:
-        query = query.filter(PurchaseOrder.order_no.ilike(f"%{order_no}%"))
-    if confirmation_no:
-        query = query.filter(DeliveryConfirmation.confirmation_no.ilike(f"%{confirmation_no}%"))
+    query = apply_search_filters(query, [
+        (PurchaseOrder.order_no, order_no),
+        (DeliveryConfirmation.confirmation_no, confirmation_no),
+    ])
 
     # 处理状态参数
     if status:
@@ -187,7 +188,12 @@ def list_confirmations(
     # 计算总数
     total = query.count()
 
-    # 分页
+    # 分页，采购订单、保管员和质检员随确认单一次联合查询取回
+    query = query.options(
+        joinedload(DeliveryConfirmation.order),
+        joinedload(DeliveryConfirmation.keeper),
+        joinedload(DeliveryConfirmation.inspector),
+    )
     query = query.order_by(DeliveryConfirmation.create_time.desc())
     query = query.offset((page - 1) * size).limit(size)
 
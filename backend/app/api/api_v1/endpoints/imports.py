@@ -0,0 +1,212 @@
+from typing import Any
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import logging
+
+from app.api.deps import get_current_user, get_current_user_detached
+from app.core.executor import run_blocking
+from app.models.user import User
+from app.schemas.import_job import ImportJobCreateResponse, ImportJobResponse, ImportPreviewResponse
+from app.services.dashboard_cache import publish_dashboard_refresh
+from app.services.import_jobs import (
+    ImportJobStatus,
+    ImportType,
+    create_import_job,
+    get_import_job,
+    submit_import_job,
+)
+from app.services.import_preview import commit_preview, discard_preview, preview_import
+from app.services.outbound_import import ImportMode
+from app.utils.excel import check_import_filename
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _start_job(import_type: ImportType, file: UploadFile, current_user: User, options: dict, force: bool) -> Any:
+    """
+    保存上传文件、创建并提交导入任务；同一文件已导入过时任务直接完成，不再提交
+    """
+    check_import_filename(file.filename)
+    try:
+        job_id, job_status = create_import_job(
+            import_type, file.file, file.filename, current_user.id, options, force=force
+        )
+        if job_status == ImportJobStatus.PENDING.value:
+            submit_import_job(job_id)
+    except Exception as e:
+        logger.error(f"Failed to start {import_type.value} import job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"创建导入任务失败: {str(e)}"
+        )
+
+    logger.info(f"Started {import_type.value} import job {job_id} for file {file.filename}")
+    return {
+        "success": True,
+        "data": {
+            "jobId": job_id,
+            "status": job_status
+        }
+    }
+
+
+@router.post("/outbound", response_model=ImportJobCreateResponse)
+def create_outbound_import_job(
+    current_user: User = Depends(get_current_user),
+    file: UploadFile = File(...),
+    purchase_order_no: str = Form("", description="采购订单号"),
+    force: bool = Form(False, description="重新导入已导入过的同一文件"),
+    mode: ImportMode = Form(ImportMode.INSERT, description="导入模式：insert 只新增，upsert/replace 覆盖未处理的已存在单据"),
+) -> Any:
+    """
+    异步导入出库Excel或CSV文件，立即返回任务ID
+    """
+    options = {"purchaseOrderNo": purchase_order_no, "importMode": mode.value}
+    return _start_job(ImportType.OUTBOUND, file, current_user, options, force)
+
+
+@router.post("/purchase", response_model=ImportJobCreateResponse)
+def create_purchase_import_job(
+    current_user: User = Depends(get_current_user),
+    file: UploadFile = File(...),
+    force: bool = Form(False, description="重新导入已导入过的同一文件"),
+    mode: ImportMode = Form(ImportMode.INSERT, description="导入模式：insert 只新增，upsert/replace 覆盖未处理的已存在单据"),
+) -> Any:
+    """
+    异步导入采购订单Excel或CSV文件，立即返回任务ID
+    """
+    return _start_job(ImportType.PURCHASE, file, current_user, {"importMode": mode.value}, force)
+
+
+def _preview_in_session(
+    import_type: ImportType, source: Any, filename: str, operator_id: int, options: dict, force: bool
+) -> dict:
+    """
+    在独立的数据库会话中解析并校验上传文件，由阻塞任务线程池执行
+    """
+    from app.db.session import BulkSessionLocal
+    db = BulkSessionLocal()
+    try:
+        return preview_import(db, import_type, source, filename, operator_id, options, force)
+    finally:
+        db.rollback()
+        db.close()
+
+
+def _commit_in_session(token: str, operator_id: int) -> dict:
+    """
+    在独立的数据库会话中写入预览缓存的数据并提交，由阻塞任务线程池执行
+    """
+    from app.db.session import BulkSessionLocal
+    db = BulkSessionLocal()
+    try:
+        import_type, result = commit_preview(db, token, operator_id)
+        if not result.get("duplicate"):
+            db.commit()
+            publish_dashboard_refresh(import_type.value)
+        discard_preview(token)
+        return result
+    except HTTPException:
+        db.rollback()
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to commit import preview {token}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"导入失败: {str(e)}"
+        )
+    finally:
+        db.close()
+
+
+async def _preview(import_type: ImportType, file: UploadFile, current_user: User, options: dict, force: bool) -> Any:
+    check_import_filename(file.filename)
+    result = await run_blocking(
+        _preview_in_session, import_type, file.file, file.filename, current_user.id, options, force
+    )
+    return {
+        "success": True,
+        "data": result
+    }
+
+
+@router.post("/outbound/preview", response_model=ImportPreviewResponse)
+async def preview_outbound_import(
+    current_user: User = Depends(get_current_user_detached),
+    file: UploadFile = File(...),
+    purchase_order_no: str = Form("", description="采购订单号"),
+    force: bool = Form(False, description="重新导入已导入过的同一文件"),
+    mode: ImportMode = Form(ImportMode.INSERT, description="导入模式：insert 只新增，upsert/replace 覆盖未处理的已存在单据"),
+) -> Any:
+    """
+    解析并校验出库Excel文件，返回错误、库存提示和预览令牌，确认后调用提交接口写入
+    """
+    options = {"purchaseOrderNo": purchase_order_no, "importMode": mode.value}
+    return await _preview(ImportType.OUTBOUND, file, current_user, options, force)
+
+
+@router.post("/purchase/preview", response_model=ImportPreviewResponse)
+async def preview_purchase_import(
+    current_user: User = Depends(get_current_user_detached),
+    file: UploadFile = File(...),
+    force: bool = Form(False, description="重新导入已导入过的同一文件"),
+    mode: ImportMode = Form(ImportMode.INSERT, description="导入模式：insert 只新增，upsert/replace 覆盖未处理的已存在单据"),
+) -> Any:
+    """
+    解析并校验采购订单Excel文件，返回错误和预览令牌，确认后调用提交接口写入
+    """
+    return await _preview(ImportType.PURCHASE, file, current_user, {"importMode": mode.value}, force)
+
+
+@router.post("/preview/{token}/commit", response_model=ImportPreviewResponse)
+async def commit_import_preview(
+    token: str,
+    current_user: User = Depends(get_current_user_detached),
+) -> Any:
+    """
+    将预览时缓存的数据写入数据库，不再读取Excel文件
+    """
+    result = await run_blocking(_commit_in_session, token, current_user.id)
+    return {
+        "success": True,
+        "data": result
+    }
+
+
+@router.get("/{job_id}", response_model=ImportJobResponse)
+def get_import_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+) -> Any:
+    """
+    查询导入任务进度：已处理行数、错误信息以及完成后的导入ID（只能查询自己提交的任务）
+    """
+    job = get_import_job(job_id)
+    # 其他用户的任务同样返回 404，不暴露任务是否存在
+    if not job or str(job.get("operatorId")) != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"导入任务 {job_id} 不存在"
+        )
+
+    return {
+        "success": True,
+        "data": {
+            "jobId": job_id,
+            "importType": job.get("importType"),
+            "filename": job.get("filename"),
+            "status": job.get("status"),
+            "totalRows": job.get("totalRows", 0),
+            "rowsProcessed": job.get("rowsProcessed", 0),
+            "successCount": job.get("successCount", 0),
+            "errorCount": job.get("errorCount", 0),
+            "errorDetails": job.get("errorDetails", []),
+            "error": job.get("error"),
+            "importId": job.get("importId"),
+            "duplicate": job.get("duplicate", False),
+            "createTime": job.get("createTime"),
+            "updateTime": job.get("updateTime")
+        }
+    }
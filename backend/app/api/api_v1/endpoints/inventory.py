@@ -1,9 +1,9 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session, joinedload
 from datetime import date
 
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_current_user_detached
 from app.models.user import User
 from app.models.warehouse import Inventory, InventoryTransaction, InventoryTransactionType
 from app.schemas.inventory import (
@@ -12,10 +12,45 @@ from app.schemas.inventory import (
     InventoryUpdate,
     InventoryTransaction as InventoryTransactionSchema
 )
+from app.utils.pagination import count_total, paginate_keyset
+from app.utils.search import apply_search_filters, contains
+from app.services.dashboard_cache import publish_dashboard_refresh
+from app.services.export import ExportFormat, stream_export
 
 router = APIRouter()
 
 
+# 库存导出的列
+EXPORT_COLUMNS = (
+    ("物料编码", Inventory.material_code),
+    ("物资描述", Inventory.material_description),
+    ("大类", Inventory.category),
+    ("计量单位", Inventory.unit),
+    ("库存数量", Inventory.quantity),
+    ("单价", Inventory.unit_price),
+    ("总价值", Inventory.total_value),
+    ("库位", Inventory.location),
+)
+
+
+def _filter_inventory(
+    query: Any,
+    material_code: Optional[str] = None,
+    material_description: Optional[str] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+) -> Any:
+    """
+    应用库存列表和导出共用的过滤条件
+    """
+    return apply_search_filters(query, [
+        (Inventory.material_code, material_code),
+        (Inventory.material_description, material_description),
+        (Inventory.category, category),
+        (Inventory.location, location),
+    ])
+
+
 @router.get("/list", response_model=dict)
 def list_inventory(
     db: Session = Depends(get_db),
@@ -26,22 +61,32 @@ def list_inventory(
     location: Optional[str] = None,
     page: int = 1,
     size: int = 10,
+    cursor: Optional[str] = Query(None, description="游标分页：第一页传空字符串，之后传上一页返回的 next_cursor"),
+    with_total: bool = Query(False, description="游标分页时是否精确计算总数，默认返回估算值"),
 ) -> Any:
     """
     获取库存列表
-    """
-    # 构建基本查询
-    query = db.query(Inventory)
 
-    # 应用过滤条件
-    if material_code:
-        query = query.filter(Inventory.material_code.ilike(f"%{material_code}%"))
-    if material_description:
-        query = query.filter(Inventory.material_description.ilike(f"%{material_description}%"))
-    if category:
-        query = query.filter(Inventory.category.ilike(f"%{category}%"))
-    if location:
-        query = query.filter(Inventory.location.ilike(f"%{location}%"))
+    默认按页码分页；传入 cursor 参数时按 (material_code, id) 游标分页，翻页代价与页码无关。
+    """
+    # 构建基本查询并应用过滤条件
+    query = _filter_inventory(db.query(Inventory), material_code, material_description, category, location)
+
+    # 游标分页：总数默认使用估算值
+    if cursor is not None:
+        total = count_total(query, with_total)
+        inventories, next_cursor = paginate_keyset(
+            query, (Inventory.material_code, Inventory.id), cursor, size, descending=False
+        )
+        return {
+            "success": True,
+            "data": {
+                "total": total,
+                "total_exact": with_total,
+                "next_cursor": next_cursor,
+                "records": [InventorySchema.model_validate(inventory) for inventory in inventories]
+            }
+        }
 
     # 计算总数
     total = query.count()
@@ -59,11 +104,33 @@ def list_inventory(
             "total": total,
             "pages": (total + size - 1) // size,
             "current": page,
-            "records": inventories
+            "records": [InventorySchema.model_validate(inventory) for inventory in inventories]
         }
     }
 
 
+@router.get("/export")
+def export_inventory(
+    current_user: User = Depends(get_current_user_detached),
+    material_code: Optional[str] = None,
+    material_description: Optional[str] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    format: ExportFormat = Query(ExportFormat.XLSX, description="导出格式：xlsx 或 csv"),
+) -> Any:
+    """
+    按库存列表的过滤条件导出库存，边查询边发送，内存占用与行数无关
+    """
+    def build_query(db: Session) -> Any:
+        query = _filter_inventory(db.query(Inventory), material_code, material_description, category, location)
+        return query.with_entities(*[column for _, column in EXPORT_COLUMNS]).order_by(
+            Inventory.material_code, Inventory.id
+        )
+
+    columns = [(title, column.key) for title, column in EXPORT_COLUMNS]
+    return stream_export(build_query, columns, format, f"inventory_{date.today():%Y%m%d}")
+
+
 @router.post("/", response_model=InventorySchema)
 def create_inventory(
     inventory_in: InventoryCreate,
@@ -110,6 +177,7 @@ def create_inventory(
         db.add(transaction)
         db.commit()
 
+    publish_dashboard_refresh("inventory")
     return inventory
 
 
@@ -161,6 +229,7 @@ def update_inventory(
     db.add(inventory)
     db.commit()
     db.refresh(inventory)
+    publish_dashboard_refresh("inventory")
     return inventory
 
 
@@ -175,9 +244,13 @@ def list_inventory_transactions(
     end_date: Optional[date] = None,
     page: int = 1,
     size: int = 10,
+    cursor: Optional[str] = Query(None, description="游标分页：第一页传空字符串，之后传上一页返回的 next_cursor"),
+    with_total: bool = Query(False, description="游标分页时是否精确计算总数，默认返回估算值"),
 ) -> Any:
     """
     获取库存事务列表
+
+    默认按页码分页；传入 cursor 参数时按 (transaction_time, id) 游标分页，翻页代价与页码无关。
     """
     # 构建基本查询
     query = db.query(InventoryTransaction)
@@ -193,20 +266,24 @@ def list_inventory_transactions(
         query = query.filter(InventoryTransaction.transaction_time <= end_date)
 
     # 如果指定了物料编码，需要联合查询
-    if material_code:
-        query = query.join(Inventory).filter(
-            Inventory.material_code.ilike(f"%{material_code}%")
+    material_code_condition = contains(Inventory.material_code, material_code)
+    if material_code_condition is not None:
+        query = query.join(Inventory).filter(material_code_condition)
+
+    # 计算总数并分页，游标分页的总数默认使用估算值
+    total = count_total(query, with_total) if cursor is not None else query.count()
+
+    # 库存记录和操作人随事务一次联合查询取回
+    query = query.options(joinedload(InventoryTransaction.inventory), joinedload(InventoryTransaction.operator))
+    next_cursor = None
+    if cursor is not None:
+        transactions, next_cursor = paginate_keyset(
+            query, (InventoryTransaction.transaction_time, InventoryTransaction.id), cursor, size
         )
-
-    # 计算总数
-    total = query.count()
-
-    # 分页
-    query = query.order_by(InventoryTransaction.transaction_time.desc())
-    query = query.offset((page - 1) * size).limit(size)
-
-    # 获取结果
-    transactions = query.all()
+    else:
+        query = query.order_by(InventoryTransaction.transaction_time.desc())
+        query = query.offset((page - 1) * size).limit(size)
+        transactions = query.all()
 
     # 构建响应数据
     records = []
@@ -228,6 +305,17 @@ def list_inventory_transactions(
             "remark": transaction.remark
         })
 
+    if cursor is not None:
+        return {
+            "success": True,
+            "data": {
+                "total": total,
+                "total_exact": with_total,
+                "next_cursor": next_cursor,
+                "records": records
+            }
+        }
+
     return {
         "success": True,
         "data": {
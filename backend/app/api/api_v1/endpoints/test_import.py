@@ -16,13 +16,15 @@ from app.models.outbound import OutboundOrder, OutboundItem, OutboundStatus
 router = APIRouter()
 
 @router.post("/test-import")
-async def test_import_excel(
+def test_import_excel(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     file: UploadFile = File(...)
 ) -> Any:
     """
     测试导入功能
+
+    声明为同步接口，由 FastAPI 在线程池中执行，读取 Excel 和数据库操作不阻塞事件循环
     """
     # 设置日志
     logger = logging.getLogger("test_import")
@@ -52,8 +54,8 @@ async def test_import_excel(
             )
 
         # 读取文件
-        contents = await file.read()
-        await file.seek(0)
+        contents = file.file.read()
+        file.file.seek(0)
 
         # 读取Excel文件
         df = pd.read_excel(file.file)
@@ -1,6 +1,6 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime
 
 from app.api.deps import get_db, get_current_user
@@ -16,6 +16,8 @@ from app.schemas.workflow import (
     WorkflowStart,
     TaskComplete
 )
+from app.utils.pagination import count_total, paginate_keyset
+from app.services.dashboard_cache import publish_dashboard_refresh
 
 router = APIRouter()
 
@@ -147,6 +149,7 @@ def start_workflow(
     
     # 提交事务
     db.commit()
+    publish_dashboard_refresh("workflow")
     
     # 刷新对象以获取完整数据
     db.refresh(workflow)
@@ -214,6 +217,7 @@ def complete_task(
     
     # 提交事务
     db.commit()
+    publish_dashboard_refresh("workflow")
     
     # 刷新对象以获取完整数据
     db.refresh(task)
@@ -237,9 +241,13 @@ def get_todo_tasks(
     workflow_type: Optional[WorkflowType] = None,
     page: int = 1,
     size: int = 10,
+    cursor: Optional[str] = Query(None, description="游标分页：第一页传空字符串，之后传上一页返回的 next_cursor"),
+    with_total: bool = Query(False, description="游标分页时是否精确计算总数，默认返回估算值"),
 ) -> Any:
     """
     获取待办任务
+
+    默认按页码分页；传入 cursor 参数时按 (create_time, id) 游标分页，翻页代价与页码无关。
     """
     # 构建查询
     query = db.query(WorkflowTask).filter(
@@ -251,15 +259,22 @@ def get_todo_tasks(
     if workflow_type:
         query = query.join(WorkflowInstance).filter(WorkflowInstance.workflow_type == workflow_type)
     
-    # 计算总数
-    total = query.count()
-    
-    # 分页
-    query = query.order_by(WorkflowTask.create_time.desc())
-    query = query.offset((page - 1) * size).limit(size)
-    
-    # 获取结果
-    tasks = query.all()
+    # 计算总数并分页，游标分页的总数默认使用估算值
+    total = count_total(query, with_total) if cursor is not None else query.count()
+
+    # 工作流实例和采购订单随任务一次联合查询取回
+    query = query.options(
+        joinedload(WorkflowTask.workflow_instance).joinedload(WorkflowInstance.purchase_order)
+    )
+    next_cursor = None
+    if cursor is not None:
+        tasks, next_cursor = paginate_keyset(
+            query, (WorkflowTask.create_time, WorkflowTask.id), cursor, size
+        )
+    else:
+        query = query.order_by(WorkflowTask.create_time.desc())
+        query = query.offset((page - 1) * size).limit(size)
+        tasks = query.all()
     
     # 构建响应数据
     records = []
@@ -284,6 +299,17 @@ def get_todo_tasks(
             }
         })
     
+    if cursor is not None:
+        return {
+            "success": True,
+            "data": {
+                "total": total,
+                "total_exact": with_total,
+                "next_cursor": next_cursor,
+                "records": records
+            }
+        }
+
     return {
         "success": True,
         "data": {
@@ -7,7 +7,7 @@ from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.session import ReportingSessionLocal, SessionLocal
 from app.models.user import User
 from app.schemas.token import TokenPayload
 
@@ -25,6 +25,17 @@ def get_db() -> Generator:
         db.close()
 
 
+def get_reporting_db() -> Generator:
+    """
+    获取报表连接池的数据库会话（看板、报表等耗时查询）
+    """
+    db = ReportingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def get_current_user(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
@@ -49,6 +60,21 @@ def get_current_user(
     return user
 
 
+def get_current_user_detached(
+    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+) -> User:
+    """
+    获取当前用户并立即归还交互连接池的连接，用于报表、导出和导入等耗时接口
+
+    这些接口的查询使用各自的连接池，认证用的交互连接不会在整个请求期间被占用。
+    返回的用户对象已与会话分离，只能访问已加载的列。
+    """
+    user = get_current_user(db, token)
+    db.expunge(user)
+    db.close()
+    return user
+
+
 def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -24,6 +24,22 @@ class Settings(BaseSettings):
     # 使用 SQLite 的替代配置（如果不想使用 PostgreSQL）
     # SQLALCHEMY_DATABASE_URI: str = "sqlite:///./warehouse_workflow.db"
 
+    # 数据库连接池配置：交互请求、报表（看板、导出）和批量导入各用一个连接池，重负载不会占满交互请求的连接
+    # 连接池参数不用于 SQLite；语句超时（毫秒，0 表示不限制）只用于 PostgreSQL
+    DB_POOL_SIZE: int = 10  # 交互请求连接池的常驻连接数
+    DB_MAX_OVERFLOW: int = 10  # 交互请求连接池在常驻连接之外最多再建立的连接数
+    DB_POOL_TIMEOUT: float = 10  # 交互请求等待空闲连接的最长时间（秒），超时返回 503
+    DB_STATEMENT_TIMEOUT: int = 15000  # 交互请求单条 SQL 的最长执行时间
+    DB_REPORTING_POOL_SIZE: int = 3
+    DB_REPORTING_MAX_OVERFLOW: int = 2
+    DB_REPORTING_POOL_TIMEOUT: float = 30
+    DB_REPORTING_STATEMENT_TIMEOUT: int = 120000
+    DB_BULK_POOL_SIZE: int = 2
+    DB_BULK_MAX_OVERFLOW: int = 2
+    DB_BULK_POOL_TIMEOUT: float = 60
+    DB_BULK_STATEMENT_TIMEOUT: int = 600000
+    DB_POOL_RECYCLE: int = 1800  # 连接的最长使用时间（秒），到期后重建，避免使用已被数据库或防火墙断开的连接
+
     # 安全配置
     SECRET_KEY: str = "your-secret-key-here"  # 在生产环境中应该更改
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 天
@@ -59,6 +75,37 @@ class Settings(BaseSettings):
     XXL_JOB_ENABLE_CALLBACK: bool = True
     XXL_JOB_CALLBACK_PORT: int = 9999
 
+    # 导入任务配置
+    IMPORT_CHUNK_SIZE: int = 5000  # 流式读取Excel时每块的行数，每处理一块更新一次任务进度
+    IMPORT_UPLOAD_DIR: str = "uploads/imports"  # 上传文件保存目录，按内容 SHA-256 寻址
+    IMPORT_JOB_BACKEND: str = "local"  # local: 本地进程池, rabbitmq: 通过消息队列分发
+    IMPORT_JOB_WORKERS: int = 2  # 本地进程池大小
+    IMPORT_JOB_QUEUE: str = "import_jobs"  # RabbitMQ 队列名称
+    IMPORT_JOB_TTL: int = 60 * 60 * 24 * 7  # 任务状态保留时间（秒）
+    IMPORT_JOB_MAX_ERROR_DETAILS: int = 1000  # 任务状态中保留的错误明细条数
+    IMPORT_JOB_HEARTBEAT_INTERVAL: int = 30  # 处理中的任务刷新心跳时间的间隔（秒）
+    IMPORT_JOB_HEARTBEAT_TIMEOUT: int = 300  # 处理中的任务超过该时间（秒）没有心跳时视为工作进程已退出，可重新领取或标记失败
+    IMPORT_PREVIEW_DIR: str = "uploads/previews"  # 导入预览解析结果缓存目录
+    IMPORT_PREVIEW_TTL: int = 30 * 60  # 导入预览缓存有效期（秒），过期后需要重新上传
+    IMPORT_PARSE_WORKERS: int = 0  # 批量导入并行解析工作表的进程数，0 表示按 CPU 核数
+    IMPORT_ARCHIVE_MAX_SIZE: int = 500 * 1024 * 1024  # 批量导入 zip 包解压后的最大字节数
+    DATAFRAME_ENGINE: str = "pandas"  # 导入和数据处理使用的 DataFrame 引擎：pandas 或 polars（需安装 polars）
+
+    # 事件循环配置
+    BLOCKING_EXECUTOR_WORKERS: int = 4  # 异步接口执行解析、数据库等阻塞任务的线程数
+    LOOP_LAG_MONITOR_ENABLED: bool = True  # 是否启用事件循环延迟监控
+    LOOP_LAG_INTERVAL: float = 0.5  # 事件循环延迟采样间隔（秒）
+    LOOP_LAG_THRESHOLD: float = 0.1  # 事件循环延迟告警阈值（秒），超过时记录阻塞的处理函数
+
+    # 请求查询统计配置
+    QUERY_STATS_ENABLED: bool = True  # 是否统计每个请求的耗时、SQL 查询次数和数据库耗时（Server-Timing 响应头、日志和指标）
+
+    # 看板缓存配置
+    DASHBOARD_CACHE_TTL: int = 120  # 看板数据缓存时间（秒），后台刷新失败时最多返回这么旧的数据
+    DASHBOARD_CACHE_LOCK_TTL: int = 30  # 重新计算看板时持有的互斥锁时间（秒）
+    DASHBOARD_CACHE_WAIT: float = 5.0  # 未拿到锁的请求等待其他请求计算结果的最长时间（秒）
+    DASHBOARD_REFRESH_QUEUE: str = "dashboard_refresh"  # 看板刷新事件的 RabbitMQ 队列名称
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,55 @@
+"""
+阻塞任务执行器模块
+
+异步接口中的 Excel 解析、pandas 计算和同步数据库访问都会阻塞事件循环，
+需要通过 run_blocking 交给有界线程池执行。线程池与 FastAPI 处理同步接口的默认线程池分开，
+大文件导入排队时不会占满普通请求的线程。
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """
+    获取阻塞任务线程池（首次使用时创建）
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BLOCKING_EXECUTOR_WORKERS,
+            thread_name_prefix="blocking",
+        )
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    在阻塞任务线程池中执行同步函数并等待结果，函数抛出的异常原样抛出
+
+    函数在当前上下文的副本中执行（与 asyncio.to_thread 一致），请求的查询统计等上下文变量在线程中可见。
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_blocking_executor(), functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+def shutdown_blocking_executor() -> None:
+    """
+    关闭阻塞任务线程池
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
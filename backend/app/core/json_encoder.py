@@ -8,6 +8,18 @@ from typing import Any
 from sqlalchemy.ext.declarative import DeclarativeMeta
 
 
+def finite_float(value: Any) -> Any:
+    """
+    将NaN替换为0，将无穷大替换为非常大的数，其他值原样返回
+    """
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 0.0
+        if math.isinf(value):
+            return float("1e100") if value > 0 else float("-1e100")
+    return value
+
+
 class CustomJSONEncoder(json.JSONEncoder):
     """
     自定义JSON编码器，处理特殊类型和值
@@ -31,10 +43,7 @@ class CustomJSONEncoder(json.JSONEncoder):
         
         # 处理NaN和无穷大
         if isinstance(obj, float):
-            if math.isnan(obj):
-                return 0.0  # 将NaN替换为0
-            if math.isinf(obj):
-                return float("1e100") if obj > 0 else float("-1e100")  # 将无穷大替换为非常大的数
+            return finite_float(obj)
         
         return super().default(obj)
 
@@ -0,0 +1,126 @@
+"""
+事件循环延迟监控模块
+
+采样协程每隔 interval 秒 sleep 一次，实际唤醒时间与预期的差值就是事件循环的调度延迟，
+记录到 event_loop_lag_seconds 直方图。后台看门狗线程发现采样协程超过阈值仍未唤醒时，
+抓取事件循环线程当前的调用栈，定位阻塞事件循环的处理函数并记录日志。
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from types import FrameType
+from typing import Optional
+
+from app.core.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG = histogram(
+    "event_loop_lag_seconds", "事件循环调度延迟",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+LOOP_LAG_LAST = gauge("event_loop_lag_last_seconds", "最近一次采样的事件循环调度延迟")
+LOOP_BLOCKED = counter("event_loop_blocked_total", "事件循环延迟超过阈值的次数", ["handler"])
+
+# 应用代码所在目录，用于从调用栈中找出业务函数
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(APP_DIR, "api")
+
+
+def describe_blocker(frame: FrameType) -> str:
+    """
+    从事件循环线程的调用栈中找出阻塞位置：优先取最外层的接口函数，其次取最内层的应用代码
+    """
+    stack = traceback.extract_stack(frame)
+    for entry in stack:
+        if entry.filename.startswith(API_DIR):
+            return f"{entry.name} ({os.path.relpath(entry.filename, APP_DIR)}:{entry.lineno})"
+    for entry in reversed(stack):
+        if entry.filename.startswith(APP_DIR):
+            return f"{entry.name} ({os.path.relpath(entry.filename, APP_DIR)}:{entry.lineno})"
+    entry = stack[-1]
+    return f"{entry.name} ({entry.filename}:{entry.lineno})"
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控器
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1):
+        """
+        Args:
+            interval: 采样间隔（秒）
+            threshold: 延迟告警阈值（秒）
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat = time.monotonic()
+        self._blocker: Optional[str] = None
+
+    def start(self) -> None:
+        """
+        在当前事件循环中启动采样协程和看门狗线程
+        """
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """
+        停止采样协程和看门狗线程
+        """
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+
+            lag = max(0.0, now - started - self.interval)
+            LOOP_LAG.observe(lag)
+            LOOP_LAG_LAST.set(lag)
+
+            blocker, self._blocker = self._blocker, None
+            if lag >= self.threshold:
+                handler = blocker or "unknown"
+                LOOP_BLOCKED.inc(handler=handler)
+                logger.warning(f"Event loop lag {lag * 1000:.0f}ms, blocked by {handler}")
+
+    def _watch(self) -> None:
+        """
+        看门狗线程：采样协程超时未唤醒时抓取事件循环线程的调用栈
+        """
+        while not self._stop.wait(self.threshold / 2):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.threshold or self._blocker is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._blocker = describe_blocker(frame)
+            logger.warning(
+                f"Event loop blocked for {stalled * 1000:.0f}ms in {self._blocker}:\n"
+                + "".join(traceback.format_stack(frame)[-10:])
+            )
@@ -0,0 +1,155 @@
+"""
+按请求统计 SQL 查询
+
+引擎上的 before_cursor_execute / after_cursor_execute 监听器记录每条语句的耗时，累加到当前请求的 QueryStats
+（通过 contextvars 传递；同步接口的线程池、run_blocking 和流式响应的生成器都会继承请求的上下文）。
+
+QueryStatsMiddleware 为每个请求创建 QueryStats：
+- 响应头 Server-Timing 给出发送响应头之前的查询次数和数据库耗时（浏览器开发者工具可以直接查看）；
+- 响应发送完成后输出一行 JSON 日志（查询次数、数据库耗时、最慢的语句），并记录按接口分组的直方图。
+"""
+
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+# 日志中最慢语句的最大长度
+STATEMENT_LOG_LENGTH = 500
+
+REQUEST_SECONDS = histogram(
+    "http_request_duration_seconds", "请求处理耗时（秒）", ["method", "route", "status"]
+)
+REQUEST_DB_QUERIES = histogram(
+    "http_request_db_queries", "每个请求执行的 SQL 语句数", ["method", "route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+REQUEST_DB_SECONDS = histogram("http_request_db_seconds", "每个请求的数据库耗时（秒）", ["method", "route"])
+
+
+class QueryStats:
+    """
+    一个请求内的查询统计
+    """
+
+    __slots__ = ("count", "total_time", "slowest_time", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """
+    返回当前请求的查询统计，不在请求中时返回 None
+    """
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def install_query_listeners(engine: Engine) -> None:
+    """
+    在引擎上注册查询计时监听器（重复调用不会重复注册）
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def server_timing(stats: QueryStats, elapsed: float) -> str:
+    """
+    构建 Server-Timing 响应头：数据库耗时（附查询次数）和请求总耗时，单位毫秒
+    """
+    return (
+        f'db;dur={stats.total_time * 1000:.1f};desc="{stats.count} queries", '
+        f"app;dur={elapsed * 1000:.1f}"
+    )
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI 中间件：统计每个请求的查询次数和数据库耗时，写入 Server-Timing 响应头、日志和指标
+
+    流式响应在发送响应头之后仍会查询，Server-Timing 只包含响应头之前的部分，日志和指标包含全部查询。
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_stats(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            self._report(scope, stats, status_code, time.perf_counter() - started)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats, status_code: int, elapsed: float) -> None:
+        # 未匹配路由的请求统一记为 unmatched，避免原始路径导致指标序列无限增长
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        method = scope["method"]
+        REQUEST_SECONDS.observe(elapsed, method=method, route=route, status=str(status_code))
+        REQUEST_DB_QUERIES.observe(stats.count, method=method, route=route)
+        REQUEST_DB_SECONDS.observe(stats.total_time, method=method, route=route)
+
+        statement = stats.slowest_statement
+        logger.info("request " + json.dumps({
+            "method": method,
+            "route": route,
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 1),
+            "queries": stats.count,
+            "db_ms": round(stats.total_time * 1000, 1),
+            "slowest_ms": round(stats.slowest_time * 1000, 1),
+            "slowest_statement": " ".join(statement.split())[:STATEMENT_LOG_LENGTH] if statement else None,
+        }, ensure_ascii=False))
@@ -1,11 +1,24 @@
 """
 RabbitMQ 配置和工具模块
+
+声明队列和发布消息按操作和队列记录耗时与失败次数，声明队列时顺带记录队列中的消息数（见 /metrics）。
+pika 的 BlockingConnection 不是线程安全的：rabbitmq_client 只供 run.py 声明队列和消费线程使用，
+publish_message 在每个线程自己的连接上发布。
 """
 
 import json
+import threading
 import pika
 from typing import Any, Optional, Callable, Dict
 from app.core.config import settings
+from app.core.metrics import counter, gauge, histogram
+
+RABBITMQ_SECONDS = histogram(
+    "rabbitmq_operation_duration_seconds", "RabbitMQ 操作耗时（秒）", ["operation", "queue"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+RABBITMQ_ERRORS = counter("rabbitmq_operation_errors_total", "RabbitMQ 操作失败次数", ["operation", "queue"])
+RABBITMQ_QUEUE_MESSAGES = gauge("rabbitmq_queue_messages", "最近一次声明队列时队列中的消息数", ["queue"])
 
 
 class RabbitMQ:
@@ -66,7 +79,13 @@ class RabbitMQ:
         if not self.channel:
             self.connect()
 
-        self.channel.queue_declare(queue=queue_name, durable=durable)
+        with RABBITMQ_SECONDS.time(operation="declare_queue", queue=queue_name):
+            try:
+                result = self.channel.queue_declare(queue=queue_name, durable=durable)
+            except Exception:
+                RABBITMQ_ERRORS.inc(operation="declare_queue", queue=queue_name)
+                raise
+        RABBITMQ_QUEUE_MESSAGES.set(result.method.message_count, queue=queue_name)
 
     def declare_exchange(self, exchange_name: str, exchange_type: str = 'direct', durable: bool = True):
         """
@@ -128,15 +147,22 @@ class RabbitMQ:
                 content_type='application/json'
             )
 
-        # 发布消息
-        self.channel.basic_publish(
-            exchange=exchange,
-            routing_key=routing_key,
-            body=body,
-            properties=properties
-        )
-
-    def setup_consumer(self, queue: str, callback: Callable, auto_ack: bool = True):
+        # 发布消息（默认交换机的路由键就是队列名）
+        with RABBITMQ_SECONDS.time(operation="publish", queue=routing_key):
+            try:
+                self.channel.basic_publish(
+                    exchange=exchange,
+                    routing_key=routing_key,
+                    body=body,
+                    properties=properties
+                )
+            except Exception:
+                RABBITMQ_ERRORS.inc(operation="publish", queue=routing_key)
+                raise
+
+    def setup_consumer(
+        self, queue: str, callback: Callable, auto_ack: bool = True, prefetch_count: Optional[int] = None
+    ):
         """
         设置消费者（不启动消费）
 
@@ -144,11 +170,17 @@ class RabbitMQ:
             queue: 队列名称
             callback: 回调函数，接收 channel, method, properties, body 四个参数
             auto_ack: 是否自动确认
+            prefetch_count: 未确认消息数上限，指定时在独立的通道上消费，不影响其他队列的消费者
         """
         if not self.channel:
             self.connect()
 
-        self.channel.basic_consume(
+        channel = self.channel
+        if prefetch_count is not None:
+            channel = self.connection.channel()
+            channel.basic_qos(prefetch_count=prefetch_count)
+
+        channel.basic_consume(
             queue=queue,
             on_message_callback=callback,
             auto_ack=auto_ack
@@ -185,9 +217,24 @@ def get_rabbitmq() -> RabbitMQ:
     return rabbitmq_client
 
 
+# 每个线程发布消息使用的客户端
+_publishers = threading.local()
+
+
+def get_publisher() -> RabbitMQ:
+    """
+    获取当前线程发布消息用的 RabbitMQ 客户端，连接已关闭时重新连接
+    """
+    client = getattr(_publishers, "client", None)
+    if client is None or client.connection is None or not client.connection.is_open:
+        client = RabbitMQ()
+        _publishers.client = client
+    return client
+
+
 def publish_message(queue: str, message: Any, exchange: str = '', routing_key: str = None):
     """
-    发布消息到队列
+    发布消息到队列（使用当前线程的连接）
 
     Args:
         queue: 队列名称
@@ -198,14 +245,21 @@ def publish_message(queue: str, message: Any, exchange: str = '', routing_key: s
     if routing_key is None:
         routing_key = queue
 
-    # 确保队列存在
-    rabbitmq_client.declare_queue(queue)
-
-    # 发布消息
-    rabbitmq_client.publish(
-        exchange=exchange,
-        routing_key=routing_key,
-        body=message
-    )
-
-    return True
+    for attempt in range(2):
+        client = get_publisher()
+        try:
+            # 确保队列存在
+            client.declare_queue(queue)
+
+            # 发布消息
+            client.publish(
+                exchange=exchange,
+                routing_key=routing_key,
+                body=message
+            )
+            return True
+        except pika.exceptions.AMQPError:
+            # 空闲的连接不处理心跳，可能已被服务器断开，丢弃后重新连接一次
+            _publishers.client = None
+            if attempt:
+                raise
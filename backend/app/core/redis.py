@@ -1,12 +1,55 @@
 """
 Redis 配置和工具模块
+
+redis_client 的每条命令和每次 pipeline 执行都按命令名记录耗时和失败次数（见 /metrics）。
 """
 
 import json
 from typing import Any, Optional, Union, Dict, List
 import redis
+from redis.client import Pipeline
 from redis.connection import ConnectionPool
 from app.core.config import settings
+from app.core.metrics import counter, histogram
+
+REDIS_SECONDS = histogram(
+    "redis_command_duration_seconds", "Redis 命令耗时（秒）", ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REDIS_ERRORS = counter("redis_command_errors_total", "Redis 命令失败次数", ["command"])
+
+
+class InstrumentedPipeline(Pipeline):
+    """
+    记录执行耗时的 pipeline，命令名记为 pipeline
+    """
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        with REDIS_SECONDS.time(command="pipeline"):
+            try:
+                return super().execute(raise_on_error)
+            except redis.RedisError:
+                REDIS_ERRORS.inc(command="pipeline")
+                raise
+
+
+class InstrumentedRedis(redis.Redis):
+    """
+    按命令名记录耗时和失败次数的 Redis 客户端
+    """
+
+    def execute_command(self, *args, **options):
+        command = str(args[0]).lower() if args else "unknown"
+        with REDIS_SECONDS.time(command=command):
+            try:
+                return super().execute_command(*args, **options)
+            except redis.RedisError:
+                REDIS_ERRORS.inc(command=command)
+                raise
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
 
 # Redis 连接池
 redis_pool = ConnectionPool(
@@ -18,7 +61,7 @@ redis_pool = ConnectionPool(
 )
 
 # Redis 客户端
-redis_client = redis.Redis(connection_pool=redis_pool)
+redis_client = InstrumentedRedis(connection_pool=redis_pool)
 
 
 def get_redis() -> redis.Redis:
@@ -116,6 +159,34 @@ def set_hash(name: str, key: str, value: Any) -> bool:
         return False
 
 
+def set_hash_fields(name: str, mapping: Dict[str, Any], expire: int = None) -> bool:
+    """
+    批量设置 Redis 哈希表字段
+    
+    Args:
+        name: 哈希表名
+        mapping: 字段字典（非字符串值将自动序列化为 JSON）
+        expire: 过期时间（秒），None 表示不修改过期时间
+        
+    Returns:
+        是否成功
+    """
+    try:
+        values = {
+            key: value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+            for key, value in mapping.items()
+        }
+        pipe = redis_client.pipeline()
+        pipe.hset(name, mapping=values)
+        if expire:
+            pipe.expire(name, expire)
+        pipe.execute()
+        return True
+    except Exception as e:
+        print(f"Redis hset error: {e}")
+        return False
+
+
 def get_hash(name: str, key: str, default: Any = None) -> Any:
     """
     获取 Redis 哈希表字段
@@ -1,5 +1,7 @@
 """
 XXL-Job 配置和工具模块
+
+任务（回调触发和本地定时触发）按任务名和结果记录执行耗时（见 /metrics）。
 """
 
 import json
@@ -11,6 +13,26 @@ from typing import Dict, Any, List, Callable, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from app.core.config import settings
+from app.core.metrics import histogram
+
+JOB_SECONDS = histogram(
+    "scheduled_job_duration_seconds", "定时任务执行耗时（秒）", ["job", "result"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0, 1800.0, 3600.0),
+)
+
+
+def run_job_handler(job_name: str, handler: Callable, params: Dict[str, Any]) -> Any:
+    """
+    执行任务处理器并记录耗时，结果标签为 success 或 error
+    """
+    started = time.perf_counter()
+    result = "error"
+    try:
+        value = handler(params)
+        result = "success"
+        return value
+    finally:
+        JOB_SECONDS.observe(time.perf_counter() - started, job=job_name, result=result)
 
 
 class XXLJob:
@@ -78,7 +100,7 @@ class XXLJob:
             
             # 执行任务
             handler = self.job_handlers[job_name]
-            result = handler(params_dict)
+            result = run_job_handler(job_name, handler, params_dict)
             
             return {
                 "code": 200,
@@ -206,7 +228,7 @@ class XXLJob:
         
         # 添加定时任务
         self.scheduler.add_job(
-            func=lambda: handler(params or {}),
+            func=lambda: run_job_handler(job_name, handler, params or {}),
             trigger=CronTrigger.from_crontab(cron),
             id=job_name,
             replace_existing=True
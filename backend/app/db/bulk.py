@@ -0,0 +1,231 @@
+"""
+批量写入工具
+
+- insert_returning：一条 INSERT ... RETURNING 写入多行并取回生成的主键；
+- copy_rows：PostgreSQL 上通过 COPY ... FROM STDIN 流式写入，其他数据库退化为 executemany；
+- upsert_returning：INSERT ... ON CONFLICT DO UPDATE ... RETURNING，按唯一列写入或更新多行；
+- delete_children / reconcile_children：按父记录集合删除或对比子记录，只增删有变化的行。
+
+都使用会话当前的连接，与会话中的其他操作处于同一事务，由调用方提交。
+"""
+
+import enum
+import io
+import math
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, delete, insert, select
+from sqlalchemy.orm import Session
+
+# COPY 每次发送给数据库的行数，控制缓冲区大小
+COPY_BATCH_SIZE = 10000
+
+# IN 子句单批最大参数个数，兼容 SQLite 的参数数量限制
+IN_BATCH_SIZE = 500
+
+
+def _table(model: Any) -> Table:
+    return model.__table__ if hasattr(model, "__table__") else model
+
+
+def _apply_defaults(table: Table, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    为缺少的列填充 Python 端默认值（如 create_time），COPY 不会执行 SQLAlchemy 的默认值
+    """
+    defaults = [
+        column for column in table.columns
+        if column.default is not None and not column.default.is_sequence and not column.default.is_clause_element
+    ]
+    for row in rows:
+        for column in defaults:
+            if column.key not in row:
+                default = column.default
+                row[column.key] = default.arg(None) if default.is_callable else default.arg
+    return rows
+
+
+def insert_returning(
+    db: Session, model: Any, rows: List[Dict[str, Any]], returning: Sequence[str] = ("id",)
+) -> List[Any]:
+    """
+    写入多行并返回 RETURNING 的列，返回行的顺序不保证与输入一致，需要用唯一列对应
+
+    Args:
+        db: 数据库会话
+        model: ORM 模型或表
+        rows: 每行的列值字典
+        returning: 需要返回的列名
+    """
+    if not rows:
+        return []
+    table = _table(model)
+    stmt = insert(table).returning(*[table.c[name] for name in returning])
+    return db.execute(stmt, rows).all()
+
+
+def _copy_value(value: Any) -> str:
+    """
+    转换为 COPY 文本格式的字段值：NULL 写作 \\N，并转义反斜杠、制表符和换行
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        value = value.name
+    elif isinstance(value, bool):
+        value = "t" if value else "f"
+    elif isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(
+    db: Session, model: Any, rows: Iterable[Dict[str, Any]], columns: Optional[Sequence[str]] = None
+) -> int:
+    """
+    批量写入多行，PostgreSQL 使用 COPY，其他数据库使用 executemany
+
+    Args:
+        db: 数据库会话
+        model: ORM 模型或表
+        rows: 每行的列值字典
+        columns: 写入的列，默认为第一行的键加上有默认值的列
+
+    Returns:
+        写入的行数
+    """
+    table = _table(model)
+    rows = _apply_defaults(table, list(rows))
+    if not rows:
+        return 0
+
+    connection = db.connection()
+    if connection.dialect.name != "postgresql":
+        db.execute(insert(table), rows)
+        return len(rows)
+
+    columns = list(columns or rows[0].keys())
+    column_list = ", ".join(connection.dialect.identifier_preparer.quote(name) for name in columns)
+    sql = f"COPY {connection.dialect.identifier_preparer.format_table(table)} ({column_list}) FROM STDIN"
+
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        for start in range(0, len(rows), COPY_BATCH_SIZE):
+            buffer = io.StringIO()
+            for row in rows[start:start + COPY_BATCH_SIZE]:
+                buffer.write("\t".join(_copy_value(row.get(name)) for name in columns))
+                buffer.write("\n")
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+    return len(rows)
+
+
+def upsert_returning(
+    db: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    conflict_columns: Sequence[str],
+    update_columns: Sequence[str],
+    returning: Sequence[str] = ("id",),
+    where: Any = None,
+) -> List[Any]:
+    """
+    INSERT ... ON CONFLICT (conflict_columns) DO UPDATE 写入多行并返回 RETURNING 的列（PostgreSQL / SQLite）
+
+    已存在的行只更新 update_columns，并把 update_time 设为当前时间（ON CONFLICT 不会执行 onupdate）；
+    where 为更新条件，不满足条件的已存在行不更新，也不会出现在返回结果中。
+    """
+    if not rows:
+        return []
+    table = _table(model)
+    dialect = db.connection().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"{dialect} 不支持 ON CONFLICT")
+
+    rows = _apply_defaults(table, rows)
+    stmt = dialect_insert(table)
+    values = {name: stmt.excluded[name] for name in update_columns}
+    if "update_time" in table.c and "update_time" not in values:
+        values["update_time"] = datetime.now()
+    stmt = stmt.on_conflict_do_update(index_elements=list(conflict_columns), set_=values, where=where)
+    stmt = stmt.returning(*[table.c[name] for name in returning])
+    return db.execute(stmt, rows).all()
+
+
+def delete_children(db: Session, model: Any, parent_column: str, parent_ids: Iterable[int]) -> int:
+    """
+    按父记录ID集合删除子记录，返回删除的行数
+    """
+    table = _table(model)
+    parent_ids = list(parent_ids)
+    deleted = 0
+    for start in range(0, len(parent_ids), IN_BATCH_SIZE):
+        batch = parent_ids[start:start + IN_BATCH_SIZE]
+        deleted += db.execute(delete(table).where(table.c[parent_column].in_(batch))).rowcount
+    return deleted
+
+
+def _comparable(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def reconcile_children(
+    db: Session,
+    model: Any,
+    parent_column: str,
+    parent_ids: Iterable[int],
+    rows: List[Dict[str, Any]],
+    fields: Sequence[str],
+) -> Tuple[int, int, int]:
+    """
+    用 rows 替换父记录集合下的全部子记录，但只删除和写入有变化的行
+
+    现有子记录和新记录都按 fields 的值比较（作为多重集合）：完全相同的行保持不变，
+    现有记录中多出的行删除，新记录中多出的行批量写入。
+
+    Returns:
+        (写入行数, 删除行数, 未变化行数)
+    """
+    table = _table(model)
+    parent_ids = list(parent_ids)
+    columns = [table.c[name] for name in fields]
+
+    existing: Dict[Tuple[Any, ...], List[int]] = defaultdict(list)
+    for start in range(0, len(parent_ids), IN_BATCH_SIZE):
+        batch = parent_ids[start:start + IN_BATCH_SIZE]
+        stmt = select(table.c.id, table.c[parent_column], *columns).where(table.c[parent_column].in_(batch))
+        for row in db.execute(stmt):
+            existing[tuple(_comparable(value) for value in row[1:])].append(row[0])
+
+    unchanged = 0
+    to_insert = []
+    for row in rows:
+        key = (row[parent_column],) + tuple(_comparable(row.get(name)) for name in fields)
+        if existing.get(key):
+            existing[key].pop()
+            unchanged += 1
+        else:
+            to_insert.append(row)
+
+    stale = [row_id for ids in existing.values() for row_id in ids]
+    for start in range(0, len(stale), IN_BATCH_SIZE):
+        db.execute(delete(table).where(table.c.id.in_(stale[start:start + IN_BATCH_SIZE])))
+    copy_rows(db, model, to_insert)
+    return len(to_insert), len(stale), unchanged
@@ -1,11 +1,112 @@
-from sqlalchemy import create_engine
+import enum
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import REGISTRY, gauge
+from app.core.query_stats import install_query_listeners
+
+
+class Workload(str, enum.Enum):
+    """数据库负载类型，每种负载使用独立的连接池和语句超时"""
+    INTERACTIVE = "interactive"  # 列表、详情、PDA 等交互请求
+    REPORTING = "reporting"  # 看板、报表和导出
+    BULK = "bulk"  # 导入和汇总任务
+
+
+# 各负载的连接池参数：(常驻连接数, 额外连接数, 等待连接超时（秒）, 语句超时（毫秒）)
+POOL_SETTINGS = {
+    Workload.INTERACTIVE: (
+        settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW, settings.DB_POOL_TIMEOUT, settings.DB_STATEMENT_TIMEOUT,
+    ),
+    Workload.REPORTING: (
+        settings.DB_REPORTING_POOL_SIZE, settings.DB_REPORTING_MAX_OVERFLOW, settings.DB_REPORTING_POOL_TIMEOUT,
+        settings.DB_REPORTING_STATEMENT_TIMEOUT,
+    ),
+    Workload.BULK: (
+        settings.DB_BULK_POOL_SIZE, settings.DB_BULK_MAX_OVERFLOW, settings.DB_BULK_POOL_TIMEOUT,
+        settings.DB_BULK_STATEMENT_TIMEOUT,
+    ),
+}
+
+# PostgreSQL 语句超时被取消时的 SQLSTATE
+QUERY_CANCELED = "57014"
+
+
+def create_workload_engine(url: str, workload: Workload) -> Engine:
+    """
+    按负载类型创建引擎：PostgreSQL 等数据库使用配置的连接池大小和超时，每个新连接设置 statement_timeout
+    """
+    pool_size, max_overflow, pool_timeout, statement_timeout = POOL_SETTINGS[workload]
+    backend = make_url(url).get_backend_name()
+    options: Dict[str, Any] = {"pool_pre_ping": True}
+    # SQLite 使用 SQLAlchemy 默认的连接池（内存数据库不支持这些参数）
+    if backend != "sqlite":
+        options.update(
+            pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    workload_engine = create_engine(url, **options)
+
+    if backend == "postgresql" and statement_timeout:
+        @event.listens_for(workload_engine, "connect")
+        def set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET statement_timeout = {int(statement_timeout)}")
+            cursor.close()
+            # 提交后设置才会保留，否则归还连接时的回滚会撤销它
+            dbapi_connection.commit()
+
+    if settings.QUERY_STATS_ENABLED:
+        install_query_listeners(workload_engine)
+    return workload_engine
+
+
+def is_statement_timeout(exc: BaseException) -> bool:
+    """
+    判断数据库异常是否由语句超时取消引起（psycopg2 使用 pgcode，psycopg 3 使用 sqlstate）
+    """
+    orig = getattr(exc, "orig", None)
+    return QUERY_CANCELED in (getattr(orig, "pgcode", None), getattr(orig, "sqlstate", None))
+
+
+engines = {workload: create_workload_engine(settings.SQLALCHEMY_DATABASE_URI, workload) for workload in Workload}
+engine = engines[Workload.INTERACTIVE]
+
+
+def dispose_engines(close: bool = True) -> None:
+    """
+    丢弃所有连接池中的连接；工作进程中以 close=False 调用，不关闭从父进程继承的连接
+    """
+    for workload_engine in engines.values():
+        workload_engine.dispose(close=close)
+
+
+DB_POOL_SIZE = gauge("db_pool_size", "数据库连接池的常驻连接数", ["pool"])
+DB_POOL_CHECKED_OUT = gauge("db_pool_checked_out", "数据库连接池中正在使用的连接数", ["pool"])
+DB_POOL_OVERFLOW = gauge("db_pool_overflow", "数据库连接池超出常驻连接数的连接数（为负表示尚未建满）", ["pool"])
+
+
+def collect_pool_metrics() -> None:
+    """
+    抓取指标时按负载更新连接池占用（只有 QueuePool 等带计数的连接池）
+    """
+    for workload, workload_engine in engines.items():
+        pool = workload_engine.pool
+        if hasattr(pool, "checkedout"):
+            DB_POOL_SIZE.set(pool.size(), pool=workload.value)
+            DB_POOL_CHECKED_OUT.set(pool.checkedout(), pool=workload.value)
+            DB_POOL_OVERFLOW.set(pool.overflow(), pool=workload.value)
+
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+REGISTRY.add_collector(collect_pool_metrics)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReportingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engines[Workload.REPORTING])
+BulkSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engines[Workload.BULK])
 
 Base = declarative_base()
 
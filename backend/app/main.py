@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
 
 from app.core.config import settings
 from app.api.api_v1.api import api_router
+from app.core.executor import shutdown_blocking_executor
 from app.core.json_encoder import CustomJSONEncoder
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.metrics import REGISTRY
+from app.core.query_stats import QueryStatsMiddleware
+from app.db.session import is_statement_timeout
+from app.services.batch_import import shutdown_parse_executor
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -23,17 +30,65 @@ app.add_middleware(
     allow_credentials=False,  # 当使用 allow_origins=["*"] 时，必须设置为 False
     allow_methods=["*"],  # 允许所有方法
     allow_headers=["*"],  # 允许所有头部
+    expose_headers=["Server-Timing"],
 )
 
+# 统计每个请求的耗时（按路由和状态码）、SQL 查询次数和数据库耗时，通过 Server-Timing 响应头、日志和 /metrics 输出
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
 # 包含API路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError) -> JSONResponse:
+    """
+    连接池在 pool_timeout 内没有空闲连接时返回 503，客户端可以稍后重试
+    """
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "数据库繁忙，请稍后重试"})
+
+
+@app.exception_handler(OperationalError)
+async def statement_timeout_handler(request: Request, exc: OperationalError) -> JSONResponse:
+    """
+    SQL 超过 statement_timeout 被取消时返回 503，其他数据库错误照常作为服务器错误处理
+    """
+    if not is_statement_timeout(exc):
+        raise exc
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content={"detail": "查询超时，请缩小查询范围后重试"})
+
+
+# 事件循环延迟监控
+loop_monitor = LoopLagMonitor(settings.LOOP_LAG_INTERVAL, settings.LOOP_LAG_THRESHOLD)
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    if settings.LOOP_LAG_MONITOR_ENABLED:
+        loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await loop_monitor.stop()
+    shutdown_blocking_executor()
+    shutdown_parse_executor()
+
+
 @app.get("/")
 def root():
     return {"message": "欢迎使用仓储工作流系统API"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    以 Prometheus 文本格式导出进程内指标
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
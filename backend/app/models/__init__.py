@@ -6,3 +6,5 @@ from app.models.warehouse import DeliveryConfirmation, Inventory, InventoryTrans
 from app.models.outbound import OutboundOrder, OutboundItem, OutboundStatus
 from app.models.report import Report, ReportSubscription, ReportType
 from app.models.notification import Notification, NotificationRecipient, NotificationType, NotificationLevel
+from app.models.rollup import DailyOrderStat, DailyTransactionStat, DailyTaskStat, RollupState, RollupStaleDay
+from app.models.import_file import ImportFile
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, UniqueConstraint
+
+from app.models.base import BaseModel
+
+
+class ImportFile(BaseModel):
+    """已导入文件记录模型：文件内容 SHA-256 -> 导入结果"""
+
+    __table_args__ = (
+        UniqueConstraint("import_type", "sha256", "options_key", name="uq_wh_importfile_type_sha256_options"),
+    )
+
+    import_type = Column(String(20), nullable=False, comment="导入类型")
+    sha256 = Column(String(64), nullable=False, comment="文件内容 SHA-256")
+    options_key = Column(String(64), nullable=False, default="", server_default="", comment="导入选项键，没有影响结果的选项时为空")
+    filename = Column(String(255), comment="首次上传时的文件名")
+    file_path = Column(String(500), nullable=False, comment="内容寻址存储中的文件路径")
+    file_size = Column(Integer, nullable=False, default=0, comment="文件大小（字节）")
+    import_id = Column(String(50), comment="导入ID")
+    result = Column(JSON, comment="导入结果，与导入接口返回的 data 一致")
+    operator_id = Column(Integer, ForeignKey("wh_user.id"), comment="操作人ID")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, ForeignKey, Enum, Text, JSON, Index
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime, timezone
@@ -21,6 +21,10 @@ class OutboundStatus(str, enum.Enum):
 class OutboundOrder(BaseModel):
     """出库单模型"""
 
+    __table_args__ = (
+        Index("ix_wh_outboundorder_create_time_id", "create_time", "id"),  # 游标分页
+    )
+
     material_voucher = Column(String(32), unique=True, index=True, nullable=False, comment="物料凭证")
     voucher_date = Column(Date, nullable=False, comment="开单日期")
     department = Column(String(100), nullable=False, comment="具体用料部门")
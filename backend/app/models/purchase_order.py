@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, Date, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, Float, Date, Text, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -22,6 +22,12 @@ class PurchaseOrderStatus(str, enum.Enum):
 
 class PurchaseOrder(BaseModel):
     """采购订单模型"""
+
+    __table_args__ = (
+        Index("ix_wh_purchaseorder_create_time_id", "create_time", "id"),  # 游标分页
+        Index("ix_wh_purchaseorder_order_date", "order_date"),  # 按日重新汇总
+        Index("ix_wh_purchaseorder_update_time", "update_time"),  # 增量汇总查找变更
+    )
     
     order_no = Column(String(32), unique=True, index=True, nullable=False, comment="采购订单号")
     plan_number = Column(String(32), comment="计划编号")
@@ -0,0 +1,58 @@
+from sqlalchemy import Column, String, Integer, Float, Date, DateTime, Enum, UniqueConstraint
+
+from app.models.base import BaseModel
+from app.models.warehouse import InventoryTransactionType
+
+
+class DailyOrderStat(BaseModel):
+    """采购订单日汇总模型（按订单生成日期 × 大类 × 用户单位）"""
+
+    __table_args__ = (
+        UniqueConstraint("day", "category", "user_unit", name="uq_wh_dailyorderstat_day_category_unit"),
+    )
+
+    day = Column(Date, nullable=False, index=True, comment="日期")
+    category = Column(String(50), nullable=False, default="", comment="大类（空字符串表示未填写）")
+    user_unit = Column(String(100), nullable=False, default="", comment="用户单位（空字符串表示未填写）")
+    order_count = Column(Integer, nullable=False, default=0, comment="订单数")
+    order_amount = Column(Float, nullable=False, default=0, comment="订单金额")
+
+
+class DailyTransactionStat(BaseModel):
+    """库存事务日汇总模型（按事务日期 × 事务类型）"""
+
+    __table_args__ = (
+        UniqueConstraint("day", "transaction_type", name="uq_wh_dailytransactionstat_day_type"),
+    )
+
+    day = Column(Date, nullable=False, index=True, comment="日期")
+    transaction_type = Column(Enum(InventoryTransactionType), nullable=False, comment="事务类型")
+    transaction_count = Column(Integer, nullable=False, default=0, comment="事务数")
+    quantity = Column(Float, nullable=False, default=0, comment="数量合计")
+
+
+class DailyTaskStat(BaseModel):
+    """已完成工作流任务日汇总模型（按完成日期 × 任务名称 × 处理结果）"""
+
+    __table_args__ = (
+        UniqueConstraint("day", "task_name", "result", name="uq_wh_dailytaskstat_day_task_result"),
+    )
+
+    day = Column(Date, nullable=False, index=True, comment="日期")
+    task_name = Column(String(100), nullable=False, comment="任务名称")
+    result = Column(String(20), nullable=False, default="", comment="处理结果（空字符串表示未填写）")
+    task_count = Column(Integer, nullable=False, default=0, comment="任务数")
+
+
+class RollupState(BaseModel):
+    """汇总任务状态模型"""
+
+    name = Column(String(50), unique=True, nullable=False, comment="汇总名称")
+    last_run_time = Column(DateTime, comment="上次运行开始时间，此后更新的数据需要重新汇总")
+    complete_until = Column(Date, comment="汇总表已完整覆盖到的日期（含），之后的日期从明细表实时统计")
+
+
+class RollupStaleDay(BaseModel):
+    """需要重新汇总的日期模型：明细的日期被修改或明细被删除时记录原来的日期，下次增量汇总时重新计算"""
+
+    day = Column(Date, nullable=False, comment="日期")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -40,6 +40,10 @@ class DeliveryConfirmation(BaseModel):
 
 class Inventory(BaseModel):
     """库存模型"""
+
+    __table_args__ = (
+        Index("ix_wh_inventory_material_code_id", "material_code", "id"),  # 游标分页
+    )
     
     material_code = Column(String(32), index=True, nullable=False, comment="物料编码")
     material_description = Column(String(255), comment="物资描述")
@@ -65,6 +69,11 @@ class InventoryTransactionType(str, enum.Enum):
 
 class InventoryTransaction(BaseModel):
     """库存事务模型"""
+
+    __table_args__ = (
+        Index("ix_wh_inventorytransaction_time_id", "transaction_time", "id"),  # 游标分页
+        Index("ix_wh_inventorytransaction_update_time", "update_time"),  # 增量汇总查找变更
+    )
     
     inventory_id = Column(Integer, ForeignKey("wh_inventory.id"), nullable=False)
     transaction_type = Column(Enum(InventoryTransactionType), nullable=False, comment="事务类型")
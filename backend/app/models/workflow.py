@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
@@ -49,6 +49,12 @@ class WorkflowInstance(BaseModel):
 
 class WorkflowTask(BaseModel):
     """工作流任务模型"""
+
+    __table_args__ = (
+        Index("ix_wh_workflowtask_assignee_status_create_time", "assignee_id", "status", "create_time", "id"),  # 待办任务游标分页
+        Index("ix_wh_workflowtask_complete_time", "complete_time"),  # 按日重新汇总
+        Index("ix_wh_workflowtask_update_time", "update_time"),  # 增量汇总查找变更
+    )
     
     task_id = Column(String(64), unique=True, comment="任务ID")
     workflow_instance_id = Column(Integer, ForeignKey("wh_workflowinstance.id"), nullable=False)
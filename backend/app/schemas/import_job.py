@@ -0,0 +1,20 @@
+from typing import Any
+from pydantic import BaseModel
+
+
+# 导入任务创建响应
+class ImportJobCreateResponse(BaseModel):
+    success: bool
+    data: Any
+
+
+# 导入任务状态响应
+class ImportJobResponse(BaseModel):
+    success: bool
+    data: Any
+
+
+# 导入预览及提交响应
+class ImportPreviewResponse(BaseModel):
+    success: bool
+    data: Any
@@ -29,6 +29,7 @@ class UserUpdate(UserBase):
 class UserInDBBase(UserBase):
     id: int
     username: str
+    is_superuser: bool = False
     
     class Config:
         from_attributes = True
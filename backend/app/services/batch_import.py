@@ -0,0 +1,222 @@
+"""
+多文件、多工作表批量导入
+
+月末出库数据通常是一个包含几十个工作簿的 zip 包，部分工作簿有多个工作表。批量导入流程：
+1. 上传的 zip 包解压出其中的 .xls/.xlsx 文件，与直接上传的工作簿一起按内容哈希保存（见 upload_store）；
+2. 列出每个工作簿的工作表，各工作表由进程池（默认按 CPU 核数）并行解析为 DataFrame；
+3. 合并所有工作表的数据，由同一个导入引擎在一个事务中校验并批量写入。
+
+某个文件或工作表无法读取、缺少必要的列时只跳过该工作表，在 sheets 中报告；
+行级错误附带来源文件和工作表名称。
+"""
+
+import logging
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.import_jobs import ImportType, create_import_engine, open_import_reader
+from app.services.upload_store import StoredUpload, store_upload
+from app.utils.excel import list_sheet_names
+
+logger = logging.getLogger(__name__)
+
+EXCEL_EXTENSIONS = (".xls", ".xlsx")
+ARCHIVE_EXTENSIONS = (".zip",)
+
+# zip 文件名未标记 UTF-8 时按 cp437 解码，中文 Windows 打包的文件名实际为 GBK
+ZIP_UTF8_FLAG = 0x800
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_executor() -> ProcessPoolExecutor:
+    """
+    获取工作表解析进程池（首次使用时创建），大小为 IMPORT_PARSE_WORKERS，未配置时为 CPU 核数
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMPORT_PARSE_WORKERS or os.cpu_count() or 1)
+    return _executor
+
+
+def shutdown_parse_executor() -> None:
+    """
+    关闭工作表解析进程池
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def _member_name(info: zipfile.ZipInfo) -> str:
+    if info.flag_bits & ZIP_UTF8_FLAG:
+        return info.filename
+    try:
+        return info.filename.encode("cp437").decode("gbk")
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return info.filename
+
+
+def expand_upload(file_obj: BinaryIO, filename: str) -> List[StoredUpload]:
+    """
+    保存上传文件；zip 包解压其中的Excel文件逐个保存（忽略目录、Office 临时文件和 macOS 元数据）
+
+    Raises:
+        HTTPException: 文件类型不支持、zip 包损坏或解压后超过 IMPORT_ARCHIVE_MAX_SIZE
+    """
+    lower = (filename or "").lower()
+    if lower.endswith(EXCEL_EXTENSIONS):
+        return [store_upload(file_obj, filename)]
+    if not lower.endswith(ARCHIVE_EXTENSIONS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"不支持的文件类型: {filename}，只支持Excel文件(.xls, .xlsx)和zip压缩包"
+        )
+
+    try:
+        archive = zipfile.ZipFile(file_obj)
+    except zipfile.BadZipFile:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法读取压缩包: {filename}"
+        )
+    with archive:
+        members = []
+        for info in archive.infolist():
+            name = _member_name(info)
+            basename = os.path.basename(name)
+            if info.is_dir() or name.startswith("__MACOSX/") or basename.startswith("~$"):
+                continue
+            if name.lower().endswith(EXCEL_EXTENSIONS):
+                members.append((info, name))
+
+        unpacked_size = sum(info.file_size for info, _ in members)
+        if unpacked_size > settings.IMPORT_ARCHIVE_MAX_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"压缩包 {filename} 解压后超过 {settings.IMPORT_ARCHIVE_MAX_SIZE // (1024 * 1024)}MB"
+            )
+
+        stored = []
+        for info, name in members:
+            with archive.open(info) as member:
+                stored.append(store_upload(member, f"{filename}/{name}"))
+    logger.info(f"Extracted {len(stored)} Excel files from {filename}")
+    return stored
+
+
+def parse_sheet(import_type: str, path: str, sheet: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """
+    读取一个工作表的全部数据（在解析进程中执行），返回 (DataFrame, 错误信息)
+
+    DataFrame 的列名已按导入类型修复和统一，索引为原始数据行号。
+    """
+    try:
+        with open_import_reader(ImportType(import_type), path, sheet=sheet) as reader:
+            columns = reader.columns
+            chunks = list(reader)
+    except HTTPException as e:
+        return None, e.detail
+    except Exception as e:
+        return None, f"无法读取工作表: {str(e)}"
+    return (pd.concat(chunks) if chunks else pd.DataFrame(columns=columns)), None
+
+
+def parse_sheets(
+    import_type: ImportType, tasks: Sequence[Tuple[str, str]]
+) -> List[Tuple[Optional[pd.DataFrame], Optional[str]]]:
+    """
+    解析多个工作表 (文件路径, 工作表名称)，多于一个时交给进程池并行执行，结果与 tasks 顺序一致
+    """
+    if len(tasks) == 1:
+        return [parse_sheet(import_type.value, *tasks[0])]
+    executor = get_parse_executor()
+    futures = [executor.submit(parse_sheet, import_type.value, path, sheet) for path, sheet in tasks]
+    return [future.result() for future in futures]
+
+
+def import_batch(
+    db: Session,
+    import_type: ImportType,
+    uploads: Sequence[Tuple[BinaryIO, str]],
+    operator_id: int,
+    options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    批量导入多个Excel文件或 zip 包中的全部工作表，返回导入结果（不提交事务）
+
+    Returns:
+        与同步导入接口一致的结果；errorDetails 中每条错误附带 file 和 sheet，
+        sheets 列出每个工作表的数据行数和无法导入的原因
+
+    Raises:
+        HTTPException: 文件类型不支持或没有可导入的Excel文件
+    """
+    workbooks: List[StoredUpload] = []
+    for file_obj, filename in uploads:
+        workbooks.extend(expand_upload(file_obj, filename))
+    if not workbooks:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="没有可导入的Excel文件"
+        )
+
+    sheets: List[Dict[str, Any]] = []
+    tasks: List[Tuple[str, str]] = []
+    for workbook in workbooks:
+        try:
+            names = list_sheet_names(workbook.path)
+        except Exception as e:
+            error = f"无法读取Excel文件: {str(e)}"
+            sheets.append({"file": workbook.filename, "sheet": None, "rows": 0, "error": error})
+            continue
+        for name in names:
+            sheets.append({"file": workbook.filename, "sheet": name, "rows": 0, "error": None})
+            tasks.append((workbook.path, name))
+
+    # 合并各工作表的数据，记录每行的来源工作表和原始行号
+    parsed = [i for i, entry in enumerate(sheets) if entry["sheet"] is not None]
+    frames, sources, row_numbers = [], [], []
+    for sheet_no, (frame, error) in zip(parsed, parse_sheets(import_type, tasks)):
+        if error is not None:
+            sheets[sheet_no]["error"] = error
+            continue
+        sheets[sheet_no]["rows"] = len(frame)
+        frames.append(frame.reset_index(drop=True))
+        sources.append(np.full(len(frame), sheet_no))
+        row_numbers.append(frame.index.to_numpy())
+    logger.info(f"Parsed {len(tasks)} sheets from {len(workbooks)} files, {sum(map(len, frames))} rows")
+
+    engine = create_import_engine(import_type, db, operator_id, options)
+    if frames:
+        merged = pd.concat(frames, ignore_index=True)
+        for start in range(0, len(merged), settings.IMPORT_CHUNK_SIZE):
+            engine.process(merged.iloc[start:start + settings.IMPORT_CHUNK_SIZE])
+        if engine.total_count:
+            engine.finish()
+
+    # 合并后的行号换算回来源文件、工作表和原始行号
+    result = engine.result()
+    source_of = np.concatenate(sources) if sources else np.empty(0, dtype=int)
+    row_of = np.concatenate(row_numbers) if row_numbers else np.empty(0, dtype=int)
+    error_details = []
+    for detail in sorted(engine.error_details, key=lambda d: d["rowIndex"]):
+        position = detail["rowIndex"] - 2
+        entry = sheets[source_of[position]]
+        error_details.append({
+            "file": entry["file"],
+            "sheet": entry["sheet"],
+            "rowIndex": int(row_of[position]) + 2,
+            "errorMessage": detail["errorMessage"],
+        })
+    result.update(errorDetails=error_details, sheets=sheets)
+    return result
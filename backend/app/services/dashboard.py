@@ -0,0 +1,405 @@
+"""
+看板统计服务
+
+采购订单、库存事务和质检任务的统计通过 app.services.rollup 读取：汇总任务已覆盖的日期读日汇总表，
+之后的日期从明细表实时分组，查询代价随天数而不是明细行数增长。
+
+领导层看板：
+1. 一次查询交叉连接工作流和库存两个条件聚合子查询，取回表头计数；
+2. 一次按 (日期, 大类, 用户单位) 的采购订单统计，合计值、两个分布和按天趋势都由它在内存中汇总；
+3. 一次按 (日期, 任务名称, 处理结果) 的质检任务统计；
+4. 时间范围为 TODAY 时，再按小时分组查询当天订单趋势，缺失的时间段补零。
+
+运营看板的工作流和库存统计各用一次条件聚合，出入库和质检统计读日汇总。
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, true
+from sqlalchemy.orm import Session
+
+from app.models.purchase_order import PurchaseOrder
+from app.models.warehouse import Inventory, InventoryTransactionType
+from app.models.workflow import WorkflowInstance, WorkflowStatus
+from app.services.rollup import order_stats, rollup_complete_until, task_stats, transaction_stats
+
+# 库存预警阈值：数量不超过该值视为库存不足
+LOW_INVENTORY_THRESHOLD = 10
+
+# 工作流超时阈值
+WORKFLOW_TIMEOUT = timedelta(hours=24)
+
+# 质检任务名称
+INSPECTION_TASK = "质检员确认"
+
+
+def dashboard_period(time_range: str, today: date) -> Tuple[date, date]:
+    """
+    根据时间范围计算统计区间 [起始日期, 结束日期]（均包含）
+
+    TODAY 为当天，WEEK 为本周一到周日，其他值按本月处理
+    """
+    if time_range == "TODAY":
+        return today, today
+    if time_range == "WEEK":
+        start_date = today - timedelta(days=today.weekday())
+        return start_date, start_date + timedelta(days=6)
+    start_date = date(today.year, today.month, 1)
+    next_month = date(today.year + 1, 1, 1) if today.month == 12 else date(today.year, today.month + 1, 1)
+    return start_date, next_month - timedelta(days=1)
+
+
+def hour_bucket(column: Any, dialect_name: str) -> Any:
+    """
+    将时间列截断到小时：PostgreSQL 使用 date_trunc，SQLite 使用 strftime
+    """
+    if dialect_name == "postgresql":
+        return func.date_trunc("hour", column)
+    return func.strftime("%Y-%m-%d %H:00:00", column)
+
+
+def hours_between(start: Any, end: Any, dialect_name: str) -> Any:
+    """
+    计算两个时间列相差的小时数：PostgreSQL 使用 extract(epoch)，SQLite 使用 julianday
+    """
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start) / 3600
+    return (func.julianday(end) - func.julianday(start)) * 24
+
+
+def _as_hour(value: Any) -> int:
+    """
+    取出分组键中的小时数（date_trunc 返回 datetime，strftime 返回字符串）
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.hour
+
+
+def _headline_counters(db: Session, start_time: datetime, now: datetime) -> Dict[str, Any]:
+    """
+    一次往返取回工作流和库存表头计数：每张表一个条件聚合子查询，各返回一行，再交叉连接成一行
+    """
+    workflows = db.query(
+        func.count(case((WorkflowInstance.create_time >= start_time, 1))).label("pending"),
+        func.count(case((WorkflowInstance.create_time < now - WORKFLOW_TIMEOUT, 1))).label("timeout"),
+    ).filter(WorkflowInstance.status == WorkflowStatus.RUNNING).subquery()
+
+    inventory = db.query(
+        func.sum(Inventory.total_value).label("value"),
+        func.count(case((Inventory.quantity <= LOW_INVENTORY_THRESHOLD, 1))).label("low"),
+    ).subquery()
+
+    row = db.query(
+        workflows.c.pending,
+        workflows.c.timeout,
+        inventory.c.value,
+        inventory.c.low,
+    ).select_from(workflows).join(inventory, true()).one()
+
+    return {
+        "pending_workflows": row.pending or 0,
+        "timeout_workflows": row.timeout or 0,
+        "inventory_value": row.value or 0,
+        "low_inventory": row.low or 0,
+    }
+
+
+def _inspection_counts(db: Session, complete_until: Optional[date], start_date: Optional[date] = None) -> Tuple[int, int]:
+    """
+    质检任务完成数和通过数
+    """
+    total = passed = 0
+    for _, _, result, count in task_stats(db, complete_until, start_date, task_name=INSPECTION_TASK):
+        total += count
+        if result == "APPROVED":
+            passed += count
+    return total, passed
+
+
+def _order_breakdown(rows: List[Tuple[date, str, str, int, float]]) -> Dict[str, Any]:
+    """
+    由按 (日期, 大类, 用户单位) 分组的订单统计汇总出订单合计、大类分布和用户单位分布
+    """
+    order_count = 0
+    order_amount = 0
+    by_category: Dict[str, List[float]] = {}
+    by_user_unit: Dict[str, List[float]] = {}
+    for _, category, user_unit, count, amount in rows:
+        amount = amount or 0
+        order_count += count
+        order_amount += amount
+        if category:
+            totals = by_category.setdefault(category, [0, 0])
+            totals[0] += count
+            totals[1] += amount
+        if user_unit:
+            totals = by_user_unit.setdefault(user_unit, [0, 0])
+            totals[0] += count
+            totals[1] += amount
+
+    def percentage(count: int) -> float:
+        return count / order_count if order_count > 0 else 0
+
+    return {
+        "order_count": order_count,
+        "order_amount": order_amount,
+        "category_distribution": [
+            {"category": category, "count": count, "amount": amount, "percentage": percentage(count)}
+            for category, (count, amount) in by_category.items()
+        ],
+        "user_unit_distribution": [
+            {"userUnit": user_unit, "count": count, "amount": amount, "percentage": percentage(count)}
+            for user_unit, (count, amount) in by_user_unit.items()
+        ],
+    }
+
+
+def _order_trend(
+    db: Session, time_range: str, start_date: date, end_date: date, rows: List[Tuple[date, str, str, int, float]]
+) -> List[Dict[str, Any]]:
+    """
+    订单趋势，没有数据的时间段补零
+
+    TODAY 按创建时间的小时分组查询，其他范围由按订单生成日期分组的统计汇总
+    """
+    if time_range == "TODAY":
+        day_start = datetime.combine(start_date, datetime.min.time())
+        bucket = hour_bucket(PurchaseOrder.create_time, db.get_bind().dialect.name)
+        hour_rows = db.query(
+            bucket, func.count(PurchaseOrder.id), func.sum(PurchaseOrder.total_amount)
+        ).filter(
+            PurchaseOrder.create_time >= day_start,
+            PurchaseOrder.create_time < day_start + timedelta(days=1),
+        ).group_by(bucket).all()
+
+        by_hour = {_as_hour(key): (count, amount or 0) for key, count, amount in hour_rows}
+        return [
+            {
+                "date": f"{hour:02d}:00",
+                "count": by_hour.get(hour, (0, 0))[0],
+                "amount": by_hour.get(hour, (0, 0))[1],
+            }
+            for hour in range(24)
+        ]
+
+    by_day: Dict[date, List[float]] = {}
+    for order_date, _, _, count, amount in rows:
+        totals = by_day.setdefault(order_date, [0, 0])
+        totals[0] += count
+        totals[1] += amount or 0
+
+    trend = []
+    for offset in range((end_date - start_date).days + 1):
+        current_date = start_date + timedelta(days=offset)
+        count, amount = by_day.get(current_date, (0, 0))
+        trend.append({"date": current_date.strftime("%Y-%m-%d"), "count": count, "amount": amount})
+    return trend
+
+
+def build_leadership_dashboard(db: Session, time_range: str) -> Dict[str, Any]:
+    """
+    构建领导层看板数据（LeadershipDashboardResponse.data）
+    """
+    now = datetime.now()
+    start_date, end_date = dashboard_period(time_range, now.date())
+    start_time = datetime.combine(start_date, datetime.min.time())
+
+    complete_until = rollup_complete_until(db)
+    counters = _headline_counters(db, start_time, now)
+    order_rows = order_stats(db, complete_until, start_date)
+    orders = _order_breakdown(order_rows)
+    order_trend = _order_trend(db, time_range, start_date, end_date, order_rows)
+
+    inspections, passed_inspections = _inspection_counts(db, complete_until, start_date)
+    quality_pass_rate = passed_inspections / inspections if inspections > 0 else 1.0
+
+    # 警报信息
+    alerts = []
+    if counters["timeout_workflows"] > 0:
+        alerts.append({
+            "type": "WORKFLOW_TIMEOUT",
+            "message": f"{counters['timeout_workflows']}个工作流超过24小时未处理",
+            "count": counters["timeout_workflows"],
+            "level": "WARNING"
+        })
+    if counters["low_inventory"] > 0:
+        alerts.append({
+            "type": "LOW_INVENTORY",
+            "message": f"{counters['low_inventory']}种物料库存不足",
+            "count": counters["low_inventory"],
+            "level": "WARNING"
+        })
+
+    return {
+        "orderCount": orders["order_count"],
+        "orderAmount": orders["order_amount"],
+        "pendingWorkflowCount": counters["pending_workflows"],
+        "qualityPassRate": quality_pass_rate,
+        "inventoryValue": counters["inventory_value"],
+        "orderTrend": order_trend,
+        "categoryDistribution": orders["category_distribution"],
+        "userUnitDistribution": orders["user_unit_distribution"],
+        "alerts": alerts
+    }
+
+
+def _workflow_stats(db: Session) -> Dict[str, Any]:
+    """
+    一次按工作流类型分组的查询得到总数、运行中、已完成和平均处理时间
+    """
+    process_hours = hours_between(
+        WorkflowInstance.create_time, WorkflowInstance.update_time, db.get_bind().dialect.name
+    )
+    completed = WorkflowInstance.status == WorkflowStatus.COMPLETED
+    rows = db.query(
+        WorkflowInstance.workflow_type,
+        func.count(WorkflowInstance.id),
+        func.count(case((WorkflowInstance.status == WorkflowStatus.RUNNING, 1))),
+        func.count(case((completed, 1))),
+        func.sum(case((completed, process_hours))),
+        func.count(case((completed, process_hours))),
+        func.avg(process_hours),
+    ).group_by(WorkflowInstance.workflow_type).all()
+
+    total = running = completed_count = timed_count = 0
+    completed_hours = 0.0
+    by_type = []
+    for wf_type, count, running_count, completed_type_count, type_hours, type_timed, avg_time in rows:
+        total += count
+        running += running_count
+        completed_count += completed_type_count
+        # 平均处理时间只统计有更新时间的已完成工作流，与 avg() 忽略 NULL 一致
+        completed_hours += float(type_hours or 0)
+        timed_count += type_timed
+        by_type.append({
+            "type": wf_type,
+            "count": count,
+            "avgTime": float(avg_time) if avg_time else 0
+        })
+
+    return {
+        "total": total,
+        "running": running,
+        "completed": completed_count,
+        "avgProcessTime": completed_hours / timed_count if timed_count > 0 else 0,
+        "byType": by_type
+    }
+
+
+def _storage_stats(db: Session, complete_until: Optional[date]) -> Dict[str, Any]:
+    """
+    按大类分组的库存统计，出入库次数读日汇总
+    """
+    inventory_by_category = []
+    for category, quantity, value in db.query(
+        Inventory.category,
+        func.sum(Inventory.quantity),
+        func.sum(Inventory.total_value)
+    ).group_by(Inventory.category).all():
+        if category:
+            inventory_by_category.append({
+                "category": category,
+                "quantity": float(quantity) if quantity else 0,
+                "value": float(value) if value else 0
+            })
+
+    inbound_count = outbound_count = 0
+    for _, transaction_type, count, _ in transaction_stats(db, complete_until):
+        if transaction_type == InventoryTransactionType.INBOUND:
+            inbound_count += count
+        elif transaction_type == InventoryTransactionType.OUTBOUND:
+            outbound_count += count
+
+    return {
+        # 库位使用率（假设）
+        "locationUsage": 0.75,
+        "inboundCount": inbound_count,
+        "outboundCount": outbound_count,
+        # 周转率
+        "turnoverRate": outbound_count / inbound_count if inbound_count else 0,
+        "byCategory": inventory_by_category
+    }
+
+
+def _quality_stats(db: Session, complete_until: Optional[date]) -> Dict[str, Any]:
+    """
+    质检总数和通过数，读日汇总
+    """
+    inspection_count, pass_count = _inspection_counts(db, complete_until)
+
+    return {
+        "inspectionCount": inspection_count,
+        "passCount": pass_count,
+        "failCount": inspection_count - pass_count,
+        "passRate": pass_count / inspection_count if inspection_count > 0 else 1.0,
+        # 失败原因（假设数据）
+        "failReasons": [
+            {"reason": "规格不符", "count": 5, "percentage": 0.56},
+            {"reason": "质量问题", "count": 3, "percentage": 0.33},
+            {"reason": "其他原因", "count": 1, "percentage": 0.11}
+        ]
+    }
+
+
+def build_operation_dashboard(db: Session) -> Dict[str, Any]:
+    """
+    构建运营看板数据（OperationDashboardResponse.data）
+    """
+    complete_until = rollup_complete_until(db)
+    return {
+        "workflowStats": _workflow_stats(db),
+        "storageStats": _storage_stats(db, complete_until),
+        "qualityStats": _quality_stats(db, complete_until)
+    }
+
+
+def build_daily_report(db: Session, start_date: date, end_date: date) -> Dict[str, Any]:
+    """
+    构建按日汇总报表：每天的订单、出入库和质检统计，以及区间内的大类和用户单位分布
+    """
+    complete_until = rollup_complete_until(db)
+    days: Dict[date, Dict[str, Any]] = {}
+    for offset in range((end_date - start_date).days + 1):
+        current_date = start_date + timedelta(days=offset)
+        days[current_date] = {
+            "date": current_date.strftime("%Y-%m-%d"),
+            "orderCount": 0,
+            "orderAmount": 0,
+            "inboundCount": 0,
+            "inboundQuantity": 0,
+            "outboundCount": 0,
+            "outboundQuantity": 0,
+            "inspectionCount": 0,
+            "passCount": 0,
+        }
+
+    order_rows = order_stats(db, complete_until, start_date, end_date)
+    for order_date, _, _, count, amount in order_rows:
+        days[order_date]["orderCount"] += count
+        days[order_date]["orderAmount"] += amount or 0
+
+    for day, transaction_type, count, quantity in transaction_stats(db, complete_until, start_date, end_date):
+        if transaction_type == InventoryTransactionType.INBOUND:
+            days[day]["inboundCount"] += count
+            days[day]["inboundQuantity"] += quantity or 0
+        elif transaction_type == InventoryTransactionType.OUTBOUND:
+            days[day]["outboundCount"] += count
+            days[day]["outboundQuantity"] += quantity or 0
+
+    for day, _, result, count in task_stats(db, complete_until, start_date, end_date, task_name=INSPECTION_TASK):
+        days[day]["inspectionCount"] += count
+        if result == "APPROVED":
+            days[day]["passCount"] += count
+
+    orders = _order_breakdown(order_rows)
+    return {
+        "startDate": start_date.strftime("%Y-%m-%d"),
+        "endDate": end_date.strftime("%Y-%m-%d"),
+        "orderCount": orders["order_count"],
+        "orderAmount": orders["order_amount"],
+        "days": list(days.values()),
+        "categoryDistribution": orders["category_distribution"],
+        "userUnitDistribution": orders["user_unit_distribution"],
+    }
@@ -0,0 +1,255 @@
+"""
+看板缓存服务
+
+看板数据按 (看板, 时间范围) 序列化后缓存在 Redis 中，过期时间较短：
+1. 读取时命中缓存直接返回；未命中时用 SET NX 抢占互斥锁，只有拿到锁的请求重新计算，
+   其他请求轮询等待结果，避免早高峰缓存失效时所有请求同时打到数据库；
+2. 出库、库存、采购订单和工作流数据写入后调用 publish_dashboard_refresh 发布刷新事件，
+   由消费者在后台重新计算全部看板并覆盖缓存，读请求继续拿到旧数据而不是各自重建；
+   刷新失败时删除缓存，由下一个读请求重新计算，避免到期前一直返回旧数据；
+3. Redis 不可用时退化为直接计算；RabbitMQ 不可用时由本进程的一个后台线程刷新，
+   等待期间和刷新期间到达的事件合并为一次刷新。
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import redis
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.json_encoder import CustomJSONEncoder
+from app.core.redis import get_redis
+from app.services.dashboard import build_leadership_dashboard, build_operation_dashboard
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "dashboard:"
+
+# 最近一次成功的后台刷新的开始时间，早于该时间发布的刷新事件已被覆盖，可以直接跳过
+REFRESHED_AT_KEY = f"{CACHE_KEY_PREFIX}refreshed_at"
+
+# 等待其他请求计算结果时的轮询间隔（秒）
+POLL_INTERVAL = 0.1
+
+# RabbitMQ 不可用时本地刷新前等待的时间（秒），合并连续写入触发的刷新事件
+LOCAL_REFRESH_DELAY = 1.0
+
+# 释放锁时只删除自己持有的锁，避免计算超时后误删其他请求的锁
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# 看板名称 -> (构建函数, 需要预先刷新的时间范围)
+DASHBOARDS: Dict[str, Tuple[Callable[[Session, str], Dict[str, Any]], Tuple[str, ...]]] = {
+    "leadership": (build_leadership_dashboard, ("TODAY", "WEEK", "MONTH")),
+    "operation": (lambda db, time_range: build_operation_dashboard(db), ("ALL",)),
+}
+
+
+def normalize_time_range(name: str, time_range: Optional[str]) -> str:
+    """
+    将时间范围归一为缓存键使用的取值：运营看板不区分时间范围，领导层看板未知取值按本月处理
+    """
+    ranges = DASHBOARDS[name][1]
+    return time_range if time_range in ranges else ranges[-1]
+
+
+def dashboard_cache_key(name: str, time_range: str) -> str:
+    return f"{CACHE_KEY_PREFIX}{name}:{time_range}"
+
+
+def _lock_key(name: str, time_range: str) -> str:
+    return f"{CACHE_KEY_PREFIX}lock:{name}:{time_range}"
+
+
+def _serialize(data: Dict[str, Any]) -> str:
+    return json.dumps(data, cls=CustomJSONEncoder, ensure_ascii=False)
+
+
+def _compute(db: Session, name: str, time_range: str) -> Dict[str, Any]:
+    """
+    计算看板数据，并经过一次序列化，保证与缓存中取出的数据类型一致（如 Decimal 转为 float）
+    """
+    builder = DASHBOARDS[name][0]
+    return json.loads(_serialize(builder(db, time_range)))
+
+
+def _store(client: redis.Redis, name: str, time_range: str, data: Dict[str, Any]) -> None:
+    client.set(dashboard_cache_key(name, time_range), _serialize(data), ex=settings.DASHBOARD_CACHE_TTL)
+
+
+def get_dashboard(
+    db: Session, name: str, time_range: Optional[str] = None, client: Optional[redis.Redis] = None
+) -> Dict[str, Any]:
+    """
+    获取看板数据：优先读缓存，未命中时只有一个请求重新计算
+
+    Args:
+        db: 数据库会话
+        name: 看板名称，leadership 或 operation
+        time_range: 时间范围，TODAY / WEEK / MONTH，运营看板忽略
+        client: Redis 客户端，默认使用全局客户端
+    """
+    client = client or get_redis()
+    time_range = normalize_time_range(name, time_range)
+    key = dashboard_cache_key(name, time_range)
+
+    try:
+        cached = client.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        lock_key = _lock_key(name, time_range)
+        token = uuid.uuid4().hex
+        if client.set(lock_key, token, nx=True, ex=settings.DASHBOARD_CACHE_LOCK_TTL):
+            try:
+                data = _compute(db, name, time_range)
+                _store(client, name, time_range, data)
+                return data
+            finally:
+                client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+        # 其他请求正在计算，等待其结果
+        deadline = time.monotonic() + settings.DASHBOARD_CACHE_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            cached = client.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        logger.warning(f"Timed out waiting for dashboard cache {key}, computing directly")
+    except redis.RedisError as e:
+        logger.warning(f"Dashboard cache unavailable for {key}: {str(e)}")
+
+    return _compute(db, name, time_range)
+
+
+def refresh_dashboards(requested_at: Optional[float] = None, client: Optional[redis.Redis] = None) -> bool:
+    """
+    后台重新计算全部看板并覆盖缓存
+
+    Args:
+        requested_at: 刷新事件的发布时间戳，早于最近一次刷新开始时间的事件直接跳过
+        client: Redis 客户端，默认使用全局客户端
+
+    Returns:
+        是否执行了刷新
+    """
+    from app.db.session import ReportingSessionLocal
+
+    client = client or get_redis()
+    started_at = time.time()
+    last_refresh = client.get(REFRESHED_AT_KEY)
+    if requested_at is not None and last_refresh is not None and requested_at < float(last_refresh):
+        return False
+
+    db = ReportingSessionLocal()
+    try:
+        for name, (_, time_ranges) in DASHBOARDS.items():
+            for time_range in time_ranges:
+                _store(client, name, time_range, _compute(db, name, time_range))
+    finally:
+        db.close()
+    # 全部看板写入后才记录，刷新失败时之前的事件不会被当作已处理
+    client.set(REFRESHED_AT_KEY, started_at, ex=settings.DASHBOARD_CACHE_TTL)
+    logger.info(f"Dashboards refreshed in {time.time() - started_at:.2f}s")
+    return True
+
+
+def publish_dashboard_refresh(source: str) -> None:
+    """
+    数据写入并提交后发布看板刷新事件
+
+    RabbitMQ 不可用时在本进程后台线程中刷新；刷新本身失败时删除缓存，由下一个读请求重新计算。
+
+    Args:
+        source: 触发刷新的数据来源，如 outbound、inventory、purchase、workflow
+    """
+    message = {"source": source, "requestedAt": time.time(), "time": datetime.now().isoformat()}
+    try:
+        from app.core.rabbitmq import publish_message
+        publish_message(settings.DASHBOARD_REFRESH_QUEUE, message)
+        return
+    except Exception as e:
+        logger.warning(f"Failed to publish dashboard refresh event: {str(e)}")
+
+    _schedule_local_refresh(message["requestedAt"])
+
+
+# 本地刷新状态：最新一次未处理事件的发布时间戳，以及后台线程是否在运行
+_local_refresh_lock = threading.Lock()
+_local_refresh_pending: Optional[float] = None
+_local_refresh_running = False
+
+
+def _schedule_local_refresh(requested_at: float) -> None:
+    """
+    登记一次本地刷新，没有后台线程在运行时启动一个
+    """
+    global _local_refresh_pending, _local_refresh_running
+    with _local_refresh_lock:
+        _local_refresh_pending = requested_at
+        if _local_refresh_running:
+            return
+        _local_refresh_running = True
+    threading.Thread(target=_local_refresh_worker, daemon=True).start()
+
+
+def _local_refresh_worker() -> None:
+    """
+    后台刷新线程：等待片刻后处理最新的事件，直到没有新的事件
+    """
+    global _local_refresh_pending, _local_refresh_running
+    while True:
+        time.sleep(LOCAL_REFRESH_DELAY)
+        with _local_refresh_lock:
+            requested_at = _local_refresh_pending
+            _local_refresh_pending = None
+            if requested_at is None:
+                _local_refresh_running = False
+                return
+        try:
+            refresh_or_invalidate(requested_at)
+        except Exception as e:
+            logger.error(f"Local dashboard refresh failed: {str(e)}")
+
+
+def refresh_or_invalidate(requested_at: Optional[float] = None) -> None:
+    """
+    刷新全部看板；失败时删除看板缓存后重新抛出异常
+    """
+    client = get_redis()
+    try:
+        refresh_dashboards(requested_at, client)
+    except Exception:
+        try:
+            client.delete(*[
+                dashboard_cache_key(name, time_range)
+                for name, (_, time_ranges) in DASHBOARDS.items()
+                for time_range in time_ranges
+            ])
+        except redis.RedisError:
+            pass
+        raise
+
+
+_refresh_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_refresh_executor() -> ThreadPoolExecutor:
+    """
+    获取看板刷新线程池（首次使用时创建）；只有一个线程，刷新事件依次处理，已被覆盖的事件直接跳过
+    """
+    global _refresh_executor
+    if _refresh_executor is None:
+        _refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dashboard-refresh")
+    return _refresh_executor
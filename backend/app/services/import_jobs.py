@@ -0,0 +1,363 @@
+"""
+导入任务服务
+
+上传的文件先按内容哈希落盘并立即返回任务ID，解析和入库在后台工作进程池（或通过 RabbitMQ 分发的消费者）中执行。
+同一文件已导入过时直接返回之前的结果（见 app/services/upload_store.py）。
+任务状态保存在 Redis 哈希表中，供 /imports/{job_id} 轮询进度。
+执行中的任务由工作进程定期刷新心跳时间（heartbeatAt），工作进程被杀死或进程池损坏后心跳超时，
+任务可被重新投递的消息再次领取；查询状态时仍超时的任务标记为失败，不会一直停留在处理中。
+"""
+
+import enum
+import logging
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+
+import redis
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.redis import get_hash_all, get_redis, set_hash_fields
+from app.services.upload_store import (
+    StoredUpload,
+    claim_upload,
+    find_duplicate_import,
+    previous_result,
+    record_import_result,
+    store_upload,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY_PREFIX = "import_job:"
+
+# 任务为排队中、或处理中但心跳早于 ARGV[5] 时改为处理中并记录领取时间，
+# 保证重复投递的消息或重复提交不会再次执行仍在运行的任务
+CLAIM_JOB_SCRIPT = """
+local status = redis.call("hget", KEYS[1], "status")
+local heartbeat = tonumber(redis.call("hget", KEYS[1], "heartbeatAt") or "0") or 0
+if status == ARGV[1] or (status == ARGV[2] and heartbeat < tonumber(ARGV[5])) then
+    redis.call("hset", KEYS[1], "status", ARGV[2], "updateTime", ARGV[3], "claimedAt", ARGV[4], "heartbeatAt", ARGV[4])
+    return 1
+end
+return 0
+"""
+
+# 任务仍为处理中且心跳早于 ARGV[2] 时标记为失败
+EXPIRE_JOB_SCRIPT = """
+local heartbeat = tonumber(redis.call("hget", KEYS[1], "heartbeatAt") or "0") or 0
+if redis.call("hget", KEYS[1], "status") == ARGV[1] and heartbeat < tonumber(ARGV[2]) then
+    redis.call("hset", KEYS[1], "status", ARGV[3], "error", ARGV[4], "updateTime", ARGV[5])
+    return 1
+end
+return 0
+"""
+
+
+class ImportJobStatus(str, enum.Enum):
+    """导入任务状态枚举"""
+    PENDING = "PENDING"  # 排队中
+    RUNNING = "RUNNING"  # 处理中
+    COMPLETED = "COMPLETED"  # 已完成
+    FAILED = "FAILED"  # 失败
+
+
+class ImportType(str, enum.Enum):
+    """导入类型枚举"""
+    OUTBOUND = "outbound"  # 出库单
+    PURCHASE = "purchase"  # 采购订单
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _job_key(job_id: str) -> str:
+    return f"{JOB_KEY_PREFIX}{job_id}"
+
+
+def _init_worker() -> None:
+    """
+    工作进程初始化：丢弃从父进程继承的数据库连接
+    """
+    from app.db.session import dispose_engines
+    dispose_engines(close=False)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    获取本地导入进程池（首次使用时创建）
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.IMPORT_JOB_WORKERS, initializer=_init_worker)
+    return _executor
+
+
+def update_import_job(job_id: str, **fields: Any) -> bool:
+    """
+    更新导入任务状态字段
+    """
+    fields["updateTime"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return set_hash_fields(_job_key(job_id), fields, expire=settings.IMPORT_JOB_TTL)
+
+
+def create_import_job(
+    import_type: ImportType,
+    file_obj: BinaryIO,
+    filename: str,
+    operator_id: int,
+    options: Optional[Dict[str, Any]] = None,
+    force: bool = False,
+) -> Tuple[str, str]:
+    """
+    保存上传文件并创建导入任务
+
+    同一文件已导入过时（force 为 False）直接创建已完成的任务，结果为之前的导入结果，不需要提交执行。
+
+    Returns:
+        (任务ID, 任务状态)
+    """
+    from app.db.session import SessionLocal
+
+    job_id = uuid.uuid4().hex
+    stored = store_upload(file_obj, filename)
+    fields: Dict[str, Any] = dict(
+        jobId=job_id,
+        importType=import_type.value,
+        status=ImportJobStatus.PENDING.value,
+        filename=filename,
+        filePath=stored.path,
+        fileHash=stored.sha256,
+        fileSize=stored.size,
+        operatorId=operator_id,
+        options=options or {},
+        rowsProcessed=0,
+        totalRows=0,
+        errorCount=0,
+        errorDetails=[],
+        createTime=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+    db = SessionLocal()
+    try:
+        record = find_duplicate_import(db, import_type.value, stored.sha256, options, force)
+        if record is not None:
+            logger.info(f"Duplicate {import_type.value} upload {stored.sha256}, returning import {record.import_id}")
+            fields.update(_completed_fields(previous_result(record)), duplicate=True)
+    finally:
+        db.close()
+
+    if not update_import_job(job_id, **fields):
+        raise RuntimeError("无法保存导入任务状态，请检查 Redis 连接")
+    return job_id, fields["status"]
+
+
+def _completed_fields(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    已完成任务的状态字段
+    """
+    return dict(
+        status=ImportJobStatus.COMPLETED.value,
+        totalRows=result["totalCount"],
+        rowsProcessed=result["totalCount"],
+        successCount=result["successCount"],
+        errorCount=result["errorCount"],
+        errorDetails=result["errorDetails"][:settings.IMPORT_JOB_MAX_ERROR_DETAILS],
+        importId=result["importId"],
+    )
+
+
+def claim_import_job(job_id: str) -> bool:
+    """
+    将排队中或心跳已超时的处理中任务标记为处理中，任务正在执行或已结束时返回 False
+    """
+    now = time.time()
+    try:
+        claimed = get_redis().eval(
+            CLAIM_JOB_SCRIPT, 1, _job_key(job_id), ImportJobStatus.PENDING.value, ImportJobStatus.RUNNING.value,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"), now, now - settings.IMPORT_JOB_HEARTBEAT_TIMEOUT,
+        )
+    except redis.RedisError as e:
+        logger.error(f"Failed to claim import job {job_id}: {str(e)}")
+        return False
+    return bool(claimed)
+
+
+def get_import_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    获取导入任务状态，任务不存在时返回 None；处理中但心跳已超时的任务标记为失败后返回
+    """
+    job = get_hash_all(_job_key(job_id))
+    if job.get("status") == ImportJobStatus.RUNNING.value and _heartbeat_expired(job) and expire_import_job(job_id):
+        job = get_hash_all(_job_key(job_id))
+    return job or None
+
+
+def _heartbeat_expired(job: Dict[str, Any]) -> bool:
+    try:
+        heartbeat = float(job.get("heartbeatAt") or 0)
+    except (TypeError, ValueError):
+        heartbeat = 0
+    return heartbeat < time.time() - settings.IMPORT_JOB_HEARTBEAT_TIMEOUT
+
+
+def expire_import_job(job_id: str) -> bool:
+    """
+    将心跳已超时的处理中任务标记为失败，任务已恢复心跳或已结束时返回 False
+    """
+    try:
+        expired = get_redis().eval(
+            EXPIRE_JOB_SCRIPT, 1, _job_key(job_id), ImportJobStatus.RUNNING.value,
+            time.time() - settings.IMPORT_JOB_HEARTBEAT_TIMEOUT, ImportJobStatus.FAILED.value,
+            "导入任务处理进程已停止，请重新上传文件", datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        )
+    except redis.RedisError as e:
+        logger.error(f"Failed to expire import job {job_id}: {str(e)}")
+        return False
+    if expired:
+        logger.warning(f"Import job {job_id} heartbeat timed out, marked as failed")
+    return bool(expired)
+
+
+@contextmanager
+def _job_heartbeat(job_id: str):
+    """
+    任务执行期间由后台线程定期刷新心跳时间，与分块处理的耗时无关
+    """
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(settings.IMPORT_JOB_HEARTBEAT_INTERVAL):
+            set_hash_fields(_job_key(job_id), {"heartbeatAt": time.time()}, expire=settings.IMPORT_JOB_TTL)
+
+    thread = threading.Thread(target=beat, name=f"import-job-heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def submit_import_job(job_id: str) -> None:
+    """
+    将导入任务交给后台执行
+    """
+    if settings.IMPORT_JOB_BACKEND == "rabbitmq":
+        from app.core.rabbitmq import publish_message
+        publish_message(settings.IMPORT_JOB_QUEUE, {"jobId": job_id})
+    else:
+        get_executor().submit(run_import_job, job_id)
+
+
+def open_import_reader(import_type: ImportType, path: str, sheet: Union[int, str] = 0):
+    """
+    按导入类型打开分块读取器（默认读取第一个工作表）
+
+    Raises:
+        HTTPException: 无法读取文件或缺少必要的列
+    """
+    if import_type == ImportType.OUTBOUND:
+        from app.services.outbound_import import open_outbound_reader
+        return open_outbound_reader(path, sheet=sheet)
+    from app.services.purchase_import import open_purchase_reader
+    return open_purchase_reader(path, sheet=sheet)
+
+
+def create_import_engine(
+    import_type: ImportType, db, operator_id: int, options: Optional[Dict[str, Any]] = None, dry_run: bool = False
+):
+    """
+    按导入类型创建导入引擎，dry_run 时只校验不写入；options 中的 importMode 为导入模式（默认 insert）
+    """
+    from app.services.outbound_import import ImportMode
+    options = options or {}
+    mode = ImportMode(options.get("importMode") or ImportMode.INSERT)
+    if import_type == ImportType.OUTBOUND:
+        from app.services.outbound_import import OutboundImportEngine
+        return OutboundImportEngine(db, operator_id, options.get("purchaseOrderNo", ""), dry_run=dry_run, mode=mode)
+    from app.services.purchase_import import PurchaseImportEngine
+    return PurchaseImportEngine(db, dry_run=dry_run, mode=mode)
+
+
+def _open_reader_and_create_engine(job: Dict[str, Any], db):
+    """
+    根据导入类型打开分块读取器并创建导入引擎
+    """
+    import_type = ImportType(job["importType"])
+    reader = open_import_reader(import_type, job["filePath"])
+    engine = create_import_engine(import_type, db, int(job["operatorId"]), job.get("options"))
+    return reader, engine
+
+
+def run_import_job(job_id: str) -> Dict[str, Any]:
+    """
+    执行导入任务：分块读取文件并在每块处理后更新进度，全部成功后提交事务
+
+    Returns:
+        导入结果，与同步导入接口的 data 一致
+    """
+    from app.db.session import BulkSessionLocal
+
+    # 先领取再读取任务，读取时不会把待重新领取的超时任务标记为失败
+    if not claim_import_job(job_id):
+        logger.info(f"Import job {job_id} is missing, finished or still running, skipping")
+        return {}
+
+    job = get_import_job(job_id)
+    if not job:
+        logger.error(f"Import job {job_id} not found")
+        return {}
+
+    max_errors = settings.IMPORT_JOB_MAX_ERROR_DETAILS
+    with _job_heartbeat(job_id):
+        db = BulkSessionLocal()
+        try:
+            if job.get("fileHash"):
+                claim_upload(db, job["importType"], job["fileHash"], job.get("options"))
+            reader, engine = _open_reader_and_create_engine(job, db)
+            with reader:
+                update_import_job(job_id, totalRows=reader.total_rows or 0)
+                for chunk in reader:
+                    engine.process(chunk)
+                    update_import_job(
+                        job_id,
+                        rowsProcessed=reader.rows_read,
+                        errorCount=engine.error_count,
+                        errorDetails=engine.error_details[:max_errors],
+                    )
+
+            engine.finish()
+            result = engine.result()
+            if job.get("fileHash"):
+                stored = StoredUpload(job["fileHash"], job["filePath"], int(job.get("fileSize") or 0), job["filename"])
+                result = record_import_result(
+                    db, job["importType"], stored, result, int(job["operatorId"]), job.get("options")
+                )
+            if result.get("duplicate"):
+                # 同一文件已由并发的导入先提交，本次写入已回滚
+                update_import_job(job_id, **_completed_fields(result), duplicate=True)
+                return result
+            db.commit()
+
+            from app.services.dashboard_cache import publish_dashboard_refresh
+            publish_dashboard_refresh(job["importType"])
+
+            update_import_job(job_id, **_completed_fields(result))
+            logger.info(f"Import job {job_id} completed: {result['importId']}")
+            return result
+        except Exception as e:
+            db.rollback()
+            message = e.detail if isinstance(e, HTTPException) else f"导入失败: {str(e)}"
+            logger.error(f"Import job {job_id} failed: {str(e)}")
+            logger.error(traceback.format_exc())
+            update_import_job(job_id, status=ImportJobStatus.FAILED.value, error=message)
+            return {}
+        finally:
+            db.close()
@@ -0,0 +1,221 @@
+"""
+两阶段导入：预览（解析并校验）后提交
+
+预览时读取一次 Excel，用 dry_run 导入引擎完成与正式导入相同的校验（凭证/订单号是否已存在、库存提示），
+并把读取器输出的每块行（已统一列名、去除空行，索引为原始数据行号）依次追加到 IMPORT_PREVIEW_DIR/<token>.pkl：
+首条记录为预览信息，之后每块一条。提交时逐块读出交给导入引擎写入，不再读取 Excel，
+预览和提交的内存占用都只与块大小有关；数据库校验在提交时按当时的数据重新执行。
+
+缓存使用 pickle 而不是 Parquet：Excel 编码类列常混有数字和文本单元格，
+Arrow 需要统一列类型，转换会改变导入引擎看到的单元格值。
+缓存超过 IMPORT_PREVIEW_TTL 后失效，过期文件在下次预览时清理。
+"""
+
+import logging
+import os
+import pickle
+import re
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.import_jobs import ImportType, create_import_engine, open_import_reader
+from app.services.upload_store import (
+    StoredUpload,
+    claim_upload,
+    find_duplicate_import,
+    previous_result,
+    record_import_result,
+    store_upload,
+)
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_SUFFIX = ".pkl"
+TOKEN_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def _preview_path(token: str) -> str:
+    return os.path.join(settings.IMPORT_PREVIEW_DIR, f"{token}{PREVIEW_SUFFIX}")
+
+
+def purge_expired_previews() -> int:
+    """
+    删除超过有效期的预览缓存，返回删除的文件数
+    """
+    if not os.path.isdir(settings.IMPORT_PREVIEW_DIR):
+        return 0
+    deadline = time.time() - settings.IMPORT_PREVIEW_TTL
+    removed = 0
+    for entry in os.scandir(settings.IMPORT_PREVIEW_DIR):
+        if entry.name.endswith(PREVIEW_SUFFIX) and entry.stat().st_mtime < deadline:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+@contextmanager
+def _preview_writer(token: str) -> Iterator[Callable[[Any], None]]:
+    """
+    逐条追加写入预览缓存：先写临时文件，正常结束后改名，提交时不会读到写了一半的缓存
+    """
+    os.makedirs(settings.IMPORT_PREVIEW_DIR, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=settings.IMPORT_PREVIEW_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            yield lambda record: pickle.dump(record, target, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, _preview_path(token))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _read_records(path: str) -> Iterator[Any]:
+    """
+    依次读出预览缓存中的记录
+    """
+    with open(path, "rb") as source:
+        while True:
+            try:
+                yield pickle.load(source)
+            except EOFError:
+                return
+
+
+def preview_import(
+    db: Session,
+    import_type: ImportType,
+    file_obj: BinaryIO,
+    filename: str,
+    operator_id: int,
+    options: Optional[Dict[str, Any]] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    解析并校验上传文件，缓存解析结果，返回预览令牌和校验结果（不写入业务数据）
+
+    同一文件已导入过时（force 为 False）直接返回之前的导入结果，不生成预览。
+
+    Raises:
+        HTTPException: 无法读取文件、缺少必要的列或没有有效数据
+    """
+    purge_expired_previews()
+    stored = store_upload(file_obj, filename)
+    record = find_duplicate_import(db, import_type.value, stored.sha256, options, force)
+    if record is not None:
+        logger.info(f"Duplicate {import_type.value} upload {stored.sha256}, returning import {record.import_id}")
+        return previous_result(record)
+
+    engine = create_import_engine(import_type, db, operator_id, options, dry_run=True)
+    token = uuid.uuid4().hex
+    created = time.time()
+    rows = 0
+    with _preview_writer(token) as write:
+        write({
+            "importType": import_type.value,
+            "operatorId": operator_id,
+            "options": options or {},
+            "force": force,
+            "upload": stored._asdict(),
+            "createdAt": created,
+        })
+        with open_import_reader(import_type, stored.path) as reader:
+            for chunk in reader:
+                engine.process(chunk)
+                write(chunk)
+                rows += len(chunk)
+        engine.finish()
+    logger.info(f"Cached {rows} {import_type.value} rows for preview {token}")
+
+    result = engine.result()
+    return {
+        "token": token,
+        "expireTime": datetime.fromtimestamp(created + settings.IMPORT_PREVIEW_TTL).strftime("%Y-%m-%d %H:%M:%S"),
+        "totalCount": result["totalCount"],
+        "validCount": result["successCount"],
+        "errorCount": result["errorCount"],
+        "errorDetails": result["errorDetails"],
+    }
+
+
+def load_preview(token: str, operator_id: int) -> Tuple[Dict[str, Any], Iterator[pd.DataFrame]]:
+    """
+    加载预览缓存，只能由创建预览的用户加载
+
+    Returns:
+        (预览信息, 按块读出缓存行的迭代器)，迭代器用完或不再需要时调用 close()
+
+    Raises:
+        HTTPException: 预览不存在、已过期或不属于当前用户
+    """
+    not_found = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="导入预览不存在或已过期，请重新上传文件"
+    )
+    if not TOKEN_PATTERN.match(token or ""):
+        raise not_found
+    records = _read_records(_preview_path(token))
+    try:
+        payload = next(records)
+    except (FileNotFoundError, StopIteration):
+        raise not_found
+    if payload["operatorId"] != operator_id or time.time() - payload["createdAt"] > settings.IMPORT_PREVIEW_TTL:
+        records.close()
+        raise not_found
+    return payload, records
+
+
+def commit_preview(db: Session, token: str, operator_id: int) -> Tuple[ImportType, Dict[str, Any]]:
+    """
+    将预览缓存的数据写入数据库并记录导入结果（不提交事务），调用方提交后应调用 discard_preview() 删除缓存
+
+    Returns:
+        (导入类型, 与同步导入接口 data 一致的导入结果)
+
+    Raises:
+        HTTPException: 预览不存在或已过期、没有有效数据
+    """
+    payload, chunks = load_preview(token, operator_id)
+    import_type = ImportType(payload["importType"])
+    stored = StoredUpload(**payload["upload"])
+
+    try:
+        # 预览后同一文件可能已经通过其他方式导入
+        claim_upload(db, import_type.value, stored.sha256, payload["options"])
+        record = find_duplicate_import(db, import_type.value, stored.sha256, payload["options"], payload["force"])
+        if record is not None:
+            return import_type, previous_result(record)
+
+        engine = create_import_engine(import_type, db, operator_id, payload["options"])
+        for chunk in chunks:
+            engine.process(chunk)
+        engine.finish()
+    finally:
+        chunks.close()
+
+    return import_type, record_import_result(
+        db, import_type.value, stored, engine.result(), operator_id, payload["options"]
+    )
+
+
+def discard_preview(token: str) -> None:
+    """
+    删除预览缓存
+    """
+    if TOKEN_PATTERN.match(token or ""):
+        try:
+            os.remove(_preview_path(token))
+        except FileNotFoundError:
+            pass
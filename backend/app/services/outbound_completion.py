@@ -0,0 +1,117 @@
+"""
+出库完成服务
+
+完成出库单时按集合处理全部出库项：
+1. 锁定出库单行，避免同一出库单被并发完成两次；
+2. 用一条 SELECT ... FOR UPDATE 按 id 顺序锁定涉及的全部库存行，并发完成的出库单总是
+   以相同顺序加锁，不会互相死锁；
+3. 校验库存后用一条 UPDATE ... SET quantity = quantity - CASE ... 原子扣减，
+   库存事务记录一次批量插入。
+"""
+
+from collections import defaultdict
+from typing import Dict, List
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models.outbound import OutboundOrder, OutboundItem, OutboundStatus
+from app.models.warehouse import Inventory, InventoryTransaction, InventoryTransactionType
+
+
+def _lock_inventories(db: Session, material_codes: List[str]) -> Dict[str, Inventory]:
+    """
+    按 id 顺序锁定物料编码对应的库存行，同一物料有多条库存时取 id 最小的一条
+    """
+    inventories: Dict[str, Inventory] = {}
+    rows = db.query(Inventory).filter(
+        Inventory.material_code.in_(material_codes)
+    ).order_by(Inventory.id).with_for_update().all()
+    for inventory in rows:
+        inventories.setdefault(inventory.material_code, inventory)
+    return inventories
+
+
+def complete_outbound_order(db: Session, order_id: int, operator_id: int) -> OutboundOrder:
+    """
+    完成出库单：扣减库存、写入库存事务并更新出库单状态，不提交事务
+
+    Args:
+        db: 数据库会话
+        order_id: 出库单ID
+        operator_id: 操作人ID
+
+    Returns:
+        已完成的出库单
+    """
+    # 查找并锁定出库单
+    order = db.query(OutboundOrder).filter(OutboundOrder.id == order_id).with_for_update().first()
+    if not order:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"出库单 {order_id} 不存在"
+        )
+
+    # 检查状态
+    if order.status != OutboundStatus.PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"出库单 {order_id} 不是待处理状态"
+        )
+
+    # 获取出库项
+    items = db.query(
+        OutboundItem.material_code, OutboundItem.actual_quantity
+    ).filter(OutboundItem.outbound_id == order_id).order_by(OutboundItem.id).all()
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"出库单 {order_id} 没有出库项"
+        )
+
+    # 同一物料的多个出库项合并扣减
+    required: Dict[str, float] = defaultdict(float)
+    for material_code, quantity in items:
+        required[material_code] += quantity
+
+    inventories = _lock_inventories(db, list(required))
+    for material_code, quantity in required.items():
+        inventory = inventories.get(material_code)
+        if not inventory:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"物料 {material_code} 不存在库存记录"
+            )
+        if inventory.quantity < quantity:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"物料 {material_code} 库存不足，当前库存: {inventory.quantity}"
+            )
+
+    # 原子扣减库存，总价值按扣减后的数量重新计算
+    deltas = {inventories[material_code].id: quantity for material_code, quantity in required.items()}
+    delta = case(deltas, value=Inventory.id, else_=0)
+    db.query(Inventory).filter(Inventory.id.in_(list(deltas))).update({
+        Inventory.quantity: Inventory.quantity - delta,
+        Inventory.total_value: (Inventory.quantity - delta) * func.coalesce(Inventory.unit_price, 0),
+    }, synchronize_session=False)
+
+    # 批量创建库存事务记录，每个出库项一条
+    db.bulk_insert_mappings(InventoryTransaction, [
+        {
+            "inventory_id": inventories[material_code].id,
+            "transaction_type": InventoryTransactionType.OUTBOUND,
+            "quantity": quantity,
+            "reference_no": order.material_voucher,
+            "reference_type": "出库单",
+            "operator_id": operator_id,
+            "remark": f"出库操作，物料凭证: {order.material_voucher}",
+        }
+        for material_code, quantity in items
+    ])
+
+    # 更新出库单状态
+    order.status = OutboundStatus.COMPLETED
+    db.add(order)
+    return order
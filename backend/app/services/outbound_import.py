@@ -0,0 +1,585 @@
+"""
+出库单批量导入引擎
+
+类型转换、默认值填充和金额计算均以整列 pandas 运算完成；
+凭证存在性检查和库存检查各只发一次集合查询，出库单和出库项使用批量插入写入。
+
+导入模式（ImportMode）：
+- insert：只新增，数据库中已存在的物料凭证记为错误；
+- upsert：已存在且未处理的出库单用 INSERT ... ON CONFLICT 更新表头，出库项与数据库现有记录做集合对比，
+  只删除和写入有变化的行；
+- replace：已存在且未处理的出库单更新表头，删除其全部出库项后按文件重新写入。
+"""
+
+import enum
+import logging
+import time
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.metrics import counter, gauge, histogram
+from app.db.bulk import delete_children, reconcile_children, upsert_returning
+from app.models.outbound import OutboundOrder, OutboundItem, OutboundStatus
+from app.models.warehouse import Inventory
+from app.utils.data_processing import get_engine
+from app.utils.dates import normalize_date_column
+from app.utils.csv_reader import CsvChunkReader
+from app.utils.excel import ExcelChunkReader, open_chunk_reader
+
+logger = logging.getLogger(__name__)
+
+# 出库Excel必需的列
+OUTBOUND_REQUIRED_COLUMNS = ["物料凭证", "物料编码", "实拨数量", "具体用料部门"]
+
+# IN 子句单批最大参数个数，兼容 SQLite 的参数数量限制
+IN_CLAUSE_BATCH_SIZE = 500
+
+# upsert / replace 时更新的出库单表头字段（状态保持为待处理）
+ORDER_UPDATE_COLUMNS = [
+    "voucher_date", "department", "user_unit", "document_type", "total_amount", "issue_date",
+    "sales_amount", "transfer_order", "management_fee_rate", "material_category", "operator_id",
+]
+
+# upsert 时比较出库项是否变化的字段
+ITEM_COMPARE_COLUMNS = [
+    "material_code", "material_description", "unit", "actual_quantity", "outbound_price",
+    "material_category_code", "project_code", "requested_quantity", "outbound_amount",
+    "purchase_order_no", "remark",
+]
+
+
+IMPORT_ROWS = counter("import_rows_total", "导入的数据行数", ["import_type", "result"])
+IMPORT_SECONDS = histogram(
+    "import_duration_seconds", "导入耗时（秒，从创建导入引擎到 finish()）", ["import_type"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+IMPORT_ROWS_PER_SECOND = gauge("import_rows_per_second", "最近一次导入的处理速度（行/秒）", ["import_type"])
+
+
+def record_import_metrics(import_type: str, success_count: int, error_count: int, elapsed: float) -> None:
+    """
+    记录一次导入的行数、耗时和处理速度（dry_run 预览不记录）
+    """
+    IMPORT_ROWS.inc(success_count, import_type=import_type, result="success")
+    IMPORT_ROWS.inc(error_count, import_type=import_type, result="error")
+    IMPORT_SECONDS.observe(elapsed, import_type=import_type)
+    if elapsed > 0:
+        IMPORT_ROWS_PER_SECOND.set((success_count + error_count) / elapsed, import_type=import_type)
+
+
+class ImportMode(str, enum.Enum):
+    """导入模式枚举"""
+    INSERT = "insert"  # 只新增，已存在的单据记为错误
+    UPSERT = "upsert"  # 覆盖未处理的已存在单据，只增删有变化的明细行
+    REPLACE = "replace"  # 覆盖未处理的已存在单据，删除全部明细后重新写入
+
+
+def outbound_column_renames(columns: Iterable[str]) -> Dict[str, str]:
+    """
+    修复因编码问题损坏的常见列名，返回需要重命名的列
+    """
+    renames = {}
+    for col in columns:
+        if '\ufffd' in col or '\u0000' in col:  # 检测替换字符，表示编码问题
+            logger.warning(f"Detected encoding issue in column name: {col}")
+            if '物料' in col or '凭证' in col:
+                renames[col] = '物料凭证'
+            elif '开单' in col or '日期' in col:
+                renames[col] = '开单日期'
+    return renames
+
+
+def check_outbound_columns(columns: Iterable[str]) -> None:
+    """
+    验证必要的列是否存在
+
+    Raises:
+        HTTPException: 缺少必要的列
+    """
+    columns = set(columns)
+    missing_columns = [col for col in OUTBOUND_REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        logger.error(f"Missing required columns: {missing_columns}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Excel文件缺少必要的列: {', '.join(missing_columns)}"
+        )
+
+
+def open_outbound_reader(
+    source: Union[str, BinaryIO], chunk_size: Optional[int] = None, sheet: Union[int, str] = 0
+) -> Union[ExcelChunkReader, CsvChunkReader]:
+    """
+    打开出库Excel或CSV文件的分块读取器，修复列名并验证必要的列
+
+    Raises:
+        HTTPException: 无法读取文件或缺少必要的列
+    """
+    try:
+        reader = open_chunk_reader(source, chunk_size, sheet)
+    except Exception as excel_error:
+        logger.error(f"Error reading Excel file: {str(excel_error)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法读取Excel文件: {str(excel_error)}"
+        )
+    reader.rename_columns(outbound_column_renames(reader.columns))
+    try:
+        check_outbound_columns(reader.columns)
+    except HTTPException:
+        reader.close()
+        raise
+    return reader
+
+
+def chunked(values: List[Any], size: int = IN_CLAUSE_BATCH_SIZE) -> Iterable[List[Any]]:
+    """
+    将列表按固定大小切分，用于拆分过长的 IN 子句
+    """
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def normalize_code_column(series: pd.Series) -> pd.Series:
+    """
+    整列规范化编码类字段（物料编码、物料凭证）
+
+    - 数字单元格转换为整数字符串（去除小数点）
+    - 科学计数法字符串（如 "1.23e+10"）转换为整数字符串
+    - 其他字符串去除前后空格，空值转换为空字符串
+    """
+    is_text = series.map(lambda value: isinstance(value, str))
+    numeric = pd.to_numeric(series.where(~is_text), errors="coerce")
+    numeric_mask = numeric.notna() & np.isfinite(numeric)
+
+    text = series.where(series.notna(), "").astype(str).str.strip()
+    text[numeric_mask] = numeric[numeric_mask].astype("int64").astype(str)
+
+    scientific_mask = is_text & text.str.contains(r"^[0-9.]+[eE]\+[0-9]+$", regex=True)
+    if scientific_mask.any():
+        scientific = pd.to_numeric(text[scientific_mask], errors="coerce")
+        converted = scientific.notna()
+        text.loc[scientific[converted].index] = scientific[converted].astype("int64").astype(str)
+
+    return text
+
+
+def _numeric_column(df: pd.DataFrame, column: str) -> pd.Series:
+    """
+    整列转换为浮点数，空值和无法解析的值返回 NaN
+    """
+    if column not in df.columns:
+        return pd.Series(np.nan, index=df.index, dtype="float64")
+    values = df[column]
+    if values.dtype == object:
+        values = values.where(~values.map(lambda value: isinstance(value, str) and value.strip() == ""))
+    return pd.to_numeric(values, errors="coerce").astype("float64")
+
+
+def _text_column(df: pd.DataFrame, column: str, default: Any = "") -> pd.Series:
+    """
+    整列转换为去除空格的字符串，空值使用默认值（可以是标量或等长 Series）填充
+    """
+    if column not in df.columns:
+        if isinstance(default, pd.Series):
+            return default.copy()
+        return pd.Series(default, index=df.index, dtype=object)
+    values = df[column]
+    text = values.where(values.notna(), "").astype(str).str.strip()
+    return text.where(text != "", default)
+
+
+def _date_column(df: pd.DataFrame, column: str, default: Optional[date], field_name: str) -> pd.Series:
+    """
+    整列解析日期字段，列不存在时全部使用默认值
+    """
+    if column not in df.columns:
+        return pd.Series([default] * len(df), index=df.index, dtype=object)
+    return normalize_date_column(df[column], default, field_name)
+
+
+class OutboundImportEngine:
+    """
+    出库单批量导入引擎
+
+    可以对同一个引擎多次调用 process() 分批导入（例如按块读取的大文件），
+    跨批次出现的同一物料凭证会追加到已创建的出库单上。所有批次处理完成后调用 finish()，
+    再由调用方提交事务。
+
+    dry_run 为 True 时只做校验（包括凭证和库存查询），不写入数据库，用于导入预览。
+    mode 为 upsert / replace 时覆盖数据库中已存在且状态为待处理的出库单，已处理的出库单记为错误。
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        operator_id: int,
+        purchase_order_no: str = "",
+        dry_run: bool = False,
+        mode: ImportMode = ImportMode.INSERT,
+    ):
+        self.db = db
+        self.operator_id = operator_id
+        self.purchase_order_no = (purchase_order_no or "").strip()
+        self.dry_run = dry_run
+        self.mode = ImportMode(mode)
+        self.frame_engine = get_engine()
+        self.started = time.perf_counter()
+
+        self.total_count = 0
+        self.success_count = 0
+        self.error_count = 0
+        self.error_details: List[Dict[str, Any]] = []
+
+        # 本次导入创建的出库单：物料凭证 -> ID（dry_run 时为 None） / 累计金额
+        self._order_ids: Dict[str, int] = {}
+        self._order_totals: Dict[str, float] = {}
+        # 跨批次追加过出库项、需要在 finish() 中回写合计金额的凭证
+        self._dirty_totals: set = set()
+        # 被覆盖的已存在凭证；upsert 时其出库项暂存到 finish() 中统一与数据库对比
+        self._overwritten: set = set()
+        self._pending_items: List[pd.DataFrame] = []
+        self._item_changes = {"inserted": 0, "deleted": 0, "unchanged": 0}
+
+    def _add_errors(self, rows: pd.DataFrame, messages: Any, counted: bool = True) -> None:
+        """
+        批量记录行级错误，messages 可以是单个字符串或与 rows 等长的 Series
+        """
+        if rows.empty:
+            return
+        if isinstance(messages, str):
+            messages = pd.Series(messages, index=rows.index)
+        row_indexes = (rows.index.to_series() + 2).astype(int)  # Excel行号从1开始，标题占一行
+        self.error_details.extend(
+            {"rowIndex": row_index, "errorMessage": message}
+            for row_index, message in zip(row_indexes.tolist(), messages.tolist())
+        )
+        if counted:
+            self.error_count += len(rows)
+
+    def _existing_vouchers(self, vouchers: List[str]) -> Dict[str, OutboundStatus]:
+        """
+        一次集合查询找出数据库中已存在的物料凭证及其出库单状态
+        """
+        existing = {}
+        for batch in chunked(vouchers):
+            rows = self.db.query(OutboundOrder.material_voucher, OutboundOrder.status).filter(
+                OutboundOrder.material_voucher.in_(batch)
+            ).all()
+            existing.update(rows)
+        return existing
+
+    def _reject_existing(self, df: pd.DataFrame, existing: Dict[str, OutboundStatus]) -> pd.DataFrame:
+        """
+        按导入模式处理已存在的凭证：insert 模式全部拒绝，其他模式只拒绝已处理的出库单，
+        其余记为被覆盖，返回剩余的行
+        """
+        if self.mode == ImportMode.INSERT:
+            rejected_vouchers = set(existing)
+            message = " 已存在"
+        else:
+            rejected_vouchers = {v for v, order_status in existing.items() if order_status != OutboundStatus.PENDING}
+            message = " 已处理，不能覆盖"
+            self._overwritten.update(set(existing) - rejected_vouchers)
+        if not rejected_vouchers:
+            return df
+        rejected_mask = df["_voucher"].isin(rejected_vouchers)
+        rejected = df[rejected_mask]
+        self._add_errors(rejected, "物料凭证 " + rejected["_voucher"] + message)
+        logger.info(f"Skipped {len(rejected)} rows of {len(rejected_vouchers)} existing vouchers")
+        return df[~rejected_mask]
+
+    def _stock_levels(self, material_codes: List[str]) -> Dict[str, float]:
+        """
+        一次集合查询获取物料当前库存，同一物料有多条库存记录时取最早的一条
+        """
+        stock: Dict[str, float] = {}
+        for batch in chunked(material_codes):
+            rows = self.db.query(Inventory.material_code, Inventory.quantity).filter(
+                Inventory.material_code.in_(batch)
+            ).order_by(Inventory.id).all()
+            for material_code, quantity in rows:
+                stock.setdefault(material_code, quantity or 0)
+        return stock
+
+    def _build_items(self, df: pd.DataFrame, material_code: pd.Series) -> pd.DataFrame:
+        """
+        整列计算出库项字段
+        """
+        actual_quantity = _numeric_column(df, "实拨数量").fillna(0)
+        outbound_price = _numeric_column(df, "出库单价").fillna(0)
+        outbound_amount = _numeric_column(df, "出库金额").fillna(0)
+        # 如果没有出库金额，但有数量和单价，则计算金额
+        computed = (outbound_amount == 0) & (actual_quantity > 0) & (outbound_price > 0)
+        outbound_amount = outbound_amount.where(~computed, actual_quantity * outbound_price)
+
+        # 应拨数量为空或无法解析时使用实拨数量
+        requested_quantity = _numeric_column(df, "应拨数量")
+        requested_quantity = requested_quantity.where(requested_quantity.notna(), actual_quantity)
+
+        # 优先使用页面上输入的采购订单号，其次使用Excel中的值
+        if self.purchase_order_no:
+            purchase_order_no = pd.Series(self.purchase_order_no, index=df.index, dtype=object)
+        else:
+            purchase_order_no = _text_column(df, "采购订单号", "无采购订单号")
+
+        return pd.DataFrame({
+            "material_code": material_code,
+            "material_description": _text_column(df, "物资名称及规格型号", "物料 " + material_code),
+            "unit": _text_column(df, "计量单位", "件"),
+            "actual_quantity": actual_quantity,
+            "outbound_price": outbound_price,
+            "material_category_code": _text_column(df, "物资品种码", "未分类"),
+            "project_code": _text_column(df, "工程编码", "无工程编码"),
+            "requested_quantity": requested_quantity,
+            "outbound_amount": outbound_amount,
+            "purchase_order_no": purchase_order_no,
+            "remark": "",
+        }, index=df.index)
+
+    def _build_orders(self, headers: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        根据每个凭证的首行构建出库单记录
+        """
+        today = date.today()
+        department = _text_column(headers, "具体用料部门", "")
+        user_unit = _text_column(headers, "用料单位", department)
+        document_type = _text_column(headers, "单据类型", "正常出库")
+        transfer_order = _text_column(headers, "转储订单/销售订单", "")
+        material_category = _text_column(headers, "料单分属", "")
+        sales_amount = _numeric_column(headers, "销售金额").fillna(0)
+        management_fee_rate = _numeric_column(headers, "管理费率").fillna(0)
+
+        voucher_dates = _date_column(headers, "开单日期", today, "voucher_date")
+        issue_dates = _date_column(headers, "发料日期", None, "issue_date")
+
+        orders = []
+        for idx, voucher in headers["_voucher"].items():
+            orders.append({
+                "material_voucher": voucher,
+                "voucher_date": voucher_dates[idx],
+                "department": department[idx],
+                "user_unit": user_unit[idx],
+                "document_type": document_type[idx],
+                "total_amount": 0.0,
+                "issue_date": issue_dates[idx],
+                "sales_amount": float(sales_amount[idx]),
+                "transfer_order": transfer_order[idx],
+                "management_fee_rate": float(management_fee_rate[idx]),
+                "material_category": material_category[idx],
+                "status": OutboundStatus.PENDING,
+                "operator_id": self.operator_id,
+            })
+        return orders
+
+    def process(self, df: pd.DataFrame) -> None:
+        """
+        处理一批出库数据（DataFrame 的索引即原始数据行号减 2）
+        """
+        if df.empty:
+            return
+        self.total_count += len(df)
+
+        voucher = normalize_code_column(df["物料凭证"])
+        df = df.assign(_voucher=voucher)
+
+        # 物料凭证为空的行无法归属到出库单
+        missing_voucher = voucher == ""
+        self._add_errors(df[missing_voucher], "物料凭证不能为空")
+        df = df[~missing_voucher]
+        if df.empty:
+            return
+
+        # 一次查询检查凭证是否已存在（本次导入中已创建的凭证除外）
+        vouchers = [v for v in df["_voucher"].unique().tolist() if v not in self._order_ids]
+        existing = self._existing_vouchers(vouchers)
+        if existing:
+            df = self._reject_existing(df, existing)
+            if df.empty:
+                return
+
+        material_code = normalize_code_column(df["物料编码"])
+        items = self._build_items(df, material_code)
+
+        # 行级校验
+        empty_code = material_code == ""
+        invalid_code = material_code.isin(["nan", "None", "NaN"])
+        bad_quantity = ~empty_code & ~invalid_code & (items["actual_quantity"] <= 0)
+        self._add_errors(items[empty_code], "物料编码不能为空")
+        self._add_errors(items[invalid_code], "无效的物料编码: " + material_code[invalid_code])
+        self._add_errors(items[bad_quantity], "实拨数量必须大于0")
+        items = items[~empty_code & ~invalid_code & ~bad_quantity]
+        item_vouchers = df.loc[items.index, "_voucher"]
+
+        # 一次查询检查库存是否足够，仅作提示不阻止上传
+        if not items.empty:
+            stock = self._stock_levels(items["material_code"].unique().tolist())
+            current_stock = items["material_code"].map(stock)
+            short = current_stock.isna() | (current_stock < items["actual_quantity"])
+            if short.any():
+                shortage = items[short]
+                messages = (
+                    "警告: 物料 " + shortage["material_code"]
+                    + " 库存不足，当前库存: " + current_stock[short].fillna(0).astype(str)
+                    + ", 需要: " + shortage["actual_quantity"].astype(str)
+                )
+                self._add_errors(shortage, messages, counted=False)
+                logger.warning(f"{int(short.sum())} rows have insufficient stock")
+
+        frame_totals = self.frame_engine.sum_by(items["outbound_amount"], item_vouchers).to_dict()
+
+        # 新凭证（含被覆盖的凭证）：以每个凭证的首行作为出库单表头，批量写入后取回ID
+        new_vouchers = [v for v in df["_voucher"].unique().tolist() if v not in self._order_ids]
+        if new_vouchers and self.dry_run:
+            self._order_ids.update(dict.fromkeys(new_vouchers))
+        elif new_vouchers:
+            headers = df.drop_duplicates("_voucher", keep="first")
+            orders = self._build_orders(headers)
+            for order in orders:
+                order["total_amount"] = float(frame_totals.get(order["material_voucher"], 0.0))
+            if self.mode == ImportMode.INSERT:
+                self.db.bulk_insert_mappings(OutboundOrder, orders)
+                for batch in chunked(new_vouchers):
+                    rows = self.db.query(OutboundOrder.material_voucher, OutboundOrder.id).filter(
+                        OutboundOrder.material_voucher.in_(batch)
+                    ).all()
+                    self._order_ids.update({voucher_no: order_id for voucher_no, order_id in rows})
+            else:
+                skipped = self._upsert_orders(orders)
+                if skipped:
+                    # 检查后被其他事务处理的出库单没有被覆盖，其出库项记为错误
+                    skipped_mask = item_vouchers.isin(skipped)
+                    skipped_items = items[skipped_mask]
+                    self._add_errors(
+                        skipped_items, "物料凭证 " + item_vouchers[skipped_mask] + " 已处理，不能覆盖"
+                    )
+                    items, item_vouchers = items[~skipped_mask], item_vouchers[~skipped_mask]
+                    frame_totals = {v: amount for v, amount in frame_totals.items() if v not in skipped}
+
+        # 累计各出库单金额，已在之前批次创建的出库单需要在 finish() 中回写
+        for voucher_no, amount in frame_totals.items():
+            if voucher_no not in new_vouchers:
+                self._dirty_totals.add(voucher_no)
+            self._order_totals[voucher_no] = self._order_totals.get(voucher_no, 0.0) + float(amount)
+
+        if items.empty:
+            return
+        if self.dry_run:
+            self.success_count += len(items)
+            return
+
+        items = items.assign(outbound_id=item_vouchers.map(self._order_ids).astype(int))
+        self.success_count += len(items)
+        if self._overwritten:
+            overwritten_mask = item_vouchers.isin(self._overwritten)
+            if self.mode == ImportMode.UPSERT:
+                self._pending_items.append(items[overwritten_mask])
+                items = items[~overwritten_mask]
+            else:
+                self._item_changes["inserted"] += int(overwritten_mask.sum())
+
+        # 批量插入出库项
+        if not items.empty:
+            self.db.bulk_insert_mappings(OutboundItem, items.to_dict(orient="records"))
+
+    def _upsert_orders(self, orders: List[Dict[str, Any]]) -> set:
+        """
+        INSERT ... ON CONFLICT 写入出库单表头并取回ID，只覆盖待处理的出库单；
+        replace 模式随后删除被覆盖出库单的全部出库项
+
+        Returns:
+            查询凭证之后被其他事务处理、因而没有写入的物料凭证
+        """
+        rows = upsert_returning(
+            self.db, OutboundOrder, orders, ["material_voucher"], ORDER_UPDATE_COLUMNS,
+            returning=("material_voucher", "id"),
+            where=OutboundOrder.__table__.c.status == OutboundStatus.PENDING,
+        )
+        self._order_ids.update({voucher_no: order_id for voucher_no, order_id in rows})
+        skipped = {order["material_voucher"] for order in orders} - set(self._order_ids)
+        self._overwritten -= skipped
+        if self.mode == ImportMode.REPLACE:
+            overwritten_ids = [
+                self._order_ids[order["material_voucher"]] for order in orders
+                if order["material_voucher"] in self._overwritten
+            ]
+            self._item_changes["deleted"] += delete_children(
+                self.db, OutboundItem, "outbound_id", overwritten_ids
+            )
+        return skipped
+
+    def finish(self) -> None:
+        """
+        upsert 模式下对比被覆盖出库单的出库项，回写跨批次追加过出库项的出库单合计金额
+        """
+        if self.mode == ImportMode.UPSERT and self._pending_items and not self.dry_run:
+            # 只对比至少有一行有效数据的出库单，全部行都有错误的出库单保留原出库项
+            pending = pd.concat(self._pending_items)
+            inserted, deleted, unchanged = reconcile_children(
+                self.db, OutboundItem, "outbound_id", pending["outbound_id"].unique().tolist(),
+                pending.to_dict(orient="records"), ITEM_COMPARE_COLUMNS,
+            )
+            self._item_changes.update(inserted=inserted, deleted=deleted, unchanged=unchanged)
+            self._pending_items.clear()
+
+        mappings = [
+            {"id": self._order_ids[voucher_no], "total_amount": self._order_totals[voucher_no]}
+            for voucher_no in self._dirty_totals
+        ]
+        if mappings and not self.dry_run:
+            self.db.bulk_update_mappings(OutboundOrder, mappings)
+        self._dirty_totals.clear()
+        if not self.dry_run:
+            record_import_metrics(
+                "outbound", self.success_count, self.error_count, time.perf_counter() - self.started
+            )
+        logger.info(
+            f"Import summary: total={self.total_count}, success={self.success_count}, "
+            f"error={self.error_count}, orders={len(self._order_ids)}, overwritten={len(self._overwritten)}"
+        )
+
+    def result(self) -> Dict[str, Any]:
+        """
+        构建与 OutboundExcelImportResponse.data 一致的导入结果
+        """
+        result = {
+            "totalCount": self.total_count,
+            "successCount": self.success_count,
+            "errorCount": self.error_count,
+            "errorDetails": sorted(self.error_details, key=lambda detail: detail["rowIndex"]),
+            "importId": f"OUT{date.today().strftime('%Y%m%d')}{self.success_count:03d}",
+        }
+        if self.mode != ImportMode.INSERT:
+            result.update(
+                importMode=self.mode.value,
+                overwrittenCount=len(self._overwritten),
+                itemChanges=dict(self._item_changes),
+            )
+        return result
+
+
+def import_outbound_file(
+    db: Session,
+    source: Union[str, BinaryIO],
+    operator_id: int,
+    purchase_order_no: str = "",
+    chunk_size: Optional[int] = None,
+    mode: ImportMode = ImportMode.INSERT,
+) -> Dict[str, Any]:
+    """
+    分块读取并导入出库Excel文件，返回导入结果（不提交事务）
+
+    Raises:
+        HTTPException: 无法读取文件或缺少必要的列
+    """
+    engine = OutboundImportEngine(db, operator_id, purchase_order_no, mode=mode)
+    with open_outbound_reader(source, chunk_size) as reader:
+        for chunk in reader:
+            engine.process(chunk)
+    engine.finish()
+    return engine.result()
@@ -0,0 +1,436 @@
+"""
+采购订单导入服务
+"""
+
+import logging
+import time
+from datetime import date
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.db.bulk import copy_rows, delete_children, insert_returning, reconcile_children, upsert_returning
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus, DeliveryType
+from app.services.outbound_import import (
+    ImportMode,
+    _numeric_column,
+    chunked,
+    normalize_code_column,
+    record_import_metrics,
+)
+from app.services.rollup import mark_stale_days
+from app.utils.data_processing import get_engine
+from app.utils.dates import normalize_date_column
+from app.utils.csv_reader import CsvChunkReader
+from app.utils.excel import ExcelChunkReader, open_chunk_reader
+
+logger = logging.getLogger(__name__)
+
+# 必需列及其允许的替代列名
+PURCHASE_COLUMN_MAPPINGS = {
+    "采购订单号": ["采购订单号"],
+    "行项目号": ["行项目号"],
+    "物料编码": ["物料编码", "物资编码"]  # 允许物料编码或物资编码
+}
+
+# 需要丢弃的序号列
+SERIAL_COLUMNS = ["序号", "No.", "#", "Item"]
+
+# 订单表头字段：Excel列名 -> 采购订单字段（取每个订单的首行）
+ORDER_HEADER_COLUMNS = {
+    "计划编号": "plan_number",
+    "用户单位": "user_unit",
+    "大类": "category",
+    "供应商名称": "supplier_name",
+    "供应商代码": "supplier_code",
+    "物料组": "material_group",
+    "一级目录产品": "first_level_product",
+    "工厂": "factory",
+}
+
+# upsert / replace 时更新的采购订单表头字段（交货方式和状态保持不变）
+ORDER_UPDATE_COLUMNS = ["total_amount", "order_date"] + list(ORDER_HEADER_COLUMNS.values())
+
+# upsert 时比较订单项是否变化的字段
+ITEM_COMPARE_COLUMNS = [
+    "line_item_number", "material_code", "material_description", "unit", "requested_quantity",
+    "contract_price", "product_standard", "contract_amount", "long_description", "price_flag",
+    "purchase_order_quantity",
+]
+
+
+def purchase_column_changes(columns: Iterable[str]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    根据表头确定需要丢弃的序号列、无名列，以及替代列名到标准列名的重命名
+
+    Raises:
+        HTTPException: 缺少必要的列
+    """
+    columns = list(columns)
+
+    # 1. 丢弃不需要的列（如“序号”列和无名列）
+    unnecessary_columns = [
+        col for col in columns
+        if col in SERIAL_COLUMNS or (isinstance(col, str) and ("Unnamed" in col or col.strip() == ""))
+    ]
+    if unnecessary_columns:
+        logger.info(f"Dropping unnecessary columns: {unnecessary_columns}")
+
+    # 2. 检查每个必需列是否存在或有替代列，替代列重命名为标准列名
+    missing_columns = []
+    renames = {}
+    for required_col, alternatives in PURCHASE_COLUMN_MAPPINGS.items():
+        found = next((alt for alt in alternatives if alt in columns), None)
+        if found is None:
+            missing_columns.append(required_col)
+        elif found != required_col:
+            logger.info(f"Using column replacement: {required_col} -> {found}")
+            renames[found] = required_col
+
+    if missing_columns:
+        logger.error(f"Missing required columns: {missing_columns}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Excel文件缺少必要的列: {', '.join(missing_columns)}"
+        )
+
+    return unnecessary_columns, renames
+
+
+def open_purchase_reader(
+    source: Union[str, BinaryIO], chunk_size: Optional[int] = None, sheet: Union[int, str] = 0
+) -> Union[ExcelChunkReader, CsvChunkReader]:
+    """
+    打开采购订单Excel或CSV文件的分块读取器，丢弃无用列并统一列名
+
+    Raises:
+        HTTPException: 无法读取文件或缺少必要的列
+    """
+    try:
+        reader = open_chunk_reader(source, chunk_size, sheet)
+    except Exception as excel_error:
+        logger.error(f"Error reading Excel file: {str(excel_error)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法读取Excel文件: {str(excel_error)}"
+        )
+    try:
+        unnecessary_columns, renames = purchase_column_changes(reader.columns)
+    except HTTPException:
+        reader.close()
+        raise
+    reader.drop_columns(unnecessary_columns)
+    reader.rename_columns(renames)
+    return reader
+
+
+def _optional_str(value: Any) -> Any:
+    """
+    空值返回 None，其他值转换为字符串
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    return str(value)
+
+
+def _text_or_none(df: pd.DataFrame, column: str) -> pd.Series:
+    """
+    整列取出文本字段，列不存在或单元格为空时为 None
+    """
+    if column not in df.columns:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    values = df[column].astype(object)
+    return values.where(values.notna(), None)
+
+
+class PurchaseImportEngine:
+    """
+    采购订单导入引擎
+
+    可以多次调用 process() 分批导入，跨批次出现的同一采购订单号会追加到本次导入已创建的订单上。
+    所有批次处理完成后调用 finish()，再由调用方提交事务。
+
+    每批按列整体处理：一次查询检查全部采购订单号是否已存在，一条 INSERT ... RETURNING 创建订单并取回ID，
+    订单项通过 COPY（SQLite 上为 executemany）批量写入。
+
+    dry_run 为 True 时只做校验（包括订单号查询），不写入数据库，用于导入预览。
+    mode 为 upsert / replace 时覆盖数据库中已存在且状态为待处理的订单（INSERT ... ON CONFLICT），
+    已处理的订单记为错误；upsert 只增删有变化的订单项，replace 删除全部订单项后重新写入。
+    """
+
+    def __init__(self, db: Session, dry_run: bool = False, mode: ImportMode = ImportMode.INSERT):
+        self.db = db
+        self.dry_run = dry_run
+        self.mode = ImportMode(mode)
+        self.frame_engine = get_engine()
+        self.started = time.perf_counter()
+
+        self.total_count = 0
+        self.success_count = 0
+        self.error_count = 0
+        self.error_details: List[Dict[str, Any]] = []
+
+        # 本次导入创建的采购订单：采购订单号 -> 订单ID（dry_run 时为 None） / 累计总金额
+        self._order_ids: Dict[str, int] = {}
+        self._order_totals: Dict[str, float] = {}
+        # 创建后又在后续批次中追加了订单项、需要更新总金额的采购订单号
+        self._dirty_totals: set = set()
+        # 被覆盖的已存在订单号；upsert 时其订单项暂存到 finish() 中统一与数据库对比
+        self._overwritten: set = set()
+        self._pending_items: List[Dict[str, Any]] = []
+        self._item_changes = {"inserted": 0, "deleted": 0, "unchanged": 0}
+
+    def _add_errors(self, index: Iterable[int], message: Union[str, pd.Series]) -> None:
+        """
+        记录一批行的错误（行号为 DataFrame 索引加 2）
+        """
+        index = list(index)
+        messages = message.tolist() if isinstance(message, pd.Series) else [message] * len(index)
+        self.error_count += len(index)
+        self.error_details.extend(
+            {"rowIndex": idx + 2, "errorMessage": text} for idx, text in zip(index, messages)
+        )
+
+    def _existing_order_nos(self, order_nos: List[str]) -> Dict[str, Tuple[PurchaseOrderStatus, Optional[date]]]:
+        """
+        按批集合查询找出数据库中已存在的采购订单号及其订单状态、订单生成日期
+        """
+        existing = {}
+        for batch in chunked(order_nos):
+            rows = self.db.query(PurchaseOrder.order_no, PurchaseOrder.status, PurchaseOrder.order_date).filter(
+                PurchaseOrder.order_no.in_(batch)
+            ).all()
+            existing.update({order_no: (order_status, order_date) for order_no, order_status, order_date in rows})
+        return existing
+
+    def _create_orders(self, first_rows: pd.DataFrame, totals: pd.Series) -> set:
+        """
+        按每个订单的首行创建采购订单，一条 INSERT ... RETURNING 取回订单ID
+
+        Returns:
+            查询订单号之后被其他事务处理、因而没有覆盖的采购订单号
+        """
+        if self.dry_run:
+            for order_no in first_rows["采购订单号"]:
+                self._order_ids[order_no] = None
+                self._order_totals[order_no] = float(totals.get(order_no, 0.0))
+            return set()
+
+        orders = pd.DataFrame({
+            "order_no": first_rows["采购订单号"],
+            "total_amount": first_rows["采购订单号"].map(totals).fillna(0.0).astype(float),
+        }, index=first_rows.index)
+        for column, field in ORDER_HEADER_COLUMNS.items():
+            orders[field] = first_rows[column].map(_optional_str) if column in first_rows.columns else None
+        orders["order_date"] = (
+            normalize_date_column(first_rows["订单生成日期"], field_name="order_date")
+            if "订单生成日期" in first_rows.columns else None
+        )
+        orders["delivery_type"] = DeliveryType.WAREHOUSE  # 默认为入库
+        orders["status"] = PurchaseOrderStatus.PENDING
+
+        records = orders.astype(object).where(orders.notna(), None).to_dict(orient="records")
+        if self.mode == ImportMode.INSERT:
+            rows = insert_returning(self.db, PurchaseOrder, records, ("id", "order_no"))
+        else:
+            # 只覆盖待处理的订单
+            rows = upsert_returning(
+                self.db, PurchaseOrder, records, ["order_no"], ORDER_UPDATE_COLUMNS, ("id", "order_no"),
+                where=PurchaseOrder.__table__.c.status == PurchaseOrderStatus.PENDING,
+            )
+        for order_id, order_no in rows:
+            self._order_ids[order_no] = order_id
+            self._order_totals[order_no] = float(totals.get(order_no, 0.0))
+        skipped = set(first_rows["采购订单号"]) - set(self._order_ids)
+        self._overwritten -= skipped
+
+        if self.mode == ImportMode.REPLACE:
+            overwritten_ids = [
+                self._order_ids[order_no] for order_no in first_rows["采购订单号"] if order_no in self._overwritten
+            ]
+            self._item_changes["deleted"] += delete_children(self.db, PurchaseOrderItem, "order_id", overwritten_ids)
+        return skipped
+
+    def process(self, df: pd.DataFrame) -> None:
+        """
+        处理一批采购订单数据（DataFrame 的索引即原始数据行号减 2）
+        """
+        # 订单号按编码规范化（数字单元格 4500001234.0 与文本 4500001234 视为同一订单）
+        df = df.assign(采购订单号=normalize_code_column(df["采购订单号"]))
+
+        # 丢弃采购订单号或行项目号为空的行（可能是汇总行）
+        rows_before = len(df)
+        df = df[(df["采购订单号"] != "") & df["行项目号"].notna()]
+        if len(df) < rows_before:
+            logger.info(f"Dropped {rows_before - len(df)} rows with empty order number or line item")
+        if df.empty:
+            return
+
+        self.total_count += len(df)
+
+        # 按批集合查询检查本批新出现的采购订单号是否已存在
+        order_nos = df["采购订单号"]
+        new_order_nos = [order_no for order_no in order_nos.unique() if order_no not in self._order_ids]
+        existing = self._existing_order_nos(new_order_nos)
+        if existing and self.mode == ImportMode.INSERT:
+            logger.warning(f"{len(existing)} orders already exist")
+            existing_mask = order_nos.isin(existing)
+            self._add_errors(df.index[existing_mask], "采购订单号 " + order_nos[existing_mask] + " 已存在")
+            df = df[~existing_mask]
+        elif existing:
+            # 覆盖模式下只拒绝已处理的订单
+            locked = {order_no for order_no, (order_status, _) in existing.items()
+                      if order_status != PurchaseOrderStatus.PENDING}
+            self._overwritten.update(set(existing) - locked)
+            if not self.dry_run:
+                # 覆盖会修改订单生成日期，原日期的日汇总需要重新计算
+                mark_stale_days(self.db, (existing[order_no][1] for order_no in set(existing) - locked))
+            if locked:
+                logger.warning(f"{len(locked)} existing orders are already processed")
+                locked_mask = order_nos.isin(locked)
+                self._add_errors(
+                    df.index[locked_mask], "采购订单号 " + order_nos[locked_mask] + " 已处理，不能覆盖"
+                )
+                df = df[~locked_mask]
+
+        requested_quantity = _numeric_column(df, "申请数量").fillna(0)
+        contract_price = _numeric_column(df, "签约单价").fillna(0)
+        contract_amount = _numeric_column(df, "签约金额").fillna(0)
+        # 如果没有签约金额，按申请数量 × 签约单价计算
+        contract_amount = contract_amount.where(contract_amount != 0, requested_quantity * contract_price)
+        if "采购订单数" in df.columns:
+            order_quantity = _numeric_column(df, "采购订单数").fillna(requested_quantity)
+        else:
+            order_quantity = requested_quantity
+
+        # 物料编码为空的行记为错误，不计入订单总金额
+        material_codes = normalize_code_column(df["物料编码"])
+        valid = material_codes != ""
+        if not valid.all():
+            self._add_errors(df.index[~valid], "物料编码不能为空")
+        totals = self.frame_engine.sum_by(contract_amount[valid], df.loc[valid, "采购订单号"])
+
+        # 创建本批新出现的订单；已创建的订单累加本批金额，在 finish() 中统一更新
+        new_mask = ~df["采购订单号"].isin(self._order_ids)
+        if new_mask.any():
+            skipped = self._create_orders(df[new_mask].drop_duplicates("采购订单号"), totals)
+            if skipped:
+                # 检查后被其他事务处理的订单没有被覆盖，其订单项记为错误
+                skipped_mask = valid & df["采购订单号"].isin(skipped)
+                self._add_errors(
+                    df.index[skipped_mask], "采购订单号 " + df.loc[skipped_mask, "采购订单号"] + " 已处理，不能覆盖"
+                )
+                valid = valid & ~df["采购订单号"].isin(skipped)
+        for order_no in df.loc[~new_mask & valid, "采购订单号"].unique():
+            self._order_totals[order_no] += float(totals[order_no])
+            self._dirty_totals.add(order_no)
+
+        df = df[valid]
+        if self.dry_run:
+            self.success_count += len(df)
+            return
+        items = pd.DataFrame({
+            "order_id": df["采购订单号"].map(self._order_ids),
+            "line_item_number": df["行项目号"].map(_optional_str),
+            "material_code": material_codes[valid],
+            "material_description": _text_or_none(df, "物资描述"),
+            "unit": _text_or_none(df, "计量单位"),
+            "requested_quantity": requested_quantity[valid].round().astype("int64"),
+            "contract_price": contract_price[valid],
+            "product_standard": _text_or_none(df, "产品标准"),
+            "contract_amount": contract_amount[valid],
+            "long_description": _text_or_none(df, "长描述"),
+            "price_flag": _text_or_none(df, "价格标志"),
+            "purchase_order_quantity": order_quantity[valid].round().astype("int64"),
+        })
+        records = items.astype(object).where(items.notna(), None).to_dict(orient="records")
+        self.success_count += len(records)
+        if self._overwritten:
+            overwritten_ids = {self._order_ids[order_no] for order_no in self._overwritten}
+            overwritten_records = [record for record in records if record["order_id"] in overwritten_ids]
+            if self.mode == ImportMode.UPSERT:
+                self._pending_items.extend(overwritten_records)
+                records = [record for record in records if record["order_id"] not in overwritten_ids]
+            else:
+                self._item_changes["inserted"] += len(overwritten_records)
+        copy_rows(self.db, PurchaseOrderItem, records)
+
+    def finish(self) -> None:
+        """
+        更新跨批次追加了订单项的订单总金额
+
+        Raises:
+            HTTPException: 文件中没有有效数据
+        """
+        if self.total_count == 0:
+            logger.warning("Excel file is empty")
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Excel文件为空或没有有效数据"
+            )
+        if self.mode == ImportMode.UPSERT and self._pending_items and not self.dry_run:
+            # 只对比至少有一行有效数据的订单，全部行都有错误的订单保留原订单项
+            inserted, deleted, unchanged = reconcile_children(
+                self.db, PurchaseOrderItem, "order_id",
+                list({record["order_id"] for record in self._pending_items}),
+                self._pending_items, ITEM_COMPARE_COLUMNS,
+            )
+            self._item_changes.update(inserted=inserted, deleted=deleted, unchanged=unchanged)
+            self._pending_items.clear()
+
+        mappings = [
+            {"id": self._order_ids[order_no], "total_amount": self._order_totals[order_no]}
+            for order_no in self._dirty_totals
+        ]
+        if mappings and not self.dry_run:
+            self.db.bulk_update_mappings(PurchaseOrder, mappings)
+        self._dirty_totals.clear()
+        if not self.dry_run:
+            record_import_metrics(
+                "purchase", self.success_count, self.error_count, time.perf_counter() - self.started
+            )
+        logger.info(
+            f"Import summary: total={self.total_count}, success={self.success_count}, "
+            f"error={self.error_count}, orders={len(self._order_ids)}, overwritten={len(self._overwritten)}"
+        )
+
+    def result(self) -> Dict[str, Any]:
+        """
+        构建与 ExcelImportResponse.data 一致的导入结果
+        """
+        result = {
+            "totalCount": self.total_count,
+            "successCount": self.success_count,
+            "errorCount": self.error_count,
+            "errorDetails": self.error_details,
+            "importId": f"IMP{date.today().strftime('%Y%m%d')}{self.success_count:03d}",
+        }
+        if self.mode != ImportMode.INSERT:
+            result.update(
+                importMode=self.mode.value,
+                overwrittenCount=len(self._overwritten),
+                itemChanges=dict(self._item_changes),
+            )
+        return result
+
+
+def import_purchase_file(
+    db: Session,
+    source: Union[str, BinaryIO],
+    chunk_size: Optional[int] = None,
+    mode: ImportMode = ImportMode.INSERT,
+) -> Dict[str, Any]:
+    """
+    分块读取并导入采购订单Excel文件，返回导入结果（不提交事务）
+
+    Raises:
+        HTTPException: 无法读取文件、缺少必要的列或没有有效数据
+    """
+    engine = PurchaseImportEngine(db, mode=mode)
+    with open_purchase_reader(source, chunk_size) as reader:
+        for chunk in reader:
+            engine.process(chunk)
+    engine.finish()
+    return engine.result()
@@ -0,0 +1,390 @@
+"""
+日汇总服务
+
+采购订单、库存事务和已完成的工作流任务按天汇总到 wh_dailyorderstat、wh_dailytransactionstat、
+wh_dailytaskstat 三张表中，报表按天数而不是明细行数计算：
+1. 定时任务 refresh_daily_rollups 找出上次运行以来有更新的日期，按连续日期段删除后用
+   INSERT ... SELECT ... GROUP BY 重新汇总，首次运行或 full=True 时重建全部历史；
+2. 汇总状态记录已完整覆盖到的日期 complete_until，读取时该日期及之前读汇总表，
+   之后（通常只有当天）从明细表实时分组，两部分用 UNION ALL 一次取回；
+3. 汇总任务从未运行时 complete_until 为空，全部从明细表统计，结果与汇总前一致；
+4. 明细的日期被修改或明细被删除时，原日期上已没有 update_time 更新的行，flush 前的钩子在同一事务中
+   把原日期写入 wh_rollupstaleday，下次增量汇总一并重新计算；绕过 ORM 的批量写入调用 mark_stale_days。
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Date, DateTime, cast, event, func, insert, inspect, literal, literal_column, select, union_all
+from sqlalchemy.orm import Session
+
+from app.models.purchase_order import PurchaseOrder
+from app.models.rollup import DailyOrderStat, DailyTaskStat, DailyTransactionStat, RollupStaleDay, RollupState
+from app.models.warehouse import InventoryTransaction
+from app.models.workflow import WorkflowTask, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = "daily"
+
+# 查找变更时向前多看的时间，覆盖服务器之间的时钟偏差和跨越上次运行的长事务
+WATERMARK_MARGIN = timedelta(minutes=5)
+
+# 每条 DELETE 语句删除的待重新汇总日期记录数
+STALE_DELETE_BATCH_SIZE = 500
+
+# 参与汇总的明细模型及决定其所在日期的字段
+DAY_ATTRIBUTES = {
+    PurchaseOrder: "order_date",
+    InventoryTransaction: "transaction_time",
+    WorkflowTask: "complete_time",
+}
+
+# 汇总表用空字符串表示未填写，便于唯一约束生效（NULL 之间互不相等）
+EMPTY = literal_column("''")
+
+
+def day_bucket(column: Any, dialect_name: str) -> Any:
+    """
+    将时间列截断到日期：PostgreSQL 转换为 date，SQLite 使用 date() 得到 YYYY-MM-DD 字符串
+    """
+    if dialect_name == "postgresql":
+        return cast(column, Date)
+    return func.date(column)
+
+
+def _as_date(value: Any) -> Optional[date]:
+    """
+    统一分组键中的日期（date() 在 SQLite 上返回字符串）
+    """
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def _contiguous_ranges(days: Iterable[date]) -> List[Tuple[date, date]]:
+    """
+    将日期集合合并为连续的 [起始, 结束] 日期段
+    """
+    ranges: List[Tuple[date, date]] = []
+    for day in sorted(days):
+        if ranges and day == ranges[-1][1] + timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _live_order_stats(db: Session, start_date: Optional[date], end_date: Optional[date]):
+    """
+    从采购订单明细按 (订单日期, 大类, 用户单位) 分组
+    """
+    category = func.coalesce(PurchaseOrder.category, EMPTY)
+    user_unit = func.coalesce(PurchaseOrder.user_unit, EMPTY)
+    stmt = select(
+        PurchaseOrder.order_date,
+        category,
+        user_unit,
+        func.count(PurchaseOrder.id),
+        func.coalesce(func.sum(PurchaseOrder.total_amount), 0),
+    ).where(PurchaseOrder.order_date.isnot(None))
+    if start_date is not None:
+        stmt = stmt.where(PurchaseOrder.order_date >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(PurchaseOrder.order_date <= end_date)
+    return stmt.group_by(PurchaseOrder.order_date, category, user_unit)
+
+
+def _live_transaction_stats(db: Session, start_date: Optional[date], end_date: Optional[date]):
+    """
+    从库存事务明细按 (事务日期, 事务类型) 分组
+    """
+    day = day_bucket(InventoryTransaction.transaction_time, _dialect(db))
+    stmt = select(
+        day,
+        InventoryTransaction.transaction_type,
+        func.count(InventoryTransaction.id),
+        func.coalesce(func.sum(InventoryTransaction.quantity), 0),
+    )
+    if start_date is not None:
+        stmt = stmt.where(InventoryTransaction.transaction_time >= _day_start(start_date))
+    if end_date is not None:
+        stmt = stmt.where(InventoryTransaction.transaction_time < _day_start(end_date + timedelta(days=1)))
+    return stmt.group_by(day, InventoryTransaction.transaction_type)
+
+
+def _live_task_stats(
+    db: Session, start_date: Optional[date], end_date: Optional[date], task_name: Optional[str] = None
+):
+    """
+    从已完成的工作流任务明细按 (完成日期, 任务名称, 处理结果) 分组
+    """
+    day = day_bucket(WorkflowTask.complete_time, _dialect(db))
+    result = func.coalesce(WorkflowTask.result, EMPTY)
+    stmt = select(
+        day,
+        WorkflowTask.task_name,
+        result,
+        func.count(WorkflowTask.id),
+    ).where(
+        WorkflowTask.status == TaskStatus.COMPLETED,
+        WorkflowTask.complete_time.isnot(None),
+    )
+    if task_name is not None:
+        stmt = stmt.where(WorkflowTask.task_name == task_name)
+    if start_date is not None:
+        stmt = stmt.where(WorkflowTask.complete_time >= _day_start(start_date))
+    if end_date is not None:
+        stmt = stmt.where(WorkflowTask.complete_time < _day_start(end_date + timedelta(days=1)))
+    return stmt.group_by(day, WorkflowTask.task_name, result)
+
+
+def _recompute_range(db: Session, start_date: date, end_date: date) -> None:
+    """
+    删除并重新汇总 [start_date, end_date] 内三张汇总表的数据
+    """
+    now = datetime.now()
+    for model in (DailyOrderStat, DailyTransactionStat, DailyTaskStat):
+        db.query(model).filter(model.day >= start_date, model.day <= end_date).delete(synchronize_session=False)
+
+    targets = [
+        (DailyOrderStat, ["day", "category", "user_unit", "order_count", "order_amount"],
+         _live_order_stats(db, start_date, end_date)),
+        (DailyTransactionStat, ["day", "transaction_type", "transaction_count", "quantity"],
+         _live_transaction_stats(db, start_date, end_date)),
+        (DailyTaskStat, ["day", "task_name", "result", "task_count"],
+         _live_task_stats(db, start_date, end_date)),
+    ]
+    for model, columns, stmt in targets:
+        stmt = stmt.add_columns(literal(now, DateTime), literal(now, DateTime))
+        db.execute(insert(model).from_select(columns + ["create_time", "update_time"], stmt))
+
+
+def mark_stale_days(db: Session, days: Iterable[Any]) -> None:
+    """
+    记录需要在下次增量汇总时重新计算的日期（与明细的修改在同一事务中提交）
+    """
+    days = {_as_date(day) for day in days if day is not None}
+    if days:
+        db.add_all(RollupStaleDay(day=day) for day in sorted(days))
+
+
+def _committed_day(session: Session, obj: Any, attribute: str) -> Any:
+    """
+    明细修改前（数据库中）的日期字段值
+    """
+    state = inspect(obj)
+    history = state.attrs[attribute].history
+    if history.deleted or history.unchanged:
+        return (history.deleted or history.unchanged)[0]
+    if state.key is None:
+        return None
+    # 修改前未加载原值（如提交后过期再赋值），从数据库读取
+    model = type(obj)
+    return session.query(getattr(model, attribute)).filter(model.id == state.identity[0]).scalar()
+
+
+@event.listens_for(Session, "before_flush")
+def _record_stale_days(session: Session, flush_context: Any, instances: Any) -> None:
+    """
+    flush 前记录被删除的明细和日期被修改的明细原来所在的日期
+    """
+    days = []
+    with session.no_autoflush:
+        for obj in session.deleted:
+            attribute = DAY_ATTRIBUTES.get(type(obj))
+            if attribute:
+                days.append(_committed_day(session, obj, attribute))
+        for obj in session.dirty:
+            attribute = DAY_ATTRIBUTES.get(type(obj))
+            if attribute and inspect(obj).attrs[attribute].history.has_changes():
+                days.append(_committed_day(session, obj, attribute))
+    mark_stale_days(session, days)
+
+
+def _changed_days(db: Session, since: datetime) -> Set[date]:
+    """
+    查找 since 之后有更新的明细所在的日期
+    """
+    dialect = _dialect(db)
+    queries = [
+        db.query(PurchaseOrder.order_date).filter(
+            PurchaseOrder.update_time >= since, PurchaseOrder.order_date.isnot(None)
+        ),
+        db.query(day_bucket(InventoryTransaction.transaction_time, dialect)).filter(
+            InventoryTransaction.update_time >= since
+        ),
+        db.query(day_bucket(WorkflowTask.complete_time, dialect)).filter(
+            WorkflowTask.update_time >= since, WorkflowTask.complete_time.isnot(None)
+        ),
+    ]
+    days: Set[date] = set()
+    for query in queries:
+        days.update(_as_date(day) for (day,) in query.distinct())
+    return days
+
+
+def _first_day(db: Session) -> Optional[date]:
+    """
+    明细数据中最早的日期
+    """
+    dialect = _dialect(db)
+    candidates = [
+        db.query(func.min(PurchaseOrder.order_date)).scalar(),
+        db.query(func.min(day_bucket(InventoryTransaction.transaction_time, dialect))).scalar(),
+        db.query(func.min(day_bucket(WorkflowTask.complete_time, dialect))).scalar(),
+    ]
+    days = [_as_date(day) for day in candidates if day is not None]
+    return min(days) if days else None
+
+
+def refresh_daily_rollups(db: Session, full: bool = False, now: Optional[datetime] = None) -> dict:
+    """
+    增量刷新日汇总表并提交
+
+    Args:
+        db: 数据库会话
+        full: 是否重建全部历史
+        now: 本次运行时间，默认当前时间
+
+    Returns:
+        重新汇总的日期段数和天数
+    """
+    now = now or datetime.now()
+    state = db.query(RollupState).filter(RollupState.name == ROLLUP_NAME).with_for_update().first()
+    if state is None:
+        state = RollupState(name=ROLLUP_NAME)
+        db.add(state)
+
+    # 只删除本次读到的待重新汇总日期，运行期间其他事务新写入的留到下次
+    stale = db.query(RollupStaleDay.id, RollupStaleDay.day).all()
+    if full or state.last_run_time is None:
+        # 范围同时覆盖待重新汇总的日期：明细被删光的日期也要清掉汇总行
+        bounds = [_as_date(day) for _, day in stale] + [_first_day(db)]
+        bounds = [day for day in bounds if day is not None]
+        ranges = [(min(bounds), max(bounds + [now.date()]))] if bounds else []
+    else:
+        days = _changed_days(db, state.last_run_time - WATERMARK_MARGIN)
+        days.update(_as_date(day) for _, day in stale)
+        ranges = _contiguous_ranges(days)
+
+    for start_date, end_date in ranges:
+        _recompute_range(db, start_date, end_date)
+    stale_ids = [stale_id for stale_id, _ in stale]
+    for start in range(0, len(stale_ids), STALE_DELETE_BATCH_SIZE):
+        db.query(RollupStaleDay).filter(
+            RollupStaleDay.id.in_(stale_ids[start:start + STALE_DELETE_BATCH_SIZE])
+        ).delete(synchronize_session=False)
+
+    state.last_run_time = now
+    state.complete_until = now.date() - timedelta(days=1)
+    db.commit()
+
+    days = sum((end_date - start_date).days + 1 for start_date, end_date in ranges)
+    logger.info(f"Daily rollups refreshed: {len(ranges)} ranges, {days} days")
+    return {"ranges": len(ranges), "days": days}
+
+
+def rollup_complete_until(db: Session) -> Optional[date]:
+    """
+    汇总表已完整覆盖到的日期，汇总任务从未运行时返回 None
+    """
+    return db.query(RollupState.complete_until).filter(RollupState.name == ROLLUP_NAME).scalar()
+
+
+def _split(
+    complete_until: Optional[date], start_date: Optional[date], end_date: Optional[date]
+) -> Tuple[Optional[Tuple[Optional[date], date]], Optional[Tuple[date, Optional[date]]]]:
+    """
+    将 [start_date, end_date] 拆为读汇总表的部分和实时统计的部分，不需要的部分为 None
+    """
+    if complete_until is None:
+        return None, (start_date, end_date)
+    rollup_part = None
+    if start_date is None or start_date <= complete_until:
+        rollup_part = (start_date, min(end_date, complete_until) if end_date else complete_until)
+    live_start = complete_until + timedelta(days=1)
+    if start_date is not None and start_date > live_start:
+        live_start = start_date
+    live_part = (live_start, end_date) if end_date is None or live_start <= end_date else None
+    return rollup_part, live_part
+
+
+def _rollup_filter(stmt: Any, model: Any, start_date: Optional[date], end_date: date) -> Any:
+    if start_date is not None:
+        stmt = stmt.where(model.day >= start_date)
+    return stmt.where(model.day <= end_date)
+
+
+def _execute(db: Session, parts: List[Any]) -> List[Any]:
+    stmt = union_all(*parts) if len(parts) > 1 else parts[0]
+    return db.execute(stmt).all()
+
+
+def order_stats(
+    db: Session, complete_until: Optional[date], start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Tuple[date, str, str, int, float]]:
+    """
+    按 (日期, 大类, 用户单位) 分组的采购订单数和金额，大类和用户单位未填写时为空字符串
+    """
+    rollup_part, live_part = _split(complete_until, start_date, end_date)
+    parts = []
+    if rollup_part:
+        parts.append(_rollup_filter(select(
+            DailyOrderStat.day, DailyOrderStat.category, DailyOrderStat.user_unit,
+            DailyOrderStat.order_count, DailyOrderStat.order_amount,
+        ), DailyOrderStat, *rollup_part))
+    if live_part:
+        parts.append(_live_order_stats(db, *live_part))
+    return [(_as_date(day), *rest) for day, *rest in _execute(db, parts)]
+
+
+def transaction_stats(
+    db: Session, complete_until: Optional[date], start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> List[Tuple[date, Any, int, float]]:
+    """
+    按 (日期, 事务类型) 分组的库存事务数和数量
+    """
+    rollup_part, live_part = _split(complete_until, start_date, end_date)
+    parts = []
+    if rollup_part:
+        parts.append(_rollup_filter(select(
+            DailyTransactionStat.day, DailyTransactionStat.transaction_type,
+            DailyTransactionStat.transaction_count, DailyTransactionStat.quantity,
+        ), DailyTransactionStat, *rollup_part))
+    if live_part:
+        parts.append(_live_transaction_stats(db, *live_part))
+    return [(_as_date(day), *rest) for day, *rest in _execute(db, parts)]
+
+
+def task_stats(
+    db: Session,
+    complete_until: Optional[date],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    task_name: Optional[str] = None,
+) -> List[Tuple[date, str, str, int]]:
+    """
+    按 (完成日期, 任务名称, 处理结果) 分组的已完成任务数，处理结果未填写时为空字符串
+    """
+    rollup_part, live_part = _split(complete_until, start_date, end_date)
+    parts = []
+    if rollup_part:
+        stmt = select(DailyTaskStat.day, DailyTaskStat.task_name, DailyTaskStat.result, DailyTaskStat.task_count)
+        if task_name is not None:
+            stmt = stmt.where(DailyTaskStat.task_name == task_name)
+        parts.append(_rollup_filter(stmt, DailyTaskStat, *rollup_part))
+    if live_part:
+        parts.append(_live_task_stats(db, *live_part, task_name=task_name))
+    return [(_as_date(day), *rest) for day, *rest in _execute(db, parts)]
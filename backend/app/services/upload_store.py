@@ -0,0 +1,205 @@
+"""
+上传文件内容寻址存储
+
+上传文件落盘时同时计算 SHA-256，按哈希保存为 IMPORT_UPLOAD_DIR/<哈希前两位>/<哈希><扩展名>，
+同一内容只保存一份。导入成功后在 wh_importfile 中记录 (导入类型, 哈希) -> 导入结果，
+操作员超时后重新上传同一文件时直接返回之前的导入ID和结果，不再解析文件或写入业务数据。
+
+记录按 (导入类型, 哈希, 选项键) 区分，选项键由导入模式以外的导入选项（如出库导入的采购订单号）生成，
+同一文件用不同选项导入时不视为重复。覆盖模式（upsert/replace）的导入总是执行，用于把文件重新应用到已有单据；
+业务数据被删除后需要用 insert 模式重新导入同一文件时，调用方传 force=True 跳过去重。
+
+同一文件被并发上传时，导入前先用 claim_upload 在当前事务中占用 (导入类型, 哈希, 选项键)，后到的请求返回 409；
+不支持咨询锁的数据库由唯一约束兜底，record_import_result 遇到冲突时回滚本次写入并返回先提交的结果。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Any, BinaryIO, Callable, Dict, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.import_file import ImportFile
+
+logger = logging.getLogger(__name__)
+
+# 计算哈希和写盘时每次读取的字节数
+READ_SIZE = 1024 * 1024
+
+
+class StoredUpload(NamedTuple):
+    """已保存的上传文件"""
+    sha256: str
+    path: str
+    size: int
+    filename: str
+
+
+def store_upload(file_obj: BinaryIO, filename: str) -> StoredUpload:
+    """
+    边读取边计算 SHA-256 并写入临时文件，再移动到内容寻址路径；内容已存在时丢弃临时文件
+    """
+    os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+    if hasattr(file_obj, "seek"):
+        file_obj.seek(0)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=settings.IMPORT_UPLOAD_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            for block in iter(lambda: file_obj.read(READ_SIZE), b""):
+                digest.update(block)
+                target.write(block)
+                size += len(block)
+
+        sha256 = digest.hexdigest()
+        _, ext = os.path.splitext(filename or "")
+        directory = os.path.join(settings.IMPORT_UPLOAD_DIR, sha256[:2])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{sha256}{ext.lower()}")
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return StoredUpload(sha256, path, size, filename)
+
+
+def options_key(options: Optional[Dict[str, Any]] = None) -> str:
+    """
+    由导入模式以外的非空导入选项生成去重用的选项键（SHA-256），没有这些选项时为空字符串
+    """
+    keyed = {name: value for name, value in (options or {}).items() if name != "importMode" and value}
+    if not keyed:
+        return ""
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def find_import_record(
+    db: Session, import_type: str, sha256: str, options: Optional[Dict[str, Any]] = None
+) -> Optional[ImportFile]:
+    """
+    查找同一类型、同一内容文件以相同选项导入的记录
+    """
+    return db.query(ImportFile).filter(
+        ImportFile.import_type == import_type,
+        ImportFile.sha256 == sha256,
+        ImportFile.options_key == options_key(options),
+    ).first()
+
+
+def find_duplicate_import(
+    db: Session, import_type: str, sha256: str, options: Optional[Dict[str, Any]] = None, force: bool = False
+) -> Optional[ImportFile]:
+    """
+    查找应直接返回结果的重复导入记录：force 或覆盖模式（upsert/replace）的导入总是执行，返回 None
+    """
+    from app.services.outbound_import import ImportMode
+    if force or ImportMode((options or {}).get("importMode") or ImportMode.INSERT) != ImportMode.INSERT:
+        return None
+    return find_import_record(db, import_type, sha256, options)
+
+
+def previous_result(record: ImportFile) -> Dict[str, Any]:
+    """
+    返回之前的导入结果，并标记为重复上传
+    """
+    result = dict(record.result or {})
+    result.setdefault("importId", record.import_id)
+    result["duplicate"] = True
+    return result
+
+
+def claim_upload(db: Session, import_type: str, sha256: str, options: Optional[Dict[str, Any]] = None) -> None:
+    """
+    在当前事务中占用同一类型、同一内容、相同选项的导入，事务提交或回滚后释放（PostgreSQL 事务级咨询锁）
+
+    Raises:
+        HTTPException: 同一文件正在被其他请求导入
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    key = f"import:{import_type}:{sha256}:{options_key(options)}"
+    claimed = db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"), {"key": key}).scalar()
+    if not claimed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="同一文件正在导入，请稍后重新上传查看导入结果"
+        )
+
+
+def record_import_result(
+    db: Session,
+    import_type: str,
+    stored: StoredUpload,
+    result: Dict[str, Any],
+    operator_id: Optional[int] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    记录导入结果（不提交事务，与业务数据在同一事务中提交）；重新导入时覆盖原记录
+
+    Returns:
+        本次导入结果；同一文件已由并发的请求先记录时，回滚本次事务并返回之前的结果（duplicate 为 True），
+        调用方不应再提交
+    """
+    record = find_import_record(db, import_type, stored.sha256, options)
+    if record is None:
+        record = ImportFile(import_type=import_type, sha256=stored.sha256, options_key=options_key(options))
+        db.add(record)
+    record.filename = stored.filename
+    record.file_path = stored.path
+    record.file_size = stored.size
+    record.import_id = result.get("importId")
+    record.result = result
+    record.operator_id = operator_id
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        record = find_import_record(db, import_type, stored.sha256, options)
+        if record is None:
+            raise
+        logger.info(f"Concurrent {import_type} upload {stored.sha256} recorded first as import {record.import_id}")
+        return previous_result(record)
+    return result
+
+
+def import_stored_upload(
+    db: Session,
+    import_type: str,
+    file_obj: BinaryIO,
+    filename: str,
+    run_import: Callable[[str], Dict[str, Any]],
+    operator_id: Optional[int] = None,
+    force: bool = False,
+    options: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    保存上传文件并导入：同一文件已用相同选项导入过时直接返回之前的结果（见 find_duplicate_import），
+    否则调用 run_import(文件路径) 并记录结果（不提交事务）；返回的结果 duplicate 为 True 时调用方不应提交
+
+    Raises:
+        HTTPException: 同一文件正在被其他请求导入
+    """
+    stored = store_upload(file_obj, filename)
+    claim_upload(db, import_type, stored.sha256, options)
+    record = find_duplicate_import(db, import_type, stored.sha256, options, force)
+    if record is not None:
+        logger.info(f"Duplicate {import_type} upload {stored.sha256}, returning import {record.import_id}")
+        return previous_result(record)
+
+    result = run_import(stored.path)
+    return record_import_result(db, import_type, stored, result, operator_id, options)
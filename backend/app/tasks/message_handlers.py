@@ -2,6 +2,7 @@
 消息处理模块
 """
 
+import functools
 import json
 from typing import Dict, Any
 from app.core.redis import set_key
@@ -59,6 +60,83 @@ def handle_report_message(ch, method, properties, body):
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
 
 
+def handle_import_job_message(ch, method, properties, body):
+    """
+    处理导入任务消息
+
+    导入交给本地导入进程池执行，消费线程立即返回，继续处理心跳和其他队列；
+    任务结束后在连接所在线程确认消息（pika 的连接不是线程安全的）。
+    
+    Args:
+        ch: 通道
+        method: 方法
+        properties: 属性
+        body: 消息内容，包含 jobId
+    """
+    try:
+        # 解析消息
+        message = json.loads(body)
+        print(f"收到导入任务消息: {message}")
+        
+        # 提交导入任务（任务失败时状态已写入 Redis；已开始或已结束的任务直接跳过）
+        from app.services.import_jobs import get_executor, run_import_job
+        future = get_executor().submit(run_import_job, message["jobId"])
+    except Exception as e:
+        print(f"处理导入任务消息失败: {e}")
+        # 拒绝消息并重新入队
+        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+        return
+
+    def acknowledge(done):
+        if done.exception() is None:
+            callback = functools.partial(ch.basic_ack, delivery_tag=method.delivery_tag)
+        else:
+            # 工作进程异常退出，重新入队（任务已开始时再次投递会被跳过）
+            print(f"执行导入任务失败: {done.exception()}")
+            callback = functools.partial(ch.basic_nack, delivery_tag=method.delivery_tag, requeue=True)
+        ch.connection.add_callback_threadsafe(callback)
+
+    future.add_done_callback(acknowledge)
+
+
+def handle_dashboard_refresh_message(ch, method, properties, body):
+    """
+    处理看板刷新消息
+
+    刷新交给看板刷新线程执行，消费线程立即返回，继续处理心跳和其他队列；
+    刷新结束后在连接所在线程确认消息。
+    
+    Args:
+        ch: 通道
+        method: 方法
+        properties: 属性
+        body: 消息内容，包含 source 和 requestedAt
+    """
+    try:
+        # 解析消息
+        message = json.loads(body)
+        
+        # 重新计算看板缓存（已被更晚的刷新覆盖的事件直接跳过，失败时删除缓存）
+        from app.services.dashboard_cache import get_refresh_executor, refresh_or_invalidate
+        future = get_refresh_executor().submit(refresh_or_invalidate, message.get("requestedAt"))
+    except Exception as e:
+        print(f"处理看板刷新消息失败: {e}")
+        # 缓存到期后由读请求重新计算，不重新入队
+        ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+        return
+
+    def acknowledge(done):
+        if done.exception() is None:
+            callback = functools.partial(ch.basic_ack, delivery_tag=method.delivery_tag)
+        else:
+            # 缓存已删除，由读请求重新计算，不重新入队
+            print(f"刷新看板失败: {done.exception()}")
+            callback = functools.partial(ch.basic_nack, delivery_tag=method.delivery_tag, requeue=False)
+        ch.connection.add_callback_threadsafe(callback)
+
+    future.add_done_callback(acknowledge)
+
+
 def process_inventory_message(message: Dict[str, Any]):
     """
     处理库存消息
@@ -89,3 +89,38 @@ def generate_report_task(params):
         "type": report_type,
         "message": f"{report_type} 报表生成完成"
     }
+
+
+@register_job_handler("rollupDailyStatsTask")
+def rollup_daily_stats_task(params):
+    """
+    日汇总任务：增量刷新订单、库存事务和质检任务的日汇总表
+    
+    Args:
+        params: 任务参数，full 为 true 时重建全部历史
+    
+    Returns:
+        任务执行结果
+    """
+    from app.db.session import BulkSessionLocal
+    from app.services.rollup import refresh_daily_rollups
+
+    print(f"执行日汇总任务，参数: {params}")
+    
+    # 记录任务执行时间
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    db = BulkSessionLocal()
+    try:
+        result = refresh_daily_rollups(db, full=bool(params.get("full")))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    
+    return {
+        "success": True,
+        "time": now,
+        "message": f"日汇总完成，重新汇总 {result['days']} 天"
+    }
@@ -0,0 +1,171 @@
+"""
+CSV/TSV 分块读取
+
+ERP 导出的 CSV 解析比 .xlsx 快得多。CsvChunkReader 与 ExcelChunkReader 接口一致（列名、重命名、丢弃列、按块迭代），
+导入服务可以用同一套校验和批量写入流程处理 CSV。
+
+- 编码：BOM 优先，其次按开头的样本判断是否为合法 UTF-8，否则按 GB18030（GBK 的超集）解码；
+- 分隔符：.tsv 为制表符，其他按标题行中制表符和逗号的数量判断；
+- 所有单元格按文本读取（保留编码类字段的前导零），空单元格为空值，由导入引擎整列转换类型；
+- 每块 DataFrame 的索引为数据行号（从0开始，不含标题行），完全为空的行会被跳过，与 Excel 读取一致。
+"""
+
+import codecs
+import csv
+import io
+import logging
+import os
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Union
+
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.excel import _column_names
+
+logger = logging.getLogger(__name__)
+
+CSV_EXTENSIONS = (".csv", ".tsv")
+
+# 判断编码时读取的样本字节数
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def is_csv_source(source: Union[str, BinaryIO]) -> bool:
+    """
+    按文件扩展名判断是否为 CSV/TSV 文件（文件对象使用其 name 属性）
+    """
+    name = source if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    return isinstance(name, (str, os.PathLike)) and os.fspath(name).lower().endswith(CSV_EXTENSIONS)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    根据文件开头的样本判断编码：BOM、UTF-8，否则为 GB18030
+    """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # 样本末尾可能截断了多字节字符，按未结束的流解码
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gb18030"
+
+
+def detect_delimiter(header_line: str, filename: str = "") -> str:
+    """
+    判断分隔符：.tsv 文件或标题行中制表符多于逗号时为制表符
+    """
+    if filename.lower().endswith(".tsv") or header_line.count("\t") > header_line.count(","):
+        return "\t"
+    return ","
+
+
+class CsvChunkReader:
+    """
+    按固定行数流式读取 CSV/TSV 文件，接口与 ExcelChunkReader 一致
+
+    用法：
+        with CsvChunkReader(file) as reader:
+            for chunk in reader:
+                ...
+    """
+
+    def __init__(self, source: Union[str, BinaryIO], chunk_size: Optional[int] = None):
+        self.chunk_size = max(chunk_size or settings.IMPORT_CHUNK_SIZE, 1)
+        self.total_rows: Optional[int] = None  # CSV 不预先统计行数
+        self.rows_read = 0  # 已读取的数据行数（含跳过的空行）
+
+        if isinstance(source, (str, os.PathLike)):
+            filename = os.fspath(source)
+            self._binary = open(source, "rb")
+            self._owns_binary = True
+        else:
+            filename = getattr(source, "name", "") or ""
+            self._binary = source
+            self._owns_binary = False
+
+        self._text: Optional[io.TextIOWrapper] = None
+        try:
+            sample = self._binary.read(ENCODING_SAMPLE_SIZE)
+            self._binary.seek(0)
+            self.encoding = detect_encoding(sample)
+            self._text = io.TextIOWrapper(self._binary, encoding=self.encoding, newline="")
+            header_line = self._text.readline()
+        except Exception:
+            self.close()
+            raise
+        self.delimiter = detect_delimiter(header_line, filename)
+        header = next(csv.reader([header_line], delimiter=self.delimiter), [])
+
+        self.columns = _column_names(header)
+        # 参与输出的列在原始行中的位置，drop_columns() 后会变化
+        self._positions = list(range(len(self.columns)))
+        logger.info(
+            f"Opened CSV file ({self.encoding}, delimiter {self.delimiter!r}), columns: {self.columns}"
+        )
+
+    def rename_columns(self, mapping: Dict[str, str]) -> None:
+        """
+        重命名列，需在读取数据前调用
+        """
+        self.columns = [mapping.get(col, col) for col in self.columns]
+
+    def drop_columns(self, columns: Iterable[str]) -> None:
+        """
+        丢弃不需要的列，需在读取数据前调用
+        """
+        dropped = set(columns)
+        kept = [(pos, col) for pos, col in zip(self._positions, self.columns) if col not in dropped]
+        self._positions = [pos for pos, _ in kept]
+        self.columns = [col for _, col in kept]
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        if not self._positions:
+            return
+        chunks = pd.read_csv(
+            self._text,
+            sep=self.delimiter,
+            header=None,
+            names=range(max(self._positions) + 1),
+            usecols=self._positions,
+            index_col=False,
+            dtype=str,
+            keep_default_na=False,
+            na_values=[""],
+            skip_blank_lines=False,
+            chunksize=self.chunk_size,
+        )
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            self.rows_read = int(chunk.index[-1]) + 1
+            chunk = chunk[self._positions]
+            chunk.columns = self.columns
+            chunk = chunk.dropna(how="all")
+            if not chunk.empty:
+                yield chunk
+
+    def close(self) -> None:
+        """
+        关闭由读取器打开的文件；调用方传入的文件对象只解除包装，不关闭
+        """
+        if self._text is not None and not self._owns_binary:
+            self._text.detach()
+        elif self._binary is not None and self._owns_binary:
+            self._binary.close()
+        self._binary = None
+        self._text = None
+
+    def __enter__(self) -> "CsvChunkReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
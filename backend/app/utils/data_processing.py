@@ -1,157 +1,321 @@
 """
 数据处理工具模块
 
-根据 Python 版本使用不同的数据处理库：
-- Python < 3.13: 使用 pandas
-- Python >= 3.13: 使用 polars
+导入服务、Excel 读取和数据处理工具都通过 get_engine() 取得 DataFrame 引擎，由配置 DATAFRAME_ENGINE 选择：
+- pandas：默认引擎，.xlsx 由 openpyxl 逐行流式读取，内存占用只与块大小有关；
+- polars：整表由 calamine 读取，在 LazyFrame 上完成列选择和空行过滤，
+  只在交给导入服务时按块转换为 pandas DataFrame（之后的分组合计与 pandas 引擎相同）。
+
+polars 是可选依赖，配置为 polars 但未安装时回退到 pandas 并记录警告。
 """
 
-import sys
+import logging
 import os
-from typing import List, Dict, Any, Union, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# polars 读取时无名列的列名前缀
+POLARS_UNNAMED_PREFIX = "__UNNAMED__"
+
+
+class DataFrameEngine:
+    """
+    DataFrame 引擎基类
+
+    读取整表和分块的方法供 ExcelChunkReader 使用；sum_by 供导入服务计算分组合计；
+    其余方法操作引擎自己的 DataFrame 类型，供数据处理工具函数使用。
+    """
+    name = "base"
+    # 是否整表读取 .xlsx（否则由 ExcelChunkReader 流式读取）
+    reads_whole_sheet = False
+
+    def read_sheet(
+        self, source: Union[str, BinaryIO], excel_engine: str, sheet: Union[int, str] = 0
+    ) -> Tuple[List[Any], Any]:
+        """
+        整表读取工作表（sheet 为从0开始的序号或工作表名称），返回原始表头和引擎的 DataFrame
+        """
+        raise NotImplementedError
+
+    def iter_chunks(
+        self, frame: Any, positions: Sequence[int], columns: Sequence[str], chunk_size: int
+    ) -> Iterator[Tuple[int, pd.DataFrame]]:
+        """
+        按位置选取列并重命名，丢弃完全为空的行，按块输出 (已读取行数, pandas DataFrame)
+
+        每块的索引为数据行号（从0开始，不含标题行）。
+        """
+        raise NotImplementedError
+
+    def sum_by(self, values: pd.Series, keys: pd.Series) -> pd.Series:
+        """
+        按 keys 分组对 values 求和，返回以分组键为索引的 Series
+        """
+        raise NotImplementedError
+
+    def read_excel(self, file_path: str, sheet_name: Optional[str] = None) -> Any:
+        raise NotImplementedError
+
+    def to_dict(self, data: Any) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def filter_data(self, data: Any, condition: Dict[str, Any]) -> Any:
+        raise NotImplementedError
+
+    def group_by(self, data: Any, columns: List[str], agg_dict: Dict[str, str]) -> Any:
+        raise NotImplementedError
+
+    def merge_data(self, left: Any, right: Any, on: Union[str, List[str]], how: str = "inner") -> Any:
+        raise NotImplementedError
+
+    def to_excel(self, data: Any, file_path: str, sheet_name: str = "Sheet1") -> None:
+        raise NotImplementedError
+
+
+class PandasEngine(DataFrameEngine):
+    """pandas 引擎"""
+    name = "pandas"
+
+    def read_sheet(self, source, excel_engine, sheet=0):
+        frame = pd.read_excel(source, engine=excel_engine, sheet_name=sheet)
+        return list(frame.columns), frame
+
+    def iter_chunks(self, frame, positions, columns, chunk_size):
+        frame = frame.iloc[:, list(positions)]
+        frame.columns = list(columns)
+        for start in range(0, len(frame), chunk_size):
+            chunk = frame.iloc[start:start + chunk_size]
+            yield start + len(chunk), chunk.dropna(how="all")
+
+    def sum_by(self, values, keys):
+        return values.groupby(keys).sum()
 
-# 根据 Python 版本选择数据处理库
-if sys.version_info >= (3, 13):
-    import polars as pl
-    USE_POLARS = True
-else:
-    import pandas as pd
-    USE_POLARS = False
+    def read_excel(self, file_path, sheet_name=None):
+        return pd.read_excel(file_path, sheet_name=sheet_name)
+
+    def to_dict(self, data):
+        return data.to_dict(orient="records")
+
+    def filter_data(self, data, condition):
+        for col, value in condition.items():
+            data = data[data[col] == value]
+        return data
+
+    def group_by(self, data, columns, agg_dict):
+        return data.groupby(columns).agg(agg_dict).reset_index()
+
+    def merge_data(self, left, right, on, how="inner"):
+        return pd.merge(left, right, on=on, how=how)
+
+    def to_excel(self, data, file_path, sheet_name="Sheet1"):
+        data.to_excel(file_path, sheet_name=sheet_name, index=False)
+
+
+class PolarsEngine(DataFrameEngine):
+    """polars 引擎"""
+    name = "polars"
+    reads_whole_sheet = True
+
+    def __init__(self):
+        import polars as pl
+        self.pl = pl
+
+    def read_sheet(self, source, excel_engine, sheet=0):
+        # calamine 同时支持 .xlsx 和 .xls，excel_engine 只用于 pandas
+        if not isinstance(source, (str, os.PathLike)):
+            source = source.read()
+        if isinstance(sheet, int):
+            frame = self.pl.read_excel(source, sheet_id=sheet + 1, engine="calamine")
+        else:
+            frame = self.pl.read_excel(source, sheet_name=sheet, engine="calamine")
+        header = [None if name.startswith(POLARS_UNNAMED_PREFIX) else name for name in frame.columns]
+        return header, frame
+
+    def iter_chunks(self, frame, positions, columns, chunk_size):
+        pl = self.pl
+        names = frame.columns
+        selected = [(names[pos], column) for pos, column in zip(positions, columns)]
+
+        lazy = frame.lazy().with_row_index("_row").select(
+            [pl.col("_row")] + [pl.col(name).alias(column) for name, column in selected]
+        )
+        # 与流式读取一致：所有单元格为空或空字符串的行视为空行
+        empty = [
+            pl.col(column).is_null() | (pl.col(column) == "") if frame.schema[name] == pl.Utf8
+            else pl.col(column).is_null()
+            for name, column in selected
+        ]
+        if empty:
+            lazy = lazy.filter(~pl.all_horizontal(empty))
+        cleaned = lazy.collect()
+
+        for start in range(0, cleaned.height, chunk_size):
+            part = cleaned.slice(start, chunk_size)
+            index = part["_row"].to_list()
+            chunk = pd.DataFrame(part.drop("_row").to_dict(as_series=False), index=index, columns=list(columns))
+            yield index[-1] + 1, chunk
+
+    def sum_by(self, values, keys):
+        # 导入服务传入的已是 pandas 的块，转换为 polars 再转回的开销大于分组求和本身
+        return values.groupby(keys).sum()
+
+    def read_excel(self, file_path, sheet_name=None):
+        if sheet_name is not None:
+            return self.pl.read_excel(file_path, sheet_name=sheet_name)
+        return self.pl.read_excel(file_path, sheet_id=0)
+
+    def to_dict(self, data):
+        return data.to_dicts()
+
+    def filter_data(self, data, condition):
+        lazy = data.lazy()
+        for col, value in condition.items():
+            lazy = lazy.filter(self.pl.col(col) == value)
+        return lazy.collect()
+
+    def group_by(self, data, columns, agg_dict):
+        pl = self.pl
+        agg_exprs = []
+        for col, agg_func in agg_dict.items():
+            if agg_func == "sum":
+                agg_exprs.append(pl.col(col).sum().alias(f"{col}_sum"))
+            elif agg_func == "mean":
+                agg_exprs.append(pl.col(col).mean().alias(f"{col}_mean"))
+            elif agg_func == "count":
+                agg_exprs.append(pl.col(col).count().alias(f"{col}_count"))
+            elif agg_func == "min":
+                agg_exprs.append(pl.col(col).min().alias(f"{col}_min"))
+            elif agg_func == "max":
+                agg_exprs.append(pl.col(col).max().alias(f"{col}_max"))
+        return data.lazy().group_by(columns).agg(agg_exprs).collect()
+
+    def merge_data(self, left, right, on, how="inner"):
+        # polars 的外连接名为 full
+        return left.join(right, on=on, how="full" if how == "outer" else how)
+
+    def to_excel(self, data, file_path, sheet_name="Sheet1"):
+        # polars 没有直接保存为 Excel 的方法，需要先转换为 pandas
+        pd.DataFrame(data.to_dicts()).to_excel(file_path, sheet_name=sheet_name, index=False)
+
+
+ENGINES = {
+    PandasEngine.name: PandasEngine,
+    PolarsEngine.name: PolarsEngine,
+}
+
+_engines: Dict[str, DataFrameEngine] = {}
+
+
+def get_engine(name: Optional[str] = None) -> DataFrameEngine:
+    """
+    获取 DataFrame 引擎，默认使用配置 DATAFRAME_ENGINE
+
+    Raises:
+        ValueError: 未知的引擎名称
+    """
+    name = (name or settings.DATAFRAME_ENGINE).lower()
+    if name not in ENGINES:
+        raise ValueError(f"未知的 DataFrame 引擎: {name}，可选值: {', '.join(ENGINES)}")
+    engine = _engines.get(name)
+    if engine is None:
+        try:
+            engine = ENGINES[name]()
+        except ImportError as e:
+            logger.warning(f"DataFrame engine {name} is not available ({e}), falling back to pandas")
+            engine = _engines.setdefault(PandasEngine.name, PandasEngine())
+        _engines[name] = engine
+    return engine
+
+
+# 兼容旧代码：当前配置是否使用 polars
+USE_POLARS = get_engine().name == PolarsEngine.name
 
 
 def read_excel(file_path: str, sheet_name: Optional[str] = None) -> Union[Dict[str, Any], Any]:
     """
     读取 Excel 文件
-    
+
     Args:
         file_path: Excel 文件路径
         sheet_name: 工作表名称，如果为 None，则读取所有工作表
-        
+
     Returns:
         如果 sheet_name 为 None，返回包含所有工作表的字典
         否则返回指定工作表的数据
     """
-    if USE_POLARS:
-        if sheet_name is None:
-            # 获取所有工作表名称
-            import openpyxl
-            wb = openpyxl.load_workbook(file_path, read_only=True)
-            sheet_names = wb.sheetnames
-            wb.close()
-            
-            # 读取所有工作表
-            result = {}
-            for name in sheet_names:
-                result[name] = pl.read_excel(file_path, sheet_name=name)
-            return result
-        else:
-            return pl.read_excel(file_path, sheet_name=sheet_name)
-    else:
-        return pd.read_excel(file_path, sheet_name=sheet_name)
+    return get_engine().read_excel(file_path, sheet_name)
 
 
 def to_dict(data: Any) -> List[Dict[str, Any]]:
     """
     将数据转换为字典列表
-    
+
     Args:
         data: pandas DataFrame 或 polars DataFrame
-        
+
     Returns:
         字典列表
     """
-    if USE_POLARS:
-        return data.to_dicts()
-    else:
-        return data.to_dict(orient="records")
+    return get_engine().to_dict(data)
 
 
 def filter_data(data: Any, condition: Dict[str, Any]) -> Any:
     """
     根据条件筛选数据
-    
+
     Args:
         data: pandas DataFrame 或 polars DataFrame
         condition: 筛选条件，键为列名，值为筛选值
-        
+
     Returns:
         筛选后的数据
     """
-    if USE_POLARS:
-        filtered_data = data
-        for col, value in condition.items():
-            filtered_data = filtered_data.filter(pl.col(col) == value)
-        return filtered_data
-    else:
-        filtered_data = data
-        for col, value in condition.items():
-            filtered_data = filtered_data[filtered_data[col] == value]
-        return filtered_data
+    return get_engine().filter_data(data, condition)
 
 
 def group_by(data: Any, columns: List[str], agg_dict: Dict[str, str]) -> Any:
     """
     分组聚合数据
-    
+
     Args:
         data: pandas DataFrame 或 polars DataFrame
         columns: 分组列
         agg_dict: 聚合字典，键为列名，值为聚合函数
-        
+
     Returns:
         聚合后的数据
     """
-    if USE_POLARS:
-        agg_exprs = []
-        for col, agg_func in agg_dict.items():
-            if agg_func == "sum":
-                agg_exprs.append(pl.sum(col).alias(f"{col}_sum"))
-            elif agg_func == "mean":
-                agg_exprs.append(pl.mean(col).alias(f"{col}_mean"))
-            elif agg_func == "count":
-                agg_exprs.append(pl.count(col).alias(f"{col}_count"))
-            elif agg_func == "min":
-                agg_exprs.append(pl.min(col).alias(f"{col}_min"))
-            elif agg_func == "max":
-                agg_exprs.append(pl.max(col).alias(f"{col}_max"))
-        
-        return data.group_by(columns).agg(agg_exprs)
-    else:
-        return data.groupby(columns).agg(agg_dict).reset_index()
+    return get_engine().group_by(data, columns, agg_dict)
 
 
 def merge_data(left: Any, right: Any, on: Union[str, List[str]], how: str = "inner") -> Any:
     """
     合并数据
-    
+
     Args:
         left: 左侧数据
         right: 右侧数据
         on: 连接列
         how: 连接方式，可选值为 "inner", "left", "right", "outer"
-        
+
     Returns:
         合并后的数据
     """
-    if USE_POLARS:
-        return left.join(right, on=on, how=how)
-    else:
-        return pd.merge(left, right, on=on, how=how)
+    return get_engine().merge_data(left, right, on, how)
 
 
 def to_excel(data: Any, file_path: str, sheet_name: str = "Sheet1") -> None:
     """
     将数据保存为 Excel 文件
-    
+
     Args:
         data: pandas DataFrame 或 polars DataFrame
         file_path: 保存路径
         sheet_name: 工作表名称
     """
-    if USE_POLARS:
-        # polars 没有直接保存为 Excel 的方法，需要先转换为 pandas
-        import pandas as pd
-        pd_data = pd.DataFrame(data.to_dicts())
-        pd_data.to_excel(file_path, sheet_name=sheet_name, index=False)
-    else:
-        data.to_excel(file_path, sheet_name=sheet_name, index=False)
+    get_engine().to_excel(data, file_path, sheet_name)
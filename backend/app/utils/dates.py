@@ -0,0 +1,204 @@
+"""
+Excel 日期列规范化
+
+导入文件中的日期列可能是 Excel 日期单元格、Excel 序列号、YYYYMMDD 数字或多种格式的字符串。
+normalize_date_column 按列处理：
+
+- 抽样判断列类型：日期单元格和数字整列向量化转换，数字不超过 EXCEL_SERIAL_MAX 的按 Excel 序列号处理，
+  8 位整数按 YYYYMMDD 处理；
+- 字符串先去重，用前 SAMPLE_SIZE 个不同值探测整列格式，再对所有不同值一次 to_datetime，
+  个别不符合探测格式的值逐个尝试全部格式，结果按字符串缓存；
+- 结果只为不同的日期创建 date 对象。
+
+无法解析的值使用默认值，每列只记录一条汇总日志。
+"""
+
+import logging
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 支持的字符串日期格式，按优先级排列（“年月日”格式先替换为 YYYY-MM-DD）
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%Y.%m.%d",
+    "%Y%m%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+)
+
+# Excel 日期系统从1899-12-30开始计算，序列号1对应1900-01-01
+EXCEL_EPOCH = pd.Timestamp("1899-12-30")
+# 大于等于该值的数字按 YYYYMMDD 解析（如 20250216）
+YYYYMMDD_MIN = 10000101
+# Excel 序列号上限（2199-12-31），更大的数字不是合理的单据日期
+EXCEL_SERIAL_MAX = 109574
+
+# 探测列类型和字符串格式时使用的样本个数
+SAMPLE_SIZE = 100
+# 抽样判断为数字列的 infer_dtype 结果
+NUMERIC_KINDS = ("integer", "floating", "mixed-integer-float", "decimal")
+
+
+def _normalize_text(text: str) -> str:
+    text = text.strip()
+    if "年" in text or "月" in text or "日" in text:
+        text = text.replace("年", "-").replace("月", "-").replace("日", "")
+    return text
+
+
+@lru_cache(maxsize=4096)
+def parse_date_string(text: str) -> Optional[date]:
+    """
+    依次尝试全部格式解析单个日期字符串，无法解析时返回 None（结果按字符串缓存）
+    """
+    text = _normalize_text(text)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def detect_date_format(samples: Iterable[str]) -> Optional[str]:
+    """
+    返回能解析全部样本的第一个格式，没有时返回 None
+    """
+    samples = [_normalize_text(text) for text in samples]
+    samples = [text for text in samples if text]
+    if not samples:
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            for text in samples:
+                datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return fmt
+    return None
+
+
+def _numeric_dates(values: pd.Series) -> pd.Series:
+    """
+    数字整列转换为时间戳：不超过 EXCEL_SERIAL_MAX 的按 Excel 序列号，8 位整数按 YYYYMMDD
+    """
+    serial = values.where(values.between(0, EXCEL_SERIAL_MAX))
+    result = (EXCEL_EPOCH + pd.to_timedelta(np.floor(serial), unit="D")).astype("datetime64[us]")
+    yyyymmdd = values.between(YYYYMMDD_MIN, 99991231) & (values == np.floor(values))
+    if yyyymmdd.any():
+        result[yyyymmdd] = pd.to_datetime(
+            values[yyyymmdd].astype("int64").astype(str), format="%Y%m%d", errors="coerce"
+        )
+    return result
+
+
+def _string_dates(texts: pd.Series) -> pd.Series:
+    """
+    字符串整列转换为时间戳：只解析不同值，按抽样探测到的格式一次转换
+    """
+    uniques = pd.Series(texts.unique())
+    fmt = detect_date_format(uniques.head(SAMPLE_SIZE))
+    if fmt is not None:
+        parsed = pd.to_datetime(uniques.map(_normalize_text), format=fmt, errors="coerce")
+    else:
+        parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[us]")
+
+    # 不符合探测格式的值逐个尝试全部格式
+    failed = parsed.isna()
+    if failed.any():
+        parsed[failed] = pd.to_datetime(uniques[failed].map(parse_date_string))
+    return texts.map(dict(zip(uniques, parsed)))
+
+
+def _mixed_dates(values: pd.Series) -> pd.Series:
+    """
+    混合类型列按单元格类型分组转换为时间戳
+    """
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[us]")
+    is_text = values.map(lambda value: isinstance(value, str))
+    is_date = values.map(lambda value: isinstance(value, (date, datetime)))
+    is_number = values.notna() & ~is_text & ~is_date
+
+    if is_date.any():
+        parsed[is_date] = pd.to_datetime(values[is_date])
+    if is_number.any():
+        numbers = pd.to_numeric(values[is_number], errors="coerce").astype("float64")
+        parsed[is_number] = _numeric_dates(numbers)
+    texts = values[is_text].str.strip()
+    texts = texts[texts != ""]
+    if not texts.empty:
+        parsed[texts.index] = _string_dates(texts)
+    return parsed
+
+
+def _object_dates(values: pd.Series) -> pd.Series:
+    """
+    object 列转换为时间戳：抽样判断为数字列时先整列按数字转换，其余单元格按类型分组转换
+    """
+    kind = pd.api.types.infer_dtype(values.dropna().head(SAMPLE_SIZE), skipna=True)
+    if kind not in NUMERIC_KINDS:
+        return _mixed_dates(values)
+
+    numbers = pd.to_numeric(values, errors="coerce").astype("float64")
+    parsed = _numeric_dates(numbers)
+    rest = values.notna() & numbers.isna()
+    if rest.any():
+        parsed[rest] = _mixed_dates(values[rest])
+    return parsed
+
+
+def _to_dates(parsed: pd.Series, default: Optional[date]) -> pd.Series:
+    """
+    时间戳列转换为 date 对象，只为不同值创建对象
+    """
+    codes, uniques = pd.factorize(parsed)
+    lookup = np.array([value.date() for value in uniques] + [default], dtype=object)
+    # factorize 对空值返回 -1，正好取到最后的默认值
+    return pd.Series(lookup[codes], index=parsed.index, dtype=object)
+
+
+def normalize_date_column(
+    values: pd.Series, default: Optional[date] = None, field_name: str = "date"
+) -> pd.Series:
+    """
+    将一列日期值规范化为 date 对象，空值和无法解析的值使用默认值
+
+    Args:
+        values: 日期列（可以混合日期、数字和字符串）
+        default: 空值或解析失败时的默认值
+        field_name: 字段名称，用于日志记录
+
+    Returns:
+        与输入索引一致、元素为 date 或默认值的 Series
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        parsed = values
+    elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        parsed = _numeric_dates(values.astype("float64"))
+    else:
+        parsed = _object_dates(values)
+
+    # 空白字符串与空值相同，不计入解析失败
+    failed = values[values.notna() & parsed.isna()]
+    blank = failed.map(lambda value: isinstance(value, str) and not value.strip()).astype(bool)
+    unparsed = int((~blank).sum())
+    if unparsed:
+        logger.warning(f"{unparsed} {field_name} values could not be parsed, using default value")
+
+    return _to_dates(parsed, default)
+
+
+def parse_date(value: Any, default: Optional[date] = None, field_name: str = "date") -> Optional[date]:
+    """
+    解析单个日期值，规则与 normalize_date_column 相同
+    """
+    return normalize_date_column(pd.Series([value], dtype=object), default, field_name).iloc[0]
@@ -1,7 +1,256 @@
+import io
+import logging
+import os
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
 import pandas as pd
-from typing import List, Dict, Any, Optional
 from fastapi import HTTPException, status
-import io
+from openpyxl import load_workbook
+
+from app.core.config import settings
+from app.utils.data_processing import DataFrameEngine, get_engine
+from app.utils.dates import normalize_date_column
+
+logger = logging.getLogger(__name__)
+
+
+# 文件头签名：.xlsx 是 zip 包，.xls 是 OLE2 复合文档
+XLSX_SIGNATURE = b"PK\x03\x04"
+XLS_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+
+def detect_excel_engine(source: Union[str, BinaryIO]) -> str:
+    """
+    根据文件头识别Excel格式
+
+    Args:
+        source: 文件路径或二进制文件对象（读取后恢复原位置）
+
+    Returns:
+        pandas 引擎名：openpyxl（.xlsx）或 xlrd（.xls）
+
+    Raises:
+        ValueError: 不是可识别的Excel文件
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            header = f.read(8)
+    else:
+        position = source.tell()
+        header = source.read(8)
+        source.seek(position)
+
+    if header.startswith(XLSX_SIGNATURE):
+        return "openpyxl"
+    if header.startswith(XLS_SIGNATURE):
+        return "xlrd"
+    raise ValueError("无法识别的Excel文件格式")
+
+
+def read_excel_file(source: Union[str, BinaryIO]) -> pd.DataFrame:
+    """
+    整表读取Excel文件，格式由文件头识别，经配置的 DataFrame 引擎读取
+
+    Args:
+        source: 文件路径或二进制文件对象
+
+    Returns:
+        DataFrame，列名已去除前后空格，完全为空的行已丢弃
+    """
+    engine = get_engine()
+    header, frame = engine.read_sheet(source, detect_excel_engine(source))
+    columns = _column_names(header)
+    chunks = [chunk for _, chunk in engine.iter_chunks(frame, range(len(columns)), columns, max(len(frame), 1))]
+    return chunks[0] if chunks else pd.DataFrame(columns=columns)
+
+
+def list_sheet_names(source: Union[str, BinaryIO]) -> List[str]:
+    """
+    列出Excel文件中的工作表名称（按工作簿中的顺序）
+
+    Raises:
+        ValueError: 不是可识别的Excel文件
+    """
+    if detect_excel_engine(source) == "openpyxl":
+        workbook = load_workbook(source, read_only=True)
+        try:
+            return list(workbook.sheetnames)
+        finally:
+            workbook.close()
+    return list(pd.ExcelFile(source, engine="xlrd").sheet_names)
+
+
+def _column_names(header: Sequence[Any]) -> List[str]:
+    """
+    生成与 pandas 一致的列名：去除前后空格，空列名为 "Unnamed: i"，重复列名依次追加 .1、.2
+    """
+    names = []
+    seen: Dict[str, int] = {}
+    for i, value in enumerate(header):
+        name = "" if value is None else str(value).strip()
+        if name == "":
+            name = f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+class ExcelChunkReader:
+    """
+    按固定行数分块读取Excel工作表（默认第一个，sheet 可以是从0开始的序号或工作表名称）
+
+    .xlsx 使用 openpyxl 只读模式逐行解析，内存占用只与块大小有关；
+    .xls 格式最多 65536 行，整表读取后再按块切分。DataFrame 引擎整表读取时（polars），
+    .xlsx 也由引擎整表读取后按块切分。
+    每块 DataFrame 的索引为数据行号（从0开始，不含标题行），与整表读取时一致；完全为空的行会被跳过。
+
+    用法：
+        with ExcelChunkReader(file) as reader:
+            for chunk in reader:
+                ...
+    """
+
+    def __init__(
+        self,
+        source: Union[str, BinaryIO],
+        chunk_size: Optional[int] = None,
+        frame_engine: Optional[DataFrameEngine] = None,
+        sheet: Union[int, str] = 0,
+    ):
+        self.chunk_size = max(chunk_size or settings.IMPORT_CHUNK_SIZE, 1)
+        self.engine = detect_excel_engine(source)
+        self.frame_engine = frame_engine or get_engine()
+        self.total_rows: Optional[int] = None  # 预估数据行数，来自工作表维度信息，可能不准确
+        self.rows_read = 0  # 已读取的数据行数（含跳过的空行）
+
+        self._workbook = None
+        self._rows: Optional[Iterator[Sequence[Any]]] = None
+        self._frame: Any = None
+
+        if self.engine == "openpyxl" and not self.frame_engine.reads_whole_sheet:
+            self._workbook = load_workbook(source, read_only=True, data_only=True)
+            try:
+                worksheet = self._workbook.worksheets[sheet] if isinstance(sheet, int) else self._workbook[sheet]
+            except (IndexError, KeyError):
+                self._workbook.close()
+                raise ValueError(f"工作表不存在: {sheet}")
+            self._rows = worksheet.iter_rows(values_only=True)
+            header = next(self._rows, ())
+            if worksheet.max_row:
+                self.total_rows = max(worksheet.max_row - 1, 0)
+        else:
+            header, self._frame = self.frame_engine.read_sheet(source, self.engine, sheet)
+            self.total_rows = len(self._frame)
+
+        self.columns = _column_names(header)
+        # 参与输出的列在原始行中的位置，drop_columns() 后会变化
+        self._positions = list(range(len(self.columns)))
+        logger.info(
+            f"Opened Excel file with {self.engine} ({self.frame_engine.name}), "
+            f"columns: {self.columns}, estimated rows: {self.total_rows}"
+        )
+
+    def rename_columns(self, mapping: Dict[str, str]) -> None:
+        """
+        重命名列，需在读取数据前调用
+        """
+        self.columns = [mapping.get(col, col) for col in self.columns]
+
+    def drop_columns(self, columns: Iterable[str]) -> None:
+        """
+        丢弃不需要的列，需在读取数据前调用
+        """
+        dropped = set(columns)
+        kept = [(pos, col) for pos, col in zip(self._positions, self.columns) if col not in dropped]
+        self._positions = [pos for pos, _ in kept]
+        self.columns = [col for _, col in kept]
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        if self._frame is not None:
+            yield from self._iter_frame()
+        else:
+            yield from self._iter_rows()
+
+    def _iter_frame(self) -> Iterator[pd.DataFrame]:
+        frame, self._frame = self._frame, None
+        for rows_read, chunk in self.frame_engine.iter_chunks(frame, self._positions, self.columns, self.chunk_size):
+            self.rows_read = rows_read
+            yield chunk
+        self.rows_read = len(frame)
+
+    def _iter_rows(self) -> Iterator[pd.DataFrame]:
+        positions = self._positions
+        rows: List[List[Any]] = []
+        index: List[int] = []
+        for row in self._rows:
+            row_no = self.rows_read
+            self.rows_read += 1
+            values = [row[pos] if pos < len(row) else None for pos in positions]
+            if all(value is None or value == "" for value in values):
+                continue
+            rows.append(values)
+            index.append(row_no)
+            if len(rows) >= self.chunk_size:
+                yield pd.DataFrame(rows, columns=self.columns, index=index)
+                rows, index = [], []
+        if rows:
+            yield pd.DataFrame(rows, columns=self.columns, index=index)
+
+    def close(self) -> None:
+        """
+        关闭工作簿（只读模式会一直持有文件句柄）
+        """
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+        self._rows = None
+        self._frame = None
+
+    def __enter__(self) -> "ExcelChunkReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+# 导入接口接受的文件扩展名
+IMPORT_EXTENSIONS = (".xls", ".xlsx", ".csv", ".tsv")
+
+
+def check_import_filename(filename: Optional[str]) -> None:
+    """
+    检查上传文件名和扩展名（Excel 或 CSV/TSV，不区分大小写）
+
+    Raises:
+        HTTPException: 文件名为空或扩展名不支持
+    """
+    if not filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="文件名不能为空"
+        )
+    if not filename.lower().endswith(IMPORT_EXTENSIONS):
+        logger.warning(f"Invalid file type: {filename}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="只支持Excel文件(.xls, .xlsx)和CSV文件(.csv, .tsv)"
+        )
+
+
+def open_chunk_reader(
+    source: Union[str, BinaryIO], chunk_size: Optional[int] = None, sheet: Union[int, str] = 0
+):
+    """
+    按扩展名打开分块读取器：.csv/.tsv 使用 CsvChunkReader（忽略 sheet），其他按Excel读取
+    """
+    from app.utils.csv_reader import CsvChunkReader, is_csv_source
+    if is_csv_source(source):
+        return CsvChunkReader(source, chunk_size)
+    return ExcelChunkReader(source, chunk_size, sheet=sheet)
 
 
 def validate_excel_columns(df: pd.DataFrame, required_columns: List[str]) -> List[str]:
@@ -30,7 +279,7 @@ def process_purchase_order_excel(file_content: bytes) -> pd.DataFrame:
         处理后的DataFrame
     """
     try:
-        df = pd.read_excel(io.BytesIO(file_content))
+        df = read_excel_file(io.BytesIO(file_content))
         
         # 验证必要的列是否存在
         required_columns = ["采购订单号", "行项目号", "物料编码"]
@@ -47,7 +296,7 @@ def process_purchase_order_excel(file_content: bytes) -> pd.DataFrame:
         
         # 2. 处理日期列
         if "订单生成日期" in df.columns:
-            df["订单生成日期"] = pd.to_datetime(df["订单生成日期"], errors="coerce").dt.date
+            df["订单生成日期"] = normalize_date_column(df["订单生成日期"], field_name="订单生成日期")
         
         # 3. 处理数值列
         numeric_columns = ["申请数量", "签约单价", "签约金额", "采购订单数"]
@@ -74,7 +323,7 @@ def process_outbound_excel(file_content: bytes) -> pd.DataFrame:
         处理后的DataFrame
     """
     try:
-        df = pd.read_excel(io.BytesIO(file_content))
+        df = read_excel_file(io.BytesIO(file_content))
         
         # 验证必要的列是否存在
         required_columns = ["物料凭证", "物料编码", "实拨数量", "具体用料部门"]
@@ -93,7 +342,7 @@ def process_outbound_excel(file_content: bytes) -> pd.DataFrame:
         date_columns = ["开单日期", "发料日期"]
         for col in date_columns:
             if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors="coerce").dt.date
+                df[col] = normalize_date_column(df[col], field_name=col)
         
         # 3. 处理数值列
         numeric_columns = ["实拨数量", "出库单价", "出库金额", "应拨数量", "合计金额", "销售金额", "管理费率"]
@@ -0,0 +1,130 @@
+"""
+列表分页工具
+
+游标分页（keyset）按 (排序列, id) 组合键定位下一页，不使用 OFFSET，
+无论翻到第几页查询代价都相同。游标对客户端不透明，内容为 base64 编码的上一页最后一行的键值。
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import literal, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+logger = logging.getLogger(__name__)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    将一行的键值编码为游标
+    """
+    payload = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    解码游标
+
+    Raises:
+        HTTPException: 游标格式无效
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError("unexpected cursor length")
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except Exception as e:
+        logger.warning(f"Invalid cursor {cursor!r}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+
+def paginate_keyset(
+    query: Query,
+    keys: Sequence[Any],
+    cursor: str,
+    size: int,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    按组合键做游标分页
+
+    Args:
+        query: 已应用过滤条件的查询（原有排序会被替换）
+        keys: 排序键列，最后一列必须唯一（通常为 id），查询结果中需能按列名取到这些键
+        cursor: 上一页返回的 next_cursor，空字符串表示第一页
+        size: 每页条数
+        descending: 是否按降序排列
+
+    Returns:
+        (本页记录, 下一页游标)，没有下一页时游标为 None
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        bound = tuple_(*[literal(value, type_=key.type) for key, value in zip(keys, values)])
+        query = query.filter(tuple_(*keys) < bound if descending else tuple_(*keys) > bound)
+
+    order_by = [key.desc() if descending else key.asc() for key in keys]
+    rows = query.order_by(None).order_by(*order_by).limit(size + 1).all()
+
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, key.key) for key in keys])
+    return rows, next_cursor
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN 语句，仅用于读取 PostgreSQL 的行数估算"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_count(query: Query) -> int:
+    """
+    估算查询结果行数
+
+    PostgreSQL 下读取查询计划的估算行数，不扫描数据；其他数据库直接 COUNT。
+    """
+    query = query.order_by(None)
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return query.count()
+    try:
+        plan = query.session.execute(_Explain(query.statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Failed to estimate row count, falling back to COUNT: {str(e)}")
+        return query.count()
+
+
+def count_total(query: Query, exact: bool) -> int:
+    """
+    计算总数：exact 为 True 时精确计数，否则返回估算值
+    """
+    return query.order_by(None).count() if exact else estimate_count(query)
@@ -0,0 +1,54 @@
+"""
+列表查询的模糊搜索条件
+
+子串搜索统一编译为 ILIKE '%关键字%'。PostgreSQL 下对应列建有 pg_trgm GIN 索引
+（见迁移 add_trigram_search_indexes），前导通配符的 ILIKE 可以走索引；
+SQLite 等其他数据库没有三元组索引，按普通 LIKE 扫描，结果一致。
+"""
+
+from typing import Any, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+LIKE_ESCAPE = "\\"
+
+
+def escape_like(value: str) -> str:
+    """
+    转义 LIKE 通配符，使关键字中的 % 和 _ 按字面匹配
+    """
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def contains(column: Any, keyword: Any) -> Optional[ColumnElement]:
+    """
+    构建不区分大小写的子串匹配条件，关键字为空时返回 None
+    """
+    if keyword is None:
+        return None
+    keyword = str(keyword).strip()
+    if not keyword:
+        return None
+    return column.ilike(f"%{escape_like(keyword)}%", escape=LIKE_ESCAPE)
+
+
+def apply_search_filters(query: Query, filters: Iterable[Tuple[Any, Any]]) -> Query:
+    """
+    依次应用 (列, 关键字) 子串搜索条件，跳过为空的关键字
+
+    用法：
+        query = apply_search_filters(query, [
+            (OutboundOrder.department, department),
+            (OutboundOrder.user_unit, user_unit),
+        ])
+    """
+    for column, keyword in filters:
+        condition = contains(column, keyword)
+        if condition is not None:
+            query = query.filter(condition)
+    return query
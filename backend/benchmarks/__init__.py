@@ -0,0 +1,10 @@
+"""
+性能基准脚本
+
+每个脚本可以单独运行，例如：
+    python -m benchmarks.search_plans --rows 500000
+
+端到端基准先生成数据，再对接口施压：
+    python -m benchmarks.datagen --database-url sqlite:///./bench.db --orders 100000 --recreate
+    python -m benchmarks.endpoints --database-url sqlite:///./bench.db --output baseline.json
+"""
@@ -0,0 +1,116 @@
+"""
+CSV 导入基准：同一份出库 / 采购订单数据分别保存为 .xlsx 和 GBK 编码的 .csv，对比分块读取和清洗的吞吐量
+
+读取走导入服务使用的 open_outbound_reader / open_purchase_reader（按扩展名选择 Excel 或 CSV 读取器），
+清洗与 dataframe_engines 基准一致：规范化物料凭证 / 采购订单号并解析金额。
+
+用法：
+    python -m benchmarks.csv_import --rows 100000
+    python -m benchmarks.csv_import --rows 100000 --output csv.json
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.outbound_import import _numeric_column, normalize_code_column, open_outbound_reader  # noqa: E402
+from app.services.purchase_import import open_purchase_reader  # noqa: E402
+from benchmarks.dataframe_engines import TEMPLATES, build_file  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger("benchmarks.csv_import")
+logger.setLevel(logging.INFO)
+
+READERS: Dict[str, Callable[..., Any]] = {
+    "outbound": open_outbound_reader,
+    "purchase": open_purchase_reader,
+}
+
+
+def write_csv(path: str, header: List[str], make_row: Callable[[int], List[Any]], rows: int) -> None:
+    """
+    以 GBK 编码写出与 Excel 文件相同的数据（ERP 导出的默认编码）
+    """
+    with open(path, "w", encoding="gbk", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            writer.writerow(["" if value is None else value for value in make_row(i)])
+
+
+def _read(path: str, name: str, template: Dict[str, Any], chunk_size: int) -> Dict[str, Any]:
+    """
+    分块读取并清洗一个文件，返回行数、耗时和吞吐量
+    """
+    rows = 0
+    started = time.perf_counter()
+    with READERS[name](path, chunk_size) as reader:
+        for chunk in reader:
+            normalize_code_column(chunk[template["key"]])
+            _numeric_column(chunk, template["amount"])
+            rows += len(chunk)
+    seconds = time.perf_counter() - started
+    return {
+        "format": os.path.splitext(path)[1].lstrip("."),
+        "rows": rows,
+        "size_mb": round(os.path.getsize(path) / (1024 * 1024), 2),
+        "seconds": round(seconds, 3),
+        "rows_per_s": int(rows / seconds) if seconds else 0,
+    }
+
+
+def run(rows: int, chunk_size: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    为每个模板生成 .xlsx 和 .csv 文件，依次读取
+    """
+    report: Dict[str, List[Dict[str, Any]]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, template in TEMPLATES.items():
+            logger.info(f"Generating {rows} {name} rows")
+            xlsx_path = os.path.join(directory, f"{name}.xlsx")
+            with open(xlsx_path, "wb") as f:
+                f.write(build_file(template["header"], template["row"], rows))
+            csv_path = os.path.join(directory, f"{name}.csv")
+            write_csv(csv_path, template["header"], template["row"], rows)
+
+            report[name] = [_read(path, name, template, chunk_size) for path in (xlsx_path, csv_path)]
+    return report
+
+
+def _print_report(report: Dict[str, List[Dict[str, Any]]]) -> None:
+    for name, results in report.items():
+        print(f"===== {name} =====")
+        for result in results:
+            print(
+                f"-- {result['format']:>4}: {result['rows']} rows, {result['size_mb']}MB, "
+                f"{result['seconds']}s, {result['rows_per_s']} rows/s"
+            )
+        xlsx, csv_result = results
+        if csv_result["seconds"]:
+            print(f"-- csv speedup: {xlsx['seconds'] / csv_result['seconds']:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CSV 导入基准")
+    parser.add_argument("--rows", type=int, default=100000, help="每个模板生成的数据行数")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="分块行数")
+    parser.add_argument("--output", help="结果另存为 JSON 文件")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.chunk_size)
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
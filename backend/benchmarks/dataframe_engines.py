@@ -0,0 +1,172 @@
+"""
+DataFrame 引擎基准：按出库和采购订单导入模板生成 Excel 文件，对比各引擎读取、清洗和分组合计的耗时
+
+每个引擎的处理与导入服务一致：ExcelChunkReader 分块读取（丢弃序号列、跳过空行），
+再按物料凭证 / 采购订单号对金额分组求和。未安装的引擎会被跳过。
+
+用法：
+    python -m benchmarks.dataframe_engines --rows 100000
+    python -m benchmarks.dataframe_engines --rows 50000 --engines pandas polars --output engines.json
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+from openpyxl import Workbook
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.outbound_import import _numeric_column, normalize_code_column  # noqa: E402
+from app.utils.data_processing import ENGINES, get_engine  # noqa: E402
+from app.utils.excel import ExcelChunkReader  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger("benchmarks.dataframe_engines")
+logger.setLevel(logging.INFO)
+
+# 与 create_outbound_template.py 一致的出库导入模板
+OUTBOUND_HEADER = [
+    "序号", "物料凭证", "开单日期", "物料编码", "物资名称及规格型号", "计量单位", "实拨数量", "出库单价",
+    "具体用料部门", "料单分属", "物资品种码", "工程编码", "应拨数量", "出库金额", "用料单位",
+    "单据类型", "合计金额", "发料日期", "销售金额", "转储订单/销售订单", "管理费率",
+]
+
+PURCHASE_HEADER = [
+    "序号", "采购订单号", "行项目号", "计划编号", "用户单位", "大类", "订单生成日期", "供应商名称", "供应商代码",
+    "物料组", "一级目录产品", "工厂", "物料编码", "物资描述", "计量单位", "申请数量", "签约单价", "签约金额",
+    "产品标准", "长描述", "价格标志", "采购订单数",
+]
+
+
+def _outbound_row(i: int) -> List[Any]:
+    quantity = i % 50 + 1
+    price = round(1 + (i % 97) * 0.37, 2)
+    return [
+        i + 1, 4900000000 + i // 8, 45658 + i % 365, 100200000 + i % 5000, f"物资{i % 5000} 规格{i % 17}", "个",
+        quantity, price, f"第{i % 40}车间", "生产", f"C{i % 30:03d}", f"P{i % 200:05d}", quantity,
+        round(quantity * price, 2), f"分公司{i % 12}", "正常出库", None, "2025/01/02", 0, "", 0,
+    ]
+
+
+def _purchase_row(i: int) -> List[Any]:
+    quantity = i % 50 + 1
+    price = round(1 + (i % 97) * 0.37, 2)
+    return [
+        i + 1, f"45{i // 10:08d}", (i % 10 + 1) * 10, f"JH{i % 300:05d}", f"分公司{i % 12}", f"大类{i % 8}",
+        "2025/01/02", f"供应商{i % 150}", f"S{i % 150:05d}", f"MG{i % 40}", f"产品{i % 25}", "1000",
+        100200000 + i % 5000, f"物资{i % 5000}", "个", quantity, price, None, f"GB/T {i % 900}",
+        f"长描述 {i % 5000}", "N", quantity,
+    ]
+
+
+TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "outbound": {"header": OUTBOUND_HEADER, "row": _outbound_row, "key": "物料凭证", "amount": "出库金额"},
+    "purchase": {"header": PURCHASE_HEADER, "row": _purchase_row, "key": "采购订单号", "amount": "签约金额"},
+}
+
+
+def build_file(header: List[str], make_row: Callable[[int], List[Any]], rows: int) -> bytes:
+    """
+    以 openpyxl 只写模式生成 .xlsx 文件内容
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for i in range(rows):
+        sheet.append(make_row(i))
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _run_engine(engine_name: str, content: bytes, template: Dict[str, Any], chunk_size: int) -> Dict[str, Any]:
+    """
+    用指定引擎完成一次读取、清洗和分组合计，分别记录耗时
+    """
+    engine = get_engine(engine_name)
+    read_seconds = clean_seconds = group_seconds = 0.0
+    rows = groups = 0
+
+    started = time.perf_counter()
+    with ExcelChunkReader(io.BytesIO(content), chunk_size, frame_engine=engine) as reader:
+        reader.drop_columns(["序号"])
+        chunks = iter(reader)
+        while True:
+            read_started = time.perf_counter()
+            chunk = next(chunks, None)
+            read_seconds += time.perf_counter() - read_started
+            if chunk is None:
+                break
+
+            clean_started = time.perf_counter()
+            keys = normalize_code_column(chunk[template["key"]])
+            amounts = _numeric_column(chunk, template["amount"]).fillna(0)
+            clean_seconds += time.perf_counter() - clean_started
+
+            group_started = time.perf_counter()
+            groups += len(engine.sum_by(amounts, keys))
+            group_seconds += time.perf_counter() - group_started
+            rows += len(chunk)
+
+    return {
+        "engine": engine.name,
+        "rows": rows,
+        "groups": groups,
+        "read_s": round(read_seconds, 3),
+        "clean_s": round(clean_seconds, 3),
+        "group_s": round(group_seconds, 3),
+        "total_s": round(time.perf_counter() - started, 3),
+    }
+
+
+def run(rows: int, engines: List[str], chunk_size: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    为每个模板生成文件，依次用各引擎处理
+    """
+    report: Dict[str, List[Dict[str, Any]]] = {}
+    for name, template in TEMPLATES.items():
+        logger.info(f"Generating {rows} {name} rows")
+        content = build_file(template["header"], template["row"], rows)
+        report[name] = []
+        for engine_name in engines:
+            if get_engine(engine_name).name != engine_name:
+                logger.warning(f"Engine {engine_name} is not installed, skipped")
+                continue
+            report[name].append(_run_engine(engine_name, content, template, chunk_size))
+    return report
+
+
+def _print_report(report: Dict[str, List[Dict[str, Any]]]) -> None:
+    for name, results in report.items():
+        print(f"===== {name} =====")
+        for result in results:
+            print(
+                f"-- {result['engine']:>7}: {result['rows']} rows, {result['groups']} groups, "
+                f"read {result['read_s']}s, clean {result['clean_s']}s, group {result['group_s']}s, "
+                f"total {result['total_s']}s"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DataFrame 引擎基准")
+    parser.add_argument("--rows", type=int, default=50000, help="每个模板生成的数据行数")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), help="参与对比的引擎")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="分块行数")
+    parser.add_argument("--output", help="结果另存为 JSON 文件")
+    args = parser.parse_args()
+
+    report = run(args.rows, args.engines, args.chunk_size)
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,550 @@
+"""
+基准数据生成：按生产环境的分布向数据库写入采购订单、出库单、库存事务、工作流任务和通知，并生成导入文件
+
+同一组参数（--seed、--orders、--days、--end-date）每次生成完全相同的数据：
+- 单据按天分布，工作日多、周末少，越近的日期越多，时间集中在工作时间；主键按时间递增；
+- 物料、供应商、部门和用户单位的使用频率服从 Zipf 分布（少数热门物料占大部分明细）；
+- 每张单据的明细行数多数为 1～3 行，少数几十行；
+- 状态随单据年龄变化：两周前的单据大多已完成，近期的单据大多待处理；
+- 每张采购订单一个工作流实例和两个任务（保管员确认、质检员确认），每个任务一条通知；
+- 已完成的采购订单明细各写一条入库事务，已完成的出库单明细各写一条出库事务。
+
+写入使用 app.db.bulk.copy_rows（PostgreSQL 上为 COPY），按批提交，内存占用与数据量无关。
+生成的主键是显式指定的，PostgreSQL 上写入完成后会同步各表的序列。
+
+生成后会创建用户 bench_admin（超级用户，密码由 --password 指定），供 benchmarks.endpoints 登录。
+
+用法：
+    python -m benchmarks.datagen --database-url sqlite:///./bench.db --orders 100000 --recreate
+    python -m benchmarks.datagen --orders 1000000 --batch-size 20000
+    python -m benchmarks.datagen --files-only --files-dir bench_files --file-rows 50000 --file-count 3
+
+导入文件与 dataframe_engines 基准使用相同的出库 / 采购订单模板，每个文件的单据号不重叠，
+也不与数据库中生成的单据号重叠，可以依次导入。
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from openpyxl import Workbook
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.db.bulk import copy_rows  # noqa: E402
+from app.db.session import Base  # noqa: E402
+from app.models.notification import Notification, NotificationRecipient, NotificationType  # noqa: E402
+from app.models.outbound import OutboundItem, OutboundOrder, OutboundStatus  # noqa: E402
+from app.models.purchase_order import (  # noqa: E402
+    DeliveryType, PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus,
+)
+from app.models.user import Role, User  # noqa: E402
+from app.models.warehouse import Inventory, InventoryTransaction, InventoryTransactionType  # noqa: E402
+from app.models.workflow import (  # noqa: E402
+    TaskStatus, WorkflowInstance, WorkflowStatus, WorkflowTask, WorkflowType,
+)
+from benchmarks.csv_import import write_csv  # noqa: E402
+from benchmarks.dataframe_engines import TEMPLATES  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger("benchmarks.datagen")
+logger.setLevel(logging.INFO)
+
+ADMIN_USERNAME = "bench_admin"
+DEFAULT_PASSWORD = "bench123"
+
+# 生成的单据号前缀，与导入模板（出库 49、采购 45 开头）错开
+PURCHASE_ORDER_PREFIX = "46"
+OUTBOUND_VOUCHER_PREFIX = "48"
+
+# 按写入顺序排列的表（外键依赖在前）
+TABLES = [
+    Role, User, Inventory, PurchaseOrder, PurchaseOrderItem, WorkflowInstance, WorkflowTask,
+    OutboundOrder, OutboundItem, InventoryTransaction, Notification, NotificationRecipient,
+]
+
+# 单据明细行数的分布：多数 1～3 行，少数几十行
+LINE_COUNTS = [1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50]
+LINE_WEIGHTS = [30, 22, 15, 9, 7, 5, 4, 3, 2, 1.5, 1, 0.5]
+
+# 一天中各小时的权重：集中在 8～18 点
+HOUR_WEIGHTS = [0.1] * 7 + [0.5, 2, 3, 3, 2.5, 1, 2, 3, 3, 2.5, 1.5, 0.5] + [0.2] * 5
+
+UNITS = ["个", "件", "套", "米", "千克", "箱", "台"]
+CATEGORIES = [f"大类{n}" for n in range(8)]
+
+# 单据年龄（天）超过该值视为历史单据，状态以已完成为主
+RECENT_DAYS = 14
+
+PURCHASE_STATUSES = {
+    "old": ([PurchaseOrderStatus.COMPLETED, PurchaseOrderStatus.CONFIRMED, PurchaseOrderStatus.CANCELLED],
+            [85, 10, 5]),
+    "recent": ([PurchaseOrderStatus.PENDING, PurchaseOrderStatus.PROCESSING, PurchaseOrderStatus.CONFIRMED,
+                PurchaseOrderStatus.COMPLETED], [40, 30, 20, 10]),
+}
+OUTBOUND_STATUSES = {
+    "old": ([OutboundStatus.COMPLETED, OutboundStatus.CANCELLED, OutboundStatus.PENDING], [90, 4, 6]),
+    "recent": ([OutboundStatus.PENDING, OutboundStatus.PROCESSING, OutboundStatus.COMPLETED], [60, 15, 25]),
+}
+
+
+class ZipfChoice:
+    """
+    按 Zipf 分布从 0..size-1 中抽取（排名越靠前越常被选中）
+    """
+
+    def __init__(self, size: int, exponent: float = 1.1):
+        self.size = size
+        self.cum_weights = list(accumulate(1.0 / (rank + 1) ** exponent for rank in range(size)))
+
+    def __call__(self, rng: random.Random) -> int:
+        return bisect.bisect_left(self.cum_weights, rng.random() * self.cum_weights[-1])
+
+
+def scale_for(orders: int) -> Dict[str, int]:
+    """
+    按采购订单数推算其他实体的规模
+    """
+    return {
+        "orders": orders,
+        "outbounds": orders,
+        "users": min(2000, max(50, orders // 500)),
+        "materials": min(200000, max(2000, orders // 5)),
+        "suppliers": max(100, orders // 2000),
+    }
+
+
+def daily_counts(total: int, start_date: date, days: int) -> List[int]:
+    """
+    把 total 张单据分配到从 start_date 开始的 days 天：工作日权重 1、周末 0.25，并从最早一天的 0.5 倍线性增长到最近一天
+    """
+    weights = []
+    for offset in range(days):
+        weekday = (start_date + timedelta(days=offset)).weekday()
+        growth = 0.5 + 0.5 * offset / max(days - 1, 1)
+        weights.append((0.25 if weekday >= 5 else 1.0) * growth)
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # 取整丢掉的单据分给最近的日期
+    for offset in range(total - sum(counts)):
+        counts[-1 - offset % days] += 1
+    return counts
+
+
+class DataGenerator:
+    """
+    确定性的基准数据生成器
+    """
+
+    def __init__(self, seed: int, orders: int, days: int, end_date: date, batch_size: int):
+        self.rng = random.Random(seed)
+        self.scale = scale_for(orders)
+        self.days = days
+        self.end_date = end_date
+        self.start_date = end_date - timedelta(days=days - 1)
+        self.batch_size = batch_size
+        self.counts: Dict[str, int] = {model.__tablename__: 0 for model in TABLES}
+        self._ids: Dict[str, int] = {model.__tablename__: 0 for model in TABLES}
+        self._buffer: Dict[str, List[Dict[str, Any]]] = {model.__tablename__: [] for model in TABLES}
+
+        self.pick_material = ZipfChoice(self.scale["materials"])
+        self.pick_supplier = ZipfChoice(self.scale["suppliers"])
+        self.pick_department = ZipfChoice(40)
+        self.pick_unit = ZipfChoice(12, exponent=0.8)
+        self.line_cum_weights = list(accumulate(LINE_WEIGHTS))
+        self.hour_cum_weights = list(accumulate(HOUR_WEIGHTS))
+        self.material_prices = [round(self.rng.lognormvariate(3, 1.2), 2) for _ in range(self.scale["materials"])]
+
+    def _next_id(self, model: Any) -> int:
+        table = model.__tablename__
+        self._ids[table] += 1
+        return self._ids[table]
+
+    def _add(self, model: Any, row: Dict[str, Any]) -> Dict[str, Any]:
+        row["id"] = self._next_id(model)
+        row.setdefault("update_time", row["create_time"])
+        self._buffer[model.__tablename__].append(row)
+        return row
+
+    def _timestamp(self, day: date) -> datetime:
+        hour = bisect.bisect_left(self.hour_cum_weights, self.rng.random() * self.hour_cum_weights[-1])
+        return datetime(day.year, day.month, day.day, hour, self.rng.randrange(60), self.rng.randrange(60))
+
+    def _line_count(self) -> int:
+        return LINE_COUNTS[bisect.bisect_left(self.line_cum_weights, self.rng.random() * self.line_cum_weights[-1])]
+
+    def _status(self, distributions: Dict[str, Any], day: date) -> Any:
+        values, weights = distributions["old" if (self.end_date - day).days > RECENT_DAYS else "recent"]
+        return self.rng.choices(values, weights)[0]
+
+    def _material(self) -> int:
+        return self.pick_material(self.rng)
+
+    # ---- 基础数据 ----
+
+    def base_rows(self, password: str) -> None:
+        """
+        角色、用户和库存（每种物料一行）
+        """
+        created = datetime.combine(self.start_date, datetime.min.time())
+        role = self._add(Role, {"name": "基准测试", "description": "基准测试数据", "create_time": created})
+        hashed = get_password_hash(password)
+        self._add(User, {
+            "username": ADMIN_USERNAME, "email": f"{ADMIN_USERNAME}@example.com", "hashed_password": hashed,
+            "full_name": "基准管理员", "is_active": True, "is_superuser": True, "role_id": role["id"],
+            "create_time": created,
+        })
+        for n in range(1, self.scale["users"]):
+            self._add(User, {
+                "username": f"bench_user{n}", "email": f"bench_user{n}@example.com", "hashed_password": hashed,
+                "full_name": f"员工{n}", "is_active": True, "is_superuser": False, "role_id": role["id"],
+                "create_time": created,
+            })
+        for k in range(self.scale["materials"]):
+            quantity = float(self.rng.randrange(0, 2000))
+            self._add(Inventory, {
+                "material_code": str(100200000 + k), "material_description": f"物资{k} 规格{k % 17}",
+                "category": CATEGORIES[k % len(CATEGORIES)], "unit": UNITS[k % len(UNITS)], "quantity": quantity,
+                "location": f"A{k % 50:02d}-{k % 7}", "unit_price": self.material_prices[k],
+                "total_value": round(quantity * self.material_prices[k], 2), "create_time": created,
+            })
+
+    def _user(self, staff_only: bool = False) -> int:
+        # 前 10% 的用户是保管员和质检员，处理大部分任务
+        users = self.scale["users"]
+        if staff_only:
+            return 2 + self.rng.randrange(max(users // 10, 1))
+        return 2 + self.rng.randrange(users - 1)
+
+    # ---- 业务单据 ----
+
+    def purchase_order(self, day: date) -> None:
+        """
+        一张采购订单及其明细、工作流、任务、通知和入库事务
+        """
+        created = self._timestamp(day)
+        status = self._status(PURCHASE_STATUSES, day)
+        order_id = self._ids[PurchaseOrder.__tablename__] + 1
+        order_no = f"{PURCHASE_ORDER_PREFIX}{order_id:08d}"
+        supplier = self.pick_supplier(self.rng)
+        operator = self._user()
+
+        total = 0.0
+        items = []
+        for line in range(self._line_count()):
+            material = self._material()
+            quantity = self.rng.randrange(1, 200)
+            price = self.material_prices[material]
+            total += quantity * price
+            items.append({
+                "order_id": order_id, "line_item_number": str((line + 1) * 10),
+                "material_code": str(100200000 + material), "material_description": f"物资{material}",
+                "unit": UNITS[material % len(UNITS)], "requested_quantity": quantity, "contract_price": price,
+                "contract_amount": round(quantity * price, 2), "purchase_order_quantity": quantity,
+                "create_time": created,
+            })
+        self._add(PurchaseOrder, {
+            "order_no": order_no, "plan_number": f"JH{order_id % 3000:05d}",
+            "user_unit": f"分公司{self.pick_unit(self.rng)}", "category": self.rng.choice(CATEGORIES),
+            "order_date": day, "supplier_name": f"供应商{supplier}", "supplier_code": f"S{supplier:05d}",
+            "material_group": f"MG{supplier % 40}", "factory": "1000",
+            "delivery_type": DeliveryType.DIRECT if self.rng.random() < 0.1 else DeliveryType.WAREHOUSE,
+            "total_amount": round(total, 2), "status": status, "create_time": created,
+        })
+        for item in items:
+            self._add(PurchaseOrderItem, item)
+
+        finished = status in (PurchaseOrderStatus.CONFIRMED, PurchaseOrderStatus.COMPLETED)
+        workflow = self._add(WorkflowInstance, {
+            "process_instance_id": f"BENCH-{order_id}", "business_key": order_no,
+            "workflow_type": WorkflowType.PURCHASE_CONFIRMATION,
+            "status": WorkflowStatus.COMPLETED if finished else WorkflowStatus.RUNNING,
+            "initiator_id": operator, "purchase_order_id": order_id, "create_time": created,
+        })
+        for step, task_name in enumerate(["保管员确认", "质检员确认"]):
+            task_created = created + timedelta(hours=step * 4)
+            assignee = self._user(staff_only=True)
+            done = finished or (step == 0 and status == PurchaseOrderStatus.PROCESSING)
+            task = self._add(WorkflowTask, {
+                "task_id": f"BENCH-{order_id}-{step}", "workflow_instance_id": workflow["id"], "task_name": task_name,
+                "status": TaskStatus.COMPLETED if done else TaskStatus.PENDING,
+                "complete_time": task_created + timedelta(hours=self.rng.randrange(1, 48)) if done else None,
+                "assignee_id": assignee, "result": ("合格" if self.rng.random() < 0.95 else "不合格") if done else None,
+                "create_time": task_created,
+            })
+            notification = self._add(Notification, {
+                "title": f"{task_name}：{order_no}", "content": f"采购订单 {order_no} 待{task_name}",
+                "notification_type": NotificationType.WORKFLOW, "business_key": order_no,
+                "business_type": "PURCHASE", "sender_id": operator, "send_time": task_created,
+                "create_time": task_created,
+            })
+            self._add(NotificationRecipient, {
+                "notification_id": notification["id"], "recipient_id": assignee, "is_read": done,
+                "read_time": task["complete_time"], "create_time": task_created,
+            })
+
+        if status == PurchaseOrderStatus.COMPLETED:
+            for item in items:
+                self._add(InventoryTransaction, {
+                    "inventory_id": int(item["material_code"]) - 100200000 + 1,
+                    "transaction_type": InventoryTransactionType.INBOUND,
+                    "quantity": float(item["requested_quantity"]), "transaction_time": created + timedelta(days=2),
+                    "reference_no": order_no, "reference_type": "PURCHASE", "operator_id": operator,
+                    "create_time": created + timedelta(days=2),
+                })
+
+    def outbound_order(self, day: date) -> None:
+        """
+        一张出库单及其明细和出库事务
+        """
+        created = self._timestamp(day)
+        status = self._status(OUTBOUND_STATUSES, day)
+        outbound_id = self._ids[OutboundOrder.__tablename__] + 1
+        voucher = f"{OUTBOUND_VOUCHER_PREFIX}{outbound_id:08d}"
+        department = f"第{self.pick_department(self.rng)}车间"
+        operator = self._user()
+
+        total = 0.0
+        items = []
+        for _ in range(self._line_count()):
+            material = self._material()
+            quantity = float(self.rng.randrange(1, 50))
+            price = self.material_prices[material]
+            amount = round(quantity * price, 2)
+            total += amount
+            items.append({
+                "outbound_id": outbound_id, "material_code": str(100200000 + material),
+                "material_description": f"物资{material} 规格{material % 17}", "unit": UNITS[material % len(UNITS)],
+                "actual_quantity": quantity, "requested_quantity": quantity, "outbound_price": price,
+                "outbound_amount": amount, "material_category_code": f"C{material % 30:03d}",
+                "project_code": f"P{self.rng.randrange(200):05d}", "create_time": created,
+            })
+        self._add(OutboundOrder, {
+            "material_voucher": voucher, "voucher_date": day, "department": department,
+            "user_unit": f"分公司{self.pick_unit(self.rng)}", "document_type": "正常出库",
+            "total_amount": round(total, 2), "issue_date": day, "sales_amount": 0, "management_fee_rate": 0,
+            "material_category": "生产", "status": status, "operator_id": operator, "create_time": created,
+        })
+        for item in items:
+            self._add(OutboundItem, item)
+
+        if status == OutboundStatus.COMPLETED:
+            for item in items:
+                self._add(InventoryTransaction, {
+                    "inventory_id": int(item["material_code"]) - 100200000 + 1,
+                    "transaction_type": InventoryTransactionType.OUTBOUND, "quantity": item["actual_quantity"],
+                    "transaction_time": created + timedelta(hours=6), "reference_no": voucher,
+                    "reference_type": "OUTBOUND", "operator_id": operator,
+                    "create_time": created + timedelta(hours=6),
+                })
+
+    # ---- 写入 ----
+
+    def flush(self, db: Session) -> None:
+        """
+        按外键顺序写入缓冲的行并提交
+        """
+        for model in TABLES:
+            rows = self._buffer[model.__tablename__]
+            if rows:
+                copy_rows(db, model, rows)
+                self.counts[model.__tablename__] += len(rows)
+                rows.clear()
+        db.commit()
+
+    def generate(self, db: Session, password: str) -> None:
+        """
+        逐天生成全部数据，每 batch_size 张单据写入一次
+        """
+        self.base_rows(password)
+        self.flush(db)
+
+        purchase_counts = daily_counts(self.scale["orders"], self.start_date, self.days)
+        outbound_counts = daily_counts(self.scale["outbounds"], self.start_date, self.days)
+        pending = 0
+        for offset in range(self.days):
+            day = self.start_date + timedelta(days=offset)
+            for _ in range(purchase_counts[offset]):
+                self.purchase_order(day)
+            for _ in range(outbound_counts[offset]):
+                self.outbound_order(day)
+            pending += purchase_counts[offset] + outbound_counts[offset]
+            if pending >= self.batch_size:
+                self.flush(db)
+                pending = 0
+                logger.info(f"Generated up to {day}: {self.counts[PurchaseOrder.__tablename__]} purchase orders, "
+                            f"{self.counts[OutboundItem.__tablename__]} outbound items")
+        self.flush(db)
+
+
+def _check_empty(db: Session) -> None:
+    for model in TABLES:
+        if db.execute(select(func.count()).select_from(model.__table__)).scalar():
+            raise SystemExit(f"表 {model.__tablename__} 中已有数据，使用 --recreate 重建基准数据库")
+
+
+def _sync_sequences(db: Session) -> None:
+    """
+    PostgreSQL 上把各表的 id 序列设置为当前最大值，之后正常插入不会主键冲突
+    """
+    for model in TABLES:
+        table = model.__tablename__
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+    db.commit()
+
+
+def populate(
+    database_url: str, orders: int, days: int, seed: int, end_date: date, batch_size: int, password: str,
+    recreate: bool = False, rollups: bool = True,
+) -> Dict[str, Any]:
+    """
+    生成并写入基准数据，返回各表行数和耗时
+    """
+    engine = create_engine(database_url)
+    if recreate:
+        logger.info("Recreating all tables")
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    generator = DataGenerator(seed, orders, days, end_date, batch_size)
+    started = time.perf_counter()
+    with Session(engine) as db:
+        _check_empty(db)
+        generator.generate(db, password)
+        if engine.dialect.name == "postgresql":
+            _sync_sequences(db)
+            db.execute(text("ANALYZE"))
+            db.commit()
+        seconds = time.perf_counter() - started
+        if rollups:
+            from app.services.rollup import refresh_daily_rollups
+            refresh_daily_rollups(db, full=True)
+    engine.dispose()
+
+    total_rows = sum(generator.counts.values())
+    return {
+        "dialect": engine.dialect.name,
+        "seed": seed,
+        "scale": generator.scale,
+        "days": days,
+        "end_date": end_date.isoformat(),
+        "tables": generator.counts,
+        "rows": total_rows,
+        "seconds": round(seconds, 1),
+        "rows_per_s": int(total_rows / seconds) if seconds else 0,
+    }
+
+
+# ---- 导入文件 ----
+
+def write_xlsx(path: str, header: List[str], make_row: Callable[[int], List[Any]], rows: int, start: int = 0) -> None:
+    """
+    以 openpyxl 只写模式直接写入文件，第 i 行数据为 make_row(start + i)
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(header)
+    for i in range(start, start + rows):
+        sheet.append(make_row(i))
+    workbook.save(path)
+
+
+def write_import_file(directory: str, kind: str, file_format: str, rows: int, index: int = 0) -> str:
+    """
+    生成第 index 个导入文件（outbound / purchase，xlsx / csv），不同 index 的单据号互不重叠
+
+    Returns:
+        文件路径
+    """
+    template = TEMPLATES[kind]
+    start = index * rows
+    path = os.path.join(directory, f"{kind}_{rows}_{index}.{file_format}")
+    if file_format == "csv":
+        write_csv(path, template["header"], lambda i: template["row"](start + i), rows)
+    else:
+        write_xlsx(path, template["header"], template["row"], rows, start)
+    return path
+
+
+def generate_files(directory: str, rows: int, count: int, formats: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    为每种模板和格式各生成 count 个文件
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for kind in TEMPLATES:
+        for file_format in formats:
+            for index in range(count):
+                started = time.perf_counter()
+                path = write_import_file(directory, kind, file_format, rows, index)
+                files.append({
+                    "path": path,
+                    "rows": rows,
+                    "size_mb": round(os.path.getsize(path) / (1024 * 1024), 2),
+                    "seconds": round(time.perf_counter() - started, 2),
+                })
+    return files
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    database = report.get("database")
+    if database:
+        print(f"===== {database['dialect']}: {database['rows']} rows in {database['seconds']}s "
+              f"({database['rows_per_s']} rows/s) =====")
+        for table, count in database["tables"].items():
+            print(f"-- {table}: {count}")
+    for file in report.get("files", []):
+        print(f"-- {file['path']}: {file['rows']} rows, {file['size_mb']}MB, {file['seconds']}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="基准数据生成")
+    parser.add_argument("--database-url", default=settings.SQLALCHEMY_DATABASE_URI, help="数据库连接串")
+    parser.add_argument("--orders", type=int, default=10000, help="采购订单数（出库单数相同，其他实体按比例推算）")
+    parser.add_argument("--days", type=int, default=365, help="单据分布的天数")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="最近一天的日期（YYYY-MM-DD），固定后可跨天复现相同数据")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--batch-size", type=int, default=5000, help="每次写入提交的单据数")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help=f"{ADMIN_USERNAME} 的登录密码")
+    parser.add_argument("--recreate", action="store_true", help="删除并重建所有表（只用于基准数据库）")
+    parser.add_argument("--no-rollups", action="store_true", help="不重建日汇总表")
+    parser.add_argument("--files-dir", help="导入文件的输出目录，不指定时不生成文件")
+    parser.add_argument("--file-rows", type=int, default=10000, help="每个导入文件的数据行数")
+    parser.add_argument("--file-count", type=int, default=1, help="每种模板和格式生成的文件数")
+    parser.add_argument("--file-formats", nargs="+", choices=["xlsx", "csv"], default=["xlsx", "csv"])
+    parser.add_argument("--files-only", action="store_true", help="只生成导入文件，不写数据库")
+    parser.add_argument("--output", help="结果另存为 JSON 文件")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {}
+    if not args.files_only:
+        report["database"] = populate(
+            args.database_url, args.orders, args.days, args.seed, args.end_date, args.batch_size, args.password,
+            recreate=args.recreate, rollups=not args.no_rollups,
+        )
+    if args.files_dir:
+        report["files"] = generate_files(args.files_dir, args.file_rows, args.file_count, args.file_formats)
+
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
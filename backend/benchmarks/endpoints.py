@@ -0,0 +1,402 @@
+"""
+接口端到端基准：对列表、详情、搜索、看板、导出和导入接口施压，统计每个接口的延迟分位数和吞吐
+
+数据库先用 benchmarks.datagen 生成数据。默认在进程内启动应用（TestClient，不经过网络），
+也可以用 --base-url 对已部署的服务施压：
+    python -m benchmarks.endpoints --database-url sqlite:///./bench.db --requests 200 --concurrency 4
+    python -m benchmarks.endpoints --base-url http://localhost:8000 --groups read export --output run.json
+    python -m benchmarks.endpoints --base-url http://localhost:8000 --compare baseline.json
+
+每个场景先预热 --warmup 次，再发出 --requests 次请求，输出 p50 / p95 / p99 / 平均 / 最大延迟（毫秒）、
+每秒请求数和错误数，导入场景另外给出每秒导入行数。--output 保存为 JSON，--compare 与之前保存的结果逐项对比。
+
+导入场景每次请求上传一个新生成的文件（单据号与之前的文件和 datagen 生成的数据都不重叠），
+导入会写入数据库，只应对基准数据库运行。
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 应用配置在首次导入 app 模块时读取，进程内运行时要先设置环境变量，所以 app 和 benchmarks.datagen 都在 main 中导入
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger("benchmarks.endpoints")
+logger.setLevel(logging.INFO)
+
+API = "/api/v1"
+GROUPS = ["read", "export", "import"]
+
+# 对比结果时列出的指标，以及数值变大是否代表变差
+COMPARED_METRICS = [("p50_ms", True), ("p95_ms", True), ("p99_ms", True), ("throughput_rps", False)]
+
+
+class Scenario:
+    """
+    一个压测场景：request(client, i) 发出第 i 次请求并返回响应，rows(response) 给出导入的行数
+    """
+
+    def __init__(self, name: str, group: str, request: Callable[[Any, int], Any],
+                 rows: Optional[Callable[[Any], int]] = None, sequential: bool = False):
+        self.name = name
+        self.group = group
+        self.request = request
+        self.rows = rows
+        # 导入场景串行执行：并发导入测的是锁竞争而不是导入本身
+        self.sequential = sequential
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    最近秩法求分位数（samples 已排序）
+    """
+    if not samples:
+        return 0.0
+    rank = max(int(-(-pct * len(samples) // 100)), 1)
+    return samples[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, rows: int = 0) -> Dict[str, Any]:
+    """
+    汇总一个场景的延迟（秒）为毫秒分位数和吞吐
+    """
+    samples = sorted(latency * 1000 for latency in latencies)
+    count = len(samples)
+    result = {
+        "requests": count,
+        "errors": errors,
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "mean_ms": round(sum(samples) / count, 2) if count else 0.0,
+        "max_ms": round(samples[-1], 2) if count else 0.0,
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+    }
+    if rows:
+        result["rows"] = rows
+        result["rows_per_s"] = int(rows / elapsed) if elapsed else 0
+    return result
+
+
+def _payload(response: Any) -> Any:
+    data = response.json()
+    return data.get("data", data) if isinstance(data, dict) else data
+
+
+def _records(response: Any) -> List[Dict[str, Any]]:
+    # 列表接口有两种响应格式：data 直接是记录列表，或 data.records
+    data = _payload(response)
+    return data if isinstance(data, list) else data.get("records", [])
+
+
+def _next_cursor(response: Any) -> Optional[str]:
+    data = response.json()
+    if data.get("next_cursor") is not None:
+        return data["next_cursor"]
+    payload = data.get("data")
+    return payload.get("next_cursor") if isinstance(payload, dict) else None
+
+
+class CursorWalker:
+    """
+    多个线程共享的游标翻页：每次请求取下一页，翻到最后一页后从第一页重新开始
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.cursor = ""
+        self.lock = threading.Lock()
+
+    def __call__(self, client: Any, i: int) -> Any:
+        with self.lock:
+            cursor = self.cursor
+        response = client.get(self.path, params={"size": self.size, "cursor": cursor})
+        if response.status_code == 200:
+            with self.lock:
+                self.cursor = _next_cursor(response) or ""
+        return response
+
+
+class ImportUploader:
+    """
+    每次请求生成并上传一个新的导入文件，文件编号从 offset 开始递增
+    """
+
+    def __init__(self, path: str, kind: str, file_format: str, rows: int, directory: str, offset: int,
+                 write_file: Callable[..., str]):
+        self.path = path
+        self.kind = kind
+        self.file_format = file_format
+        self.rows = rows
+        self.directory = directory
+        self.offset = offset
+        self.write_file = write_file
+
+    def __call__(self, client: Any, i: int) -> Any:
+        file_path = self.write_file(self.directory, self.kind, self.file_format, self.rows, self.offset + i)
+        try:
+            with open(file_path, "rb") as f:
+                return client.post(self.path, files={"file": (os.path.basename(file_path), f)})
+        finally:
+            os.remove(file_path)
+
+
+def _imported_rows(response: Any) -> int:
+    return _payload(response).get("successCount", 0) if response.status_code == 200 else 0
+
+
+def discover(client: Any, size: int) -> Dict[str, Any]:
+    """
+    从列表接口取详情接口用的 id 和搜索条件
+    """
+    ids: Dict[str, Any] = {}
+    for key, path in [("purchase", "/purchase/list"), ("outbound", "/outbound/list"),
+                      ("inventory", "/inventory/list")]:
+        response = client.get(f"{API}{path}", params={"size": size})
+        response.raise_for_status()
+        records = _records(response)
+        if not records:
+            raise SystemExit(f"{path} 没有数据，先运行 python -m benchmarks.datagen 生成基准数据")
+        ids[key] = [record["id"] for record in records]
+        ids[f"{key}_record"] = records[0]
+    return ids
+
+
+def build_scenarios(client: Any, args: argparse.Namespace, upload_dir: str) -> List[Scenario]:
+    """
+    按 --groups 构建压测场景
+    """
+    from benchmarks.datagen import write_import_file
+
+    ids = discover(client, args.page_size)
+    size = args.page_size
+
+    def get(path: str, **params: Any) -> Callable[[Any, int], Any]:
+        return lambda c, i: c.get(f"{API}{path}", params=params)
+
+    def detail(path: str, key: str) -> Callable[[Any, int], Any]:
+        # 轮流请求列表第一页中的各条记录
+        return lambda c, i: c.get(f"{API}{path}/{ids[key][i % len(ids[key])]}")
+
+    outbound = ids["outbound_record"]
+    purchase = ids["purchase_record"]
+    scenarios = [
+        Scenario("users.me", "read", get("/users/me")),
+        Scenario("purchase.list", "read", get("/purchase/list", size=size)),
+        Scenario("purchase.list.deep_page", "read", get("/purchase/list", size=size, page=args.deep_page)),
+        Scenario("purchase.list.cursor", "read", CursorWalker(f"{API}/purchase/list", size)),
+        Scenario("purchase.search.supplier", "read",
+                 get("/purchase/list", size=size, supplier_name=purchase["supplier_name"])),
+        Scenario("purchase.detail", "read", detail("/purchase", "purchase")),
+        Scenario("outbound.list", "read", get("/outbound/list", size=size)),
+        Scenario("outbound.list.deep_page", "read", get("/outbound/list", size=size, page=args.deep_page)),
+        Scenario("outbound.list.cursor", "read", CursorWalker(f"{API}/outbound/list", size)),
+        Scenario("outbound.search.department", "read",
+                 get("/outbound/list", size=size, department=outbound["department"])),
+        Scenario("outbound.detail", "read", detail("/outbound", "outbound")),
+        Scenario("inventory.list", "read", get("/inventory/list", size=size)),
+        Scenario("inventory.detail", "read", detail("/inventory", "inventory")),
+        Scenario("inventory.transactions", "read", get("/inventory/transactions", size=size)),
+        Scenario("workflow.todo", "read", get("/workflow/tasks/todo", size=size)),
+        Scenario("notifications", "read", get("/notifications/", size=size)),
+        Scenario("reports.leadership", "read", get("/reports/dashboard/leadership")),
+        Scenario("reports.operation", "read", get("/reports/dashboard/operation")),
+        Scenario("reports.daily", "read", get("/reports/daily")),
+    ]
+    for file_format in ["csv", "xlsx"]:
+        scenarios += [
+            Scenario(f"outbound.export.{file_format}", "export",
+                     get("/outbound/export", format=file_format, department=outbound["department"])),
+            Scenario(f"purchase.export.{file_format}", "export",
+                     get("/purchase/export", format=file_format, user_unit=purchase["user_unit"])),
+        ]
+    scenarios.append(Scenario("inventory.export.csv", "export", get("/inventory/export", format="csv")))
+    # 每个导入场景使用各自的文件编号区间，不同格式的文件单据号也不重叠
+    offset = args.import_offset
+    for file_format in args.import_formats:
+        for kind, path in [("outbound", "/outbound/import"), ("purchase", "/purchase/import")]:
+            uploader = ImportUploader(f"{API}{path}", kind, file_format, args.import_rows, upload_dir, offset,
+                                      write_import_file)
+            offset += args.import_requests
+            scenarios.append(Scenario(f"{kind}.import.{file_format}", "import", uploader, _imported_rows,
+                                      sequential=True))
+
+    selected = [scenario for scenario in scenarios if scenario.group in args.groups]
+    if args.only:
+        selected = [scenario for scenario in selected if any(name in scenario.name for name in args.only)]
+    return selected
+
+
+def run_scenario(client: Any, scenario: Scenario, requests: int, warmup: int, concurrency: int) -> Dict[str, Any]:
+    """
+    预热后发出 requests 次请求，返回统计结果
+    """
+    for i in range(warmup):
+        scenario.request(client, i)
+
+    latencies: List[float] = []
+    errors = 0
+    rows = 0
+    lock = threading.Lock()
+
+    def call(i: int) -> None:
+        nonlocal errors, rows
+        started = time.perf_counter()
+        response = scenario.request(client, warmup + i)
+        # 流式响应读完整个响应体才算结束
+        response.read()
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code >= 400:
+                errors += 1
+                if errors == 1:
+                    logger.warning(f"{scenario.name}: HTTP {response.status_code} {response.text[:200]}")
+            if scenario.rows:
+                rows += scenario.rows(response)
+
+    workers = 1 if scenario.sequential else concurrency
+    started = time.perf_counter()
+    if workers == 1:
+        for i in range(requests):
+            call(i)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(call, range(requests)))
+    return summarize(latencies, errors, time.perf_counter() - started, rows)
+
+
+def run(client: Any, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    登录后依次运行所有场景
+    """
+    response = client.post(f"{API}/login/access-token",
+                           data={"username": args.username, "password": args.password})
+    if response.status_code != 200:
+        raise SystemExit(f"登录失败：HTTP {response.status_code} {response.text[:200]}")
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as upload_dir:
+        for scenario in build_scenarios(client, args, upload_dir):
+            requests = args.import_requests if scenario.group == "import" else args.requests
+            warmup = 0 if scenario.group == "import" else args.warmup
+            logger.info(f"Running {scenario.name}: {requests} requests")
+            results[scenario.name] = {"group": scenario.group,
+                                      **run_scenario(client, scenario, requests, warmup, args.concurrency)}
+    return results
+
+
+def _in_process_client(database_url: Optional[str], upload_dir: str) -> Any:
+    if database_url:
+        os.environ["SQLALCHEMY_DATABASE_URI"] = database_url
+    os.environ["IMPORT_UPLOAD_DIR"] = upload_dir
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+def _print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    meta = report["meta"]
+    print(f"===== {meta['target']} (concurrency {meta['concurrency']}) =====")
+    print(f"{'scenario':<30}{'req':>6}{'err':>5}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'req/s':>9}{'rows/s':>9}")
+    for name, result in report["results"].items():
+        print(f"{name:<30}{result['requests']:>6}{result['errors']:>5}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['max_ms']:>10}{result['throughput_rps']:>9}"
+              f"{result.get('rows_per_s', ''):>9}")
+    if baseline is None:
+        return
+
+    print(f"===== 对比 {baseline['meta']['timestamp']} =====")
+    for name, result in report["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"-- {name}: 基线中没有该场景")
+            continue
+        changes = []
+        for metric, higher_is_worse in COMPARED_METRICS:
+            if previous[metric]:
+                delta = (result[metric] - previous[metric]) / previous[metric] * 100
+                worse = delta > 0 if higher_is_worse else delta < 0
+                mark = " !" if worse else ""
+                changes.append(f"{metric} {previous[metric]} -> {result[metric]} ({delta:+.1f}%{mark})")
+        print(f"-- {name}: " + ", ".join(changes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="接口端到端基准")
+    parser.add_argument("--base-url", help="已部署服务的地址，不指定时在进程内启动应用")
+    parser.add_argument("--database-url", help="进程内运行时使用的数据库连接串，默认读取应用配置")
+    parser.add_argument("--username", help="登录用户，默认为 datagen 创建的 bench_admin")
+    parser.add_argument("--password", help="登录密码，默认为 datagen 的默认密码")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=["read"], help="运行的场景组")
+    parser.add_argument("--only", nargs="+", help="只运行名称包含这些字符串的场景")
+    parser.add_argument("--requests", type=int, default=100, help="每个场景的请求数")
+    parser.add_argument("--warmup", type=int, default=5, help="每个场景的预热请求数（不计入统计）")
+    parser.add_argument("--concurrency", type=int, default=1, help="并发请求数")
+    parser.add_argument("--page-size", type=int, default=20, help="列表接口的每页条数")
+    parser.add_argument("--deep-page", type=int, default=500, help="深分页场景请求的页码")
+    parser.add_argument("--import-requests", type=int, default=3, help="每个导入场景上传的文件数")
+    parser.add_argument("--import-rows", type=int, default=5000, help="每个导入文件的数据行数")
+    parser.add_argument("--import-formats", nargs="+", choices=["xlsx", "csv"], default=["xlsx", "csv"])
+    parser.add_argument("--import-offset", type=int, default=int(time.time() * 10) % 10 ** 7,
+                        help="导入文件的起始编号，默认按时间取值，保证多次运行的单据号互不重叠")
+    parser.add_argument("--timeout", type=float, default=300, help="请求超时（秒），只用于 --base-url")
+    parser.add_argument("--output", help="结果另存为 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果对比")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory() as upload_dir:
+        if args.base_url:
+            import httpx
+            client = httpx.Client(base_url=args.base_url, timeout=args.timeout)
+            target = args.base_url
+        else:
+            client = _in_process_client(args.database_url, upload_dir)
+            from app.core.config import settings
+            target = settings.SQLALCHEMY_DATABASE_URI.split("://", 1)[0] + " (in-process)"
+
+        from benchmarks.datagen import ADMIN_USERNAME, DEFAULT_PASSWORD
+        args.username = args.username or ADMIN_USERNAME
+        args.password = args.password or DEFAULT_PASSWORD
+        with client:
+            results = run(client, args)
+
+    report = {
+        "meta": {
+            "target": target,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "groups": args.groups,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "page_size": args.page_size,
+            "import_rows": args.import_rows,
+        },
+        "results": results,
+    }
+    _print_report(report, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+模糊搜索基准：对比建立 pg_trgm GIN 索引前后 ILIKE '%关键字%' 的查询计划和耗时
+
+在临时表中生成与出库单表结构相近的数据，不会修改业务表。
+
+用法：
+    python -m benchmarks.search_plans --rows 500000
+    python -m benchmarks.search_plans --database-url sqlite:///./bench.db --rows 100000
+
+SQLite 没有三元组索引，只输出查询计划，用于确认回退路径仍是全表扫描。
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Connection
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings  # noqa: E402
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("benchmarks.search_plans")
+
+TABLE = "bench_outboundorder"
+
+# (列, 关键字)：覆盖凭证号片段、中文部门名和用料单位
+SEARCH_CASES = [
+    ("material_voucher", "0012345"),
+    ("department", "车间17"),
+    ("user_unit", "分公司3"),
+]
+
+
+def _create_table(conn: Connection, rows: int) -> None:
+    """
+    创建临时表并生成测试数据
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(
+            f"CREATE TEMP TABLE {TABLE} ("
+            "id integer PRIMARY KEY, material_voucher varchar(32), department varchar(100), user_unit varchar(100))"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {TABLE} "
+            "SELECT i, '49' || lpad(i::text, 8, '0'), '第' || (i % 500) || '车间' || (i % 37), "
+            "'分公司' || (i % 120) "
+            "FROM generate_series(1, :rows) AS i"
+        ), {"rows": rows})
+        conn.execute(text(f"ANALYZE {TABLE}"))
+    else:
+        conn.execute(text(
+            f"CREATE TEMP TABLE {TABLE} ("
+            "id integer PRIMARY KEY, material_voucher varchar(32), department varchar(100), user_unit varchar(100))"
+        ))
+        conn.execute(
+            text(f"INSERT INTO {TABLE} VALUES (:id, :voucher, :department, :unit)"),
+            [
+                {
+                    "id": i,
+                    "voucher": f"49{i:08d}",
+                    "department": f"第{i % 500}车间{i % 37}",
+                    "unit": f"分公司{i % 120}",
+                }
+                for i in range(1, rows + 1)
+            ],
+        )
+
+
+def _create_indexes(conn: Connection) -> None:
+    """
+    建立与迁移 add_trigram_search_indexes 相同的三元组索引
+    """
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for column, _ in SEARCH_CASES:
+        conn.execute(text(
+            f"CREATE INDEX ix_{TABLE}_{column}_trgm ON {TABLE} USING gin ({column} gin_trgm_ops)"
+        ))
+    conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+def _explain(conn: Connection, column: str, keyword: str) -> Dict[str, Any]:
+    """
+    执行并记录一次搜索的查询计划和耗时
+    """
+    params = {"pattern": f"%{keyword}%"}
+
+    if conn.dialect.name == "postgresql":
+        sql = f"SELECT id FROM {TABLE} WHERE {column} ILIKE :pattern"
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params).scalars().all()
+    else:
+        # SQLite 的 LIKE 对 ASCII 本身不区分大小写
+        sql = f"SELECT id FROM {TABLE} WHERE {column} LIKE :pattern"
+        plan = [str(row[-1]) for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+
+    started = time.perf_counter()
+    matched = len(conn.execute(text(sql), params).all())
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    return {"column": column, "keyword": keyword, "rows": matched, "ms": round(elapsed_ms, 2), "plan": plan}
+
+
+def run(database_url: str, rows: int) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    生成数据并分别在建索引前后执行全部搜索
+    """
+    engine = create_engine(database_url)
+    report: Dict[str, List[Dict[str, Any]]] = {"before": [], "after": []}
+    with engine.connect() as conn:
+        logger.info(f"Generating {rows} rows on {conn.dialect.name}")
+        _create_table(conn, rows)
+
+        report["before"] = [_explain(conn, column, keyword) for column, keyword in SEARCH_CASES]
+        if conn.dialect.name == "postgresql":
+            _create_indexes(conn)
+            report["after"] = [_explain(conn, column, keyword) for column, keyword in SEARCH_CASES]
+        conn.rollback()
+    engine.dispose()
+    return report
+
+
+def _print_report(report: Dict[str, List[Dict[str, Any]]]) -> None:
+    for phase in ("before", "after"):
+        if not report[phase]:
+            continue
+        print(f"===== {phase} trigram indexes =====")
+        for case in report[phase]:
+            print(f"-- {case['column']} ILIKE '%{case['keyword']}%': {case['rows']} rows, {case['ms']} ms")
+            for line in case["plan"]:
+                print(f"   {line}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模糊搜索索引基准")
+    parser.add_argument("--database-url", default=settings.SQLALCHEMY_DATABASE_URI, help="数据库连接串")
+    parser.add_argument("--rows", type=int, default=200000, help="生成的数据行数")
+    parser.add_argument("--output", help="结果另存为 JSON 文件")
+    args = parser.parse_args()
+
+    report = run(args.database_url, args.rows)
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Add daily rollup tables
+
+Revision ID: add_daily_rollup_tables
+Revises: add_trigram_search_indexes
+Create Date: 2025-05-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_daily_rollup_tables'
+down_revision = 'add_trigram_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+# 增量汇总按 update_time 查找变更、按日期重新汇总时使用的明细表索引
+INDEXES = {
+    'ix_wh_purchaseorder_order_date': ('wh_purchaseorder', ['order_date']),
+    'ix_wh_purchaseorder_update_time': ('wh_purchaseorder', ['update_time']),
+    'ix_wh_inventorytransaction_update_time': ('wh_inventorytransaction', ['update_time']),
+    'ix_wh_workflowtask_complete_time': ('wh_workflowtask', ['complete_time']),
+    'ix_wh_workflowtask_update_time': ('wh_workflowtask', ['update_time']),
+}
+
+
+def _timestamps():
+    return [
+        sa.Column('create_time', sa.DateTime(), nullable=False),
+        sa.Column('update_time', sa.DateTime(), nullable=False),
+    ]
+
+
+def upgrade():
+    # 采购订单日汇总
+    op.create_table(
+        'wh_dailyorderstat',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('category', sa.String(length=50), nullable=False),
+        sa.Column('user_unit', sa.String(length=100), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('order_amount', sa.Float(), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'category', 'user_unit', name='uq_wh_dailyorderstat_day_category_unit')
+    )
+    op.create_index(op.f('ix_wh_dailyorderstat_id'), 'wh_dailyorderstat', ['id'], unique=False)
+    op.create_index(op.f('ix_wh_dailyorderstat_day'), 'wh_dailyorderstat', ['day'], unique=False)
+
+    # 库存事务日汇总（复用库存事务表的枚举类型）
+    transaction_type = postgresql.ENUM(
+        'INBOUND', 'OUTBOUND', 'ADJUSTMENT', name='inventorytransactiontype', create_type=False
+    )
+    op.create_table(
+        'wh_dailytransactionstat',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('transaction_type', sa.Enum(
+            'INBOUND', 'OUTBOUND', 'ADJUSTMENT', name='inventorytransactiontype'
+        ).with_variant(transaction_type, 'postgresql'), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Float(), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'transaction_type', name='uq_wh_dailytransactionstat_day_type')
+    )
+    op.create_index(op.f('ix_wh_dailytransactionstat_id'), 'wh_dailytransactionstat', ['id'], unique=False)
+    op.create_index(op.f('ix_wh_dailytransactionstat_day'), 'wh_dailytransactionstat', ['day'], unique=False)
+
+    # 已完成工作流任务日汇总
+    op.create_table(
+        'wh_dailytaskstat',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('task_name', sa.String(length=100), nullable=False),
+        sa.Column('result', sa.String(length=20), nullable=False),
+        sa.Column('task_count', sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'task_name', 'result', name='uq_wh_dailytaskstat_day_task_result')
+    )
+    op.create_index(op.f('ix_wh_dailytaskstat_id'), 'wh_dailytaskstat', ['id'], unique=False)
+    op.create_index(op.f('ix_wh_dailytaskstat_day'), 'wh_dailytaskstat', ['day'], unique=False)
+
+    # 汇总任务状态
+    op.create_table(
+        'wh_rollupstate',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('last_run_time', sa.DateTime(), nullable=True),
+        sa.Column('complete_until', sa.Date(), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_wh_rollupstate_id'), 'wh_rollupstate', ['id'], unique=False)
+
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
+
+    op.drop_index(op.f('ix_wh_rollupstate_id'), table_name='wh_rollupstate')
+    op.drop_table('wh_rollupstate')
+    op.drop_index(op.f('ix_wh_dailytaskstat_day'), table_name='wh_dailytaskstat')
+    op.drop_index(op.f('ix_wh_dailytaskstat_id'), table_name='wh_dailytaskstat')
+    op.drop_table('wh_dailytaskstat')
+    op.drop_index(op.f('ix_wh_dailytransactionstat_day'), table_name='wh_dailytransactionstat')
+    op.drop_index(op.f('ix_wh_dailytransactionstat_id'), table_name='wh_dailytransactionstat')
+    op.drop_table('wh_dailytransactionstat')
+    op.drop_index(op.f('ix_wh_dailyorderstat_day'), table_name='wh_dailyorderstat')
+    op.drop_index(op.f('ix_wh_dailyorderstat_id'), table_name='wh_dailyorderstat')
+    op.drop_table('wh_dailyorderstat')
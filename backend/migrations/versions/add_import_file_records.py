@@ -0,0 +1,42 @@
+"""Add import file records
+
+Revision ID: add_import_file_records
+Revises: add_daily_rollup_tables
+Create Date: 2025-05-27 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_import_file_records'
+down_revision = 'add_daily_rollup_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 已导入文件：按 (导入类型, 文件内容 SHA-256) 记录导入结果，重复上传时直接返回
+    op.create_table(
+        'wh_importfile',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('import_type', sa.String(length=20), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('import_id', sa.String(length=50), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('operator_id', sa.Integer(), nullable=True),
+        sa.Column('create_time', sa.DateTime(), nullable=False),
+        sa.Column('update_time', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['operator_id'], ['wh_user.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('import_type', 'sha256', name='uq_wh_importfile_type_sha256')
+    )
+    op.create_index(op.f('ix_wh_importfile_id'), 'wh_importfile', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_wh_importfile_id'), table_name='wh_importfile')
+    op.drop_table('wh_importfile')
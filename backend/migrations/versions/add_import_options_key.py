@@ -0,0 +1,35 @@
+"""Add import options key
+
+Revision ID: add_import_options_key
+Revises: add_rollup_stale_days
+Create Date: 2025-06-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_import_options_key'
+down_revision = 'add_rollup_stale_days'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 导入记录按 (导入类型, 文件内容 SHA-256, 导入选项键) 去重，同一文件用不同选项（如采购订单号）导入时不视为重复
+    op.add_column('wh_importfile', sa.Column('options_key', sa.String(length=64), nullable=False, server_default=''))
+    op.drop_constraint('uq_wh_importfile_type_sha256', 'wh_importfile', type_='unique')
+    op.create_unique_constraint(
+        'uq_wh_importfile_type_sha256_options', 'wh_importfile', ['import_type', 'sha256', 'options_key']
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_wh_importfile_type_sha256_options', 'wh_importfile', type_='unique')
+    # 同一文件以不同选项导入的记录只保留最早的一条
+    op.execute(
+        "DELETE FROM wh_importfile a USING wh_importfile b "
+        "WHERE a.import_type = b.import_type AND a.sha256 = b.sha256 AND a.id > b.id"
+    )
+    op.create_unique_constraint('uq_wh_importfile_type_sha256', 'wh_importfile', ['import_type', 'sha256'])
+    op.drop_column('wh_importfile', 'options_key')
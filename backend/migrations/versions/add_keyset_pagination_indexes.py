@@ -0,0 +1,37 @@
+"""Add composite indexes for keyset pagination
+
+Revision ID: add_keyset_pagination_indexes
+Revises: add_deleted_outbound_record
+Create Date: 2025-05-06 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_keyset_pagination_indexes'
+down_revision = 'add_deleted_outbound_record'
+branch_labels = None
+depends_on = None
+
+
+# 索引名 -> (表名, 列)
+INDEXES = {
+    'ix_wh_outboundorder_create_time_id': ('wh_outboundorder', ['create_time', 'id']),
+    'ix_wh_purchaseorder_create_time_id': ('wh_purchaseorder', ['create_time', 'id']),
+    'ix_wh_inventory_material_code_id': ('wh_inventory', ['material_code', 'id']),
+    'ix_wh_inventorytransaction_time_id': ('wh_inventorytransaction', ['transaction_time', 'id']),
+    'ix_wh_workflowtask_assignee_status_create_time': (
+        'wh_workflowtask', ['assignee_id', 'status', 'create_time', 'id']
+    ),
+}
+
+
+def upgrade():
+    # 列表游标分页按 (排序列, id) 定位，需要对应的组合索引
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,33 @@
+"""Add rollup stale days
+
+Revision ID: add_rollup_stale_days
+Revises: add_import_file_records
+Create Date: 2025-06-10 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_rollup_stale_days'
+down_revision = 'add_import_file_records'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 需要重新汇总的日期：明细的日期被修改或明细被删除时记录原日期（增量汇总按 update_time 找不到这些日期）
+    op.create_table(
+        'wh_rollupstaleday',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('create_time', sa.DateTime(), nullable=False),
+        sa.Column('update_time', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_wh_rollupstaleday_id'), 'wh_rollupstaleday', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_wh_rollupstaleday_id'), table_name='wh_rollupstaleday')
+    op.drop_table('wh_rollupstaleday')
@@ -0,0 +1,65 @@
+"""Add pg_trgm GIN indexes for substring search
+
+Revision ID: add_trigram_search_indexes
+Revises: add_keyset_pagination_indexes
+Create Date: 2025-05-08 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_trigram_search_indexes'
+down_revision = 'add_keyset_pagination_indexes'
+branch_labels = None
+depends_on = None
+
+
+# 列表接口中使用 ILIKE '%关键字%' 搜索的列：表名 -> 列
+SEARCH_COLUMNS = {
+    'wh_outboundorder': ['material_voucher', 'department', 'user_unit'],
+    'wh_outbounditem': ['material_code'],
+    'wh_purchaseorder': ['order_no', 'supplier_name', 'user_unit'],
+    'wh_purchaseorderitem': ['material_code'],
+    'wh_inventory': ['material_code', 'material_description'],
+}
+
+
+def _index_name(table, column):
+    return f'ix_{table}_{column}_trgm'
+
+
+def upgrade():
+    # 三元组索引仅 PostgreSQL 支持；SQLite 等数据库跳过，搜索按普通 LIKE 执行
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # 并发建索引不锁表，需要在事务外执行
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.create_index(
+                    _index_name(table, column),
+                    table,
+                    [column],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        for table, columns in SEARCH_COLUMNS.items():
+            for column in columns:
+                op.drop_index(
+                    _index_name(table, column),
+                    table_name=table,
+                    postgresql_concurrently=True,
+                    if_exists=True,
+                )
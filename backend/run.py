@@ -13,12 +13,14 @@ from app.db.init_db import create_tables, initialize_data
 
 # 导入任务模块
 from app.tasks import scheduled_tasks
-from app.tasks.message_handlers import handle_inventory_message, handle_report_message
+from app.tasks.message_handlers import handle_inventory_message, handle_report_message, handle_import_job_message
+from app.tasks.message_handlers import handle_dashboard_refresh_message
 
 # 导入核心模块
 from app.core.redis import get_redis
 from app.core.rabbitmq import get_rabbitmq
 from app.core.xxl_job import get_xxl_job
+from app.core.config import settings
 
 
 def setup_message_queues():
@@ -31,6 +33,8 @@ def setup_message_queues():
     # 声明队列
     rabbitmq.declare_queue("inventory_sync_result", durable=True)
     rabbitmq.declare_queue("report_generation_result", durable=True)
+    rabbitmq.declare_queue(settings.IMPORT_JOB_QUEUE, durable=True)
+    rabbitmq.declare_queue(settings.DASHBOARD_REFRESH_QUEUE, durable=True)
 
     # 声明交换机
     rabbitmq.declare_exchange("warehouse_workflow", exchange_type="direct", durable=True)
@@ -55,6 +59,16 @@ def setup_message_consumers():
     # 设置报表消息消费者
     rabbitmq.setup_consumer("report_generation_result", handle_report_message, auto_ack=False)
 
+    # 设置导入任务消费者（IMPORT_JOB_BACKEND=rabbitmq 时导入任务经由该队列执行），
+    # 同时执行的任务数不超过本地导入进程池大小
+    rabbitmq.setup_consumer(
+        settings.IMPORT_JOB_QUEUE, handle_import_job_message, auto_ack=False,
+        prefetch_count=settings.IMPORT_JOB_WORKERS,
+    )
+
+    # 设置看板刷新消费者
+    rabbitmq.setup_consumer(settings.DASHBOARD_REFRESH_QUEUE, handle_dashboard_refresh_message, auto_ack=False)
+
     print("消息消费者设置完成")
 
 
@@ -102,6 +116,13 @@ def setup_scheduled_tasks():
         params={"type": "daily", "source": "local"}
     )
 
+    xxl_job.add_local_job(
+        job_name="rollupDailyStatsTask",
+        cron="*/10 * * * *",  # 每 10 分钟增量汇总一次
+        handler=scheduled_tasks.rollup_daily_stats_task,
+        params={"source": "local"}
+    )
+
     print("定时任务设置完成")
 
 
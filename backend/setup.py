@@ -1,7 +1,5 @@
 from setuptools import setup, find_packages
-import sys
 
-# 根据 Python 版本确定依赖项
 install_requires = [
     "fastapi>=0.68.0,<0.69.0",
     "pydantic>=1.8.0,<2.0.0",
@@ -16,19 +14,16 @@ install_requires = [
     "openpyxl>=3.0.9,<4.0.0",
     "pytest>=6.2.5,<7.0.0",
     "httpx>=0.19.0,<0.20.0",
+    "pandas",
 ]
 
-# 对于 Python 3.13，使用 polars 替代 pandas
-if sys.version_info >= (3, 13):
-    install_requires.append("polars>=0.20.0")
-else:
-    install_requires.append("pandas>=1.5.3,<2.0.0")
-
 setup(
     name="warehouse_workflow",
     version="0.1.0",
     packages=find_packages(),
     install_requires=install_requires,
+    # 可选 DataFrame 引擎：pip install -e ".[polars]" 后设置 DATAFRAME_ENGINE=polars
+    extras_require={"polars": ["polars>=1.0.0", "fastexcel"]},
     python_requires=">=3.8",
     description="仓储工作流系统后端",
     author="Your Name",
@@ -1,10 +1,13 @@
 import unittest
+from unittest import mock
+
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.api import deps
 from app.db.session import Base, get_db
 from app.models.user import User, Role
 from app.core.security import get_password_hash
@@ -30,6 +33,8 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[deps.get_db] = override_get_db
+app.dependency_overrides[deps.get_reporting_db] = override_get_db
 
 
 class TestAPI(unittest.TestCase):
@@ -110,6 +115,22 @@ class TestAPI(unittest.TestCase):
         self.assertTrue(response.json()["is_active"])
         self.assertTrue(response.json()["is_superuser"])
 
+    def test_import_job_owner(self):
+        """测试只能查询自己提交的导入任务"""
+        db = TestingSessionLocal()
+        admin_id = db.query(User.id).filter(User.username == "admin").scalar()
+        db.close()
+
+        job = {"jobId": "job1", "importType": "purchase", "status": "PENDING", "operatorId": admin_id + 1}
+        with mock.patch("app.api.api_v1.endpoints.imports.get_import_job", return_value=job):
+            response = self.client.get("/api/v1/imports/job1", headers=self.headers)
+            self.assertEqual(response.status_code, 404)
+
+            job["operatorId"] = admin_id
+            response = self.client.get("/api/v1/imports/job1", headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["data"]["status"], "PENDING")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,258 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import deps
+from app.core.security import create_access_token
+from app.db import session as db_session
+from app.db.session import Base
+from app.main import app
+from app.models.notification import Notification, NotificationRecipient, NotificationType
+from app.models.outbound import DeletedOutboundRecord, OutboundItem, OutboundOrder, OutboundStatus
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
+from app.models.user import Role, User
+from app.models.warehouse import (
+    DeliveryConfirmation, Inventory, InventoryTransaction, InventoryTransactionType,
+)
+from app.models.workflow import TaskStatus, WorkflowInstance, WorkflowTask, WorkflowType
+
+
+# 每个列表接口的种子数据行数：每行多一条查询就会超出预算
+ROWS = 12
+PAGE_SIZE = 10
+
+# 每个接口允许执行的 SQL 语句数（包括认证时查询当前用户的一条）
+# 新增查询前先确认它与返回的行数无关，再调整预算
+QUERY_BUDGETS = {
+    "/api/v1/users/": 2,
+    "/api/v1/users/me": 1,
+    "/api/v1/users/{user_id}": 2,
+    "/api/v1/purchase/list": 3,
+    "/api/v1/purchase/{id}": 3,
+    "/api/v1/purchase/debug": 3,
+    "/api/v1/purchase/user-units": 2,
+    "/api/v1/workflow/tasks/todo": 3,
+    "/api/v1/confirmation/list": 3,
+    "/api/v1/confirmation/{id}/pdf": 2,
+    "/api/v1/outbound/list": 4,
+    "/api/v1/outbound/audit/records": 3,
+    "/api/v1/outbound/{id}": 4,
+    "/api/v1/outbound/audit/records/{id}": 3,
+    "/api/v1/inventory/list": 3,
+    "/api/v1/inventory/{id}": 2,
+    "/api/v1/inventory/transactions": 3,
+    "/api/v1/notifications/": 4,
+    "/api/v1/reports/dashboard/leadership": 5,
+    "/api/v1/reports/dashboard/operation": 6,
+    "/api/v1/reports/daily": 5,
+}
+
+# 不计入预算的 GET 接口及原因
+EXCLUDED = {
+    "/": "不查询数据库",
+    "/api/v1/purchase/export": "流式导出在独立会话中逐批查询，查询次数随导出行数增长",
+    "/api/v1/outbound/export": "流式导出在独立会话中逐批查询，查询次数随导出行数增长",
+    "/api/v1/inventory/export": "流式导出在独立会话中逐批查询，查询次数随导出行数增长",
+    "/api/v1/imports/{job_id}": "导入进度保存在 Redis 中",
+}
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# 测试期间执行的 SQL 语句
+statements = []
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+
+def override_get_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def seed(db):
+    """
+    写入每个列表接口各 ROWS 行数据，关联的用户各不相同（相同用户会命中会话的标识映射，掩盖按行查询）
+    """
+    role = Role(name="系统管理员", description="系统管理员")
+    db.add(role)
+    db.flush()
+    admin = User(
+        username="admin", email="admin@example.com", hashed_password="x", full_name="系统管理员",
+        is_active=True, is_superuser=True, role_id=role.id,
+    )
+    staff = [
+        User(username=f"staff{n}", email=f"staff{n}@example.com", hashed_password="x", full_name=f"员工{n}",
+             role_id=role.id)
+        for n in range(ROWS)
+    ]
+    db.add_all([admin] + staff)
+    db.flush()
+
+    now = datetime.now()
+    today = date.today()
+    ids = {"user_id": staff[0].id}
+    for n in range(ROWS):
+        created = now - timedelta(hours=n)
+        order = PurchaseOrder(
+            order_no=f"PO{n:04d}", user_unit=f"单位{n % 3}", category=f"大类{n % 2}", order_date=today,
+            supplier_name=f"供应商{n}", total_amount=100 + n, create_time=created,
+        )
+        db.add(order)
+        db.flush()
+        db.add_all([
+            PurchaseOrderItem(order_id=order.id, line_item_number=str(line), material_code=f"M{line}",
+                              requested_quantity=line + 1, contract_price=1.5)
+            for line in range(3)
+        ])
+
+        workflow = WorkflowInstance(
+            process_instance_id=f"P{n}", business_key=order.order_no, workflow_type=WorkflowType.PURCHASE_CONFIRMATION,
+            initiator_id=staff[n].id, purchase_order_id=order.id,
+        )
+        db.add(workflow)
+        db.flush()
+        db.add(WorkflowTask(
+            task_id=f"T{n}", workflow_instance_id=workflow.id, task_name="保管员确认",
+            status=TaskStatus.PENDING, assignee_id=admin.id, create_time=created,
+        ))
+        confirmation = DeliveryConfirmation(
+            confirmation_no=f"CF{n:04d}", order_id=order.id, keeper_id=staff[n].id,
+            inspector_id=staff[-1 - n].id, create_time=created,
+        )
+        db.add(confirmation)
+
+        outbound = OutboundOrder(
+            material_voucher=f"V{n:04d}", voucher_date=today, department="一车间", user_unit="一车间",
+            status=OutboundStatus.PENDING, total_amount=3, operator_id=staff[n].id, create_time=created,
+        )
+        db.add(outbound)
+        db.flush()
+        db.add_all([
+            OutboundItem(outbound_id=outbound.id, material_code=f"M{line}", material_description="螺栓",
+                         unit="个", actual_quantity=1, outbound_price=1, outbound_amount=1)
+            for line in range(3)
+        ])
+        record = DeletedOutboundRecord(
+            original_id=1000 + n, material_voucher=f"D{n:04d}", voucher_date=today, department="一车间",
+            user_unit="一车间", operator_id=staff[n].id, items_data=[{"material_code": "M1"}],
+        )
+        db.add(record)
+
+        inventory = Inventory(material_code=f"M{n:04d}", material_description="螺栓", quantity=10 + n)
+        db.add(inventory)
+        db.flush()
+        db.add(InventoryTransaction(
+            inventory_id=inventory.id, transaction_type=InventoryTransactionType.INBOUND, quantity=1,
+            transaction_time=created, operator_id=staff[n].id,
+        ))
+
+        notification = Notification(
+            title=f"通知{n}", content="内容", notification_type=NotificationType.SYSTEM, sender_id=staff[n].id,
+        )
+        db.add(notification)
+        db.flush()
+        db.add(NotificationRecipient(notification_id=notification.id, recipient_id=admin.id))
+
+        if n == 0:
+            ids.update(id=order.id, outbound_id=outbound.id, record_id=record.id, inventory_id=inventory.id)
+            db.flush()
+            ids["confirmation_id"] = confirmation.id
+    db.commit()
+    return admin.id, ids
+
+
+class TestQueryBudget(unittest.TestCase):
+    """接口 SQL 查询预算测试：列表、详情和看板接口的查询次数不能随返回的行数增长"""
+
+    @classmethod
+    def setUpClass(cls):
+        Base.metadata.create_all(bind=engine)
+        db = TestingSessionLocal()
+        try:
+            admin_id, cls.ids = seed(db)
+        finally:
+            db.close()
+        cls.headers = {"Authorization": f"Bearer {create_access_token(admin_id)}"}
+
+        cls.previous_overrides = dict(app.dependency_overrides)
+        app.dependency_overrides[deps.get_db] = override_get_db
+        app.dependency_overrides[db_session.get_db] = override_get_db
+        app.dependency_overrides[deps.get_reporting_db] = override_get_db
+        cls.client = TestClient(app)
+
+    @classmethod
+    def tearDownClass(cls):
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(cls.previous_overrides)
+        Base.metadata.drop_all(bind=engine)
+
+    def _paths(self):
+        """按预算表中的接口构建请求路径（列表接口按 PAGE_SIZE 分页）"""
+        ids = self.ids
+        return {
+            "/api/v1/users/": "/api/v1/users/",
+            "/api/v1/users/me": "/api/v1/users/me",
+            "/api/v1/users/{user_id}": f"/api/v1/users/{ids['user_id']}",
+            "/api/v1/purchase/list": f"/api/v1/purchase/list?size={PAGE_SIZE}",
+            "/api/v1/purchase/{id}": f"/api/v1/purchase/{ids['id']}",
+            "/api/v1/purchase/debug": "/api/v1/purchase/debug",
+            "/api/v1/purchase/user-units": "/api/v1/purchase/user-units",
+            "/api/v1/workflow/tasks/todo": f"/api/v1/workflow/tasks/todo?size={PAGE_SIZE}",
+            "/api/v1/confirmation/list": f"/api/v1/confirmation/list?size={PAGE_SIZE}",
+            "/api/v1/confirmation/{id}/pdf": f"/api/v1/confirmation/{ids['confirmation_id']}/pdf",
+            "/api/v1/outbound/list": f"/api/v1/outbound/list?size={PAGE_SIZE}",
+            "/api/v1/outbound/audit/records": f"/api/v1/outbound/audit/records?size={PAGE_SIZE}",
+            "/api/v1/outbound/{id}": f"/api/v1/outbound/{ids['outbound_id']}",
+            "/api/v1/outbound/audit/records/{id}": f"/api/v1/outbound/audit/records/{ids['record_id']}",
+            "/api/v1/inventory/list": f"/api/v1/inventory/list?size={PAGE_SIZE}",
+            "/api/v1/inventory/{id}": f"/api/v1/inventory/{ids['inventory_id']}",
+            "/api/v1/inventory/transactions": f"/api/v1/inventory/transactions?size={PAGE_SIZE}",
+            "/api/v1/notifications/": f"/api/v1/notifications/?size={PAGE_SIZE}",
+            "/api/v1/reports/dashboard/leadership": "/api/v1/reports/dashboard/leadership",
+            "/api/v1/reports/dashboard/operation": "/api/v1/reports/dashboard/operation",
+            "/api/v1/reports/daily": "/api/v1/reports/daily",
+        }
+
+    def test_every_endpoint_has_budget(self):
+        """测试所有 GET 接口都声明了查询预算或不计入预算的原因"""
+        get_paths = {path for path, operations in app.openapi()["paths"].items() if "get" in operations}
+        missing = get_paths - set(QUERY_BUDGETS) - set(EXCLUDED)
+        self.assertFalse(missing, f"以下接口需要在 QUERY_BUDGETS 中声明查询预算: {sorted(missing)}")
+        self.assertEqual(set(self._paths()), set(QUERY_BUDGETS))
+
+    def test_query_budgets(self):
+        """测试每个接口的 SQL 语句数不超过预算"""
+        for route, path in self._paths().items():
+            with self.subTest(route=route):
+                statements.clear()
+                response = self.client.get(path, headers=self.headers)
+                issued = list(statements)
+
+                self.assertEqual(response.status_code, 200, response.text)
+                budget = QUERY_BUDGETS[route]
+                self.assertLessEqual(
+                    len(issued), budget,
+                    f"{route} 执行了 {len(issued)} 条 SQL，预算为 {budget}:\n" + "\n".join(
+                        " ".join(statement.split())[:200] for statement in issued
+                    ),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
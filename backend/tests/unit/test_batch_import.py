@@ -0,0 +1,117 @@
+import io
+import shutil
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+from openpyxl import Workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.outbound import OutboundItem, OutboundOrder
+from app.models.user import User
+from app.services.batch_import import import_batch, shutdown_parse_executor
+from app.services.import_jobs import ImportType
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+HEADER = ["序号", "物料凭证", "物料编码", "实拨数量", "具体用料部门"]
+
+
+def build_sheets(sheets):
+    """构建包含多个工作表的 .xlsx 文件内容"""
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class TestBatchImport(unittest.TestCase):
+    """多文件、多工作表批量导入测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        user = User(username="importer", email="importer@example.com", hashed_password="x", full_name="导入员")
+        self.db.add(user)
+        self.db.commit()
+        self.user_id = user.id
+
+        self.upload_dir = tempfile.mkdtemp()
+        for name, value in (("IMPORT_UPLOAD_DIR", self.upload_dir), ("IMPORT_PARSE_WORKERS", 2)):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(shutdown_parse_executor)
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+        shutil.rmtree(self.upload_dir)
+
+    def test_zip_and_workbooks(self):
+        """测试 zip 包和工作簿中的全部工作表合并导入，错误附带来源文件和工作表"""
+        first = build_sheets({
+            "一月": [HEADER, [1, "V1", "1001", 5, "生产部"], [2, "V1", "1002", 0, "生产部"]],
+            "二月": [HEADER, [1, "V2", "1001", 3, "维修部"]],
+        })
+        broken = build_sheets({"汇总": [["物料凭证", "金额"], ["V9", 10]]})
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("月末/一二月.xlsx", first)
+            zf.writestr("月末/汇总.xlsx", broken)
+            zf.writestr("说明.txt", "忽略")
+            zf.writestr("__MACOSX/月末/._一二月.xlsx", b"")
+        archive.seek(0)
+        single = build_sheets({"Sheet1": [HEADER, [1, "V1", "1003", 2, "生产部"], [2, "V3", None, 1, "生产部"]]})
+
+        result = import_batch(
+            self.db, ImportType.OUTBOUND,
+            [(archive, "month.zip"), (io.BytesIO(single), "extra.xlsx")],
+            self.user_id,
+        )
+        self.db.commit()
+
+        self.assertEqual(result["totalCount"], 5)
+        self.assertEqual(result["successCount"], 3)
+        self.assertEqual(result["errorCount"], 2)
+        self.assertEqual(
+            [(entry["file"], entry["sheet"], entry["rows"]) for entry in result["sheets"]],
+            [
+                ("month.zip/月末/一二月.xlsx", "一月", 2),
+                ("month.zip/月末/一二月.xlsx", "二月", 1),
+                ("month.zip/月末/汇总.xlsx", "汇总", 0),
+                ("extra.xlsx", "Sheet1", 2),
+            ],
+        )
+        self.assertIn("缺少必要的列", result["sheets"][2]["error"])
+        errors = [d for d in result["errorDetails"] if not d["errorMessage"].startswith("警告")]
+        self.assertEqual(
+            [(d["file"], d["sheet"], d["rowIndex"]) for d in errors],
+            [("month.zip/月末/一二月.xlsx", "一月", 3), ("extra.xlsx", "Sheet1", 3)],
+        )
+
+        # 跨文件出现的同一凭证归入同一出库单
+        self.assertEqual(self.db.query(OutboundOrder).count(), 3)
+        self.assertEqual(self.db.query(OutboundItem).count(), 3)
+        voucher = self.db.query(OutboundOrder).filter(OutboundOrder.material_voucher == "V1").one()
+        self.assertEqual(len(voucher.items), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.outbound import OutboundOrder
+from app.models.user import User
+from app.services.outbound_import import import_outbound_file
+from app.utils.csv_reader import CsvChunkReader, detect_encoding
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def csv_file(text, name="data.csv", encoding="utf-8"):
+    """构建带文件名的内存 CSV 文件"""
+    buffer = io.BytesIO(text.encode(encoding))
+    buffer.name = name
+    return buffer
+
+
+class TestCsvChunkReader(unittest.TestCase):
+    """CSV/TSV 分块读取测试"""
+
+    def test_detect_encoding(self):
+        """测试编码识别：BOM、UTF-8 和 GBK"""
+        self.assertEqual(detect_encoding("\ufeff物料凭证".encode("utf-8")), "utf-8-sig")
+        self.assertEqual(detect_encoding("物料凭证".encode("utf-8")[:-1]), "utf-8")  # 样本截断在多字节字符中间
+        self.assertEqual(detect_encoding("物料凭证".encode("gbk")), "gb18030")
+
+    def test_read_chunks(self):
+        """测试 GBK 编码 CSV 分块读取：按文本读取，行号与Excel一致，空行被跳过"""
+        text = "序号, 物料凭证 ,物料编码,实拨数量\n1,V1,0012,5\n\n,,,\n2,\"V,2\",1001,3\n3,V3,1001,\n"
+        source = csv_file(text, encoding="gbk")
+
+        with CsvChunkReader(source, chunk_size=2) as reader:
+            self.assertEqual(reader.columns, ["序号", "物料凭证", "物料编码", "实拨数量"])
+            reader.drop_columns(["序号"])
+            reader.rename_columns({"实拨数量": "数量"})
+            chunks = list(reader)
+            self.assertEqual(reader.rows_read, 5)
+
+        df = pd.concat(chunks)
+        self.assertEqual(df.index.tolist(), [0, 3, 4])
+        self.assertEqual(df["物料凭证"].tolist(), ["V1", "V,2", "V3"])
+        self.assertEqual(df["物料编码"].tolist()[0], "0012")
+        self.assertTrue(pd.isna(df["数量"].iloc[2]))
+        self.assertFalse(source.closed)
+
+    def test_tsv(self):
+        """测试带 BOM 的 UTF-8 TSV"""
+        source = csv_file("\ufeff物料凭证\t物料编码\nV1\t1001\n", name="data.TSV")
+        with CsvChunkReader(source) as reader:
+            self.assertEqual(reader.delimiter, "\t")
+            self.assertEqual(pd.concat(list(reader))["物料编码"].tolist(), ["1001"])
+
+
+class TestCsvImport(unittest.TestCase):
+    """CSV 出库导入测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        user = User(username="importer", email="importer@example.com", hashed_password="x", full_name="导入员")
+        self.db.add(user)
+        self.db.commit()
+        self.user_id = user.id
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+        shutil.rmtree(self.temp_dir)
+
+    def test_import_csv_file(self):
+        """测试 CSV 文件经过与Excel相同的校验和写入流程"""
+        path = os.path.join(self.temp_dir, "outbound.csv")
+        with open(path, "w", encoding="gbk", newline="") as f:
+            f.write("物料凭证,开单日期,物料编码,实拨数量,出库单价,具体用料部门\n")
+            f.write("4900000001,2025/02/01,1001,2,1.5,一车间\n")
+            f.write("4900000001,2025/02/01,1002,1,2,一车间\n")
+            f.write("4900000002,2025/02/01,,1,2,一车间\n")
+
+        result = import_outbound_file(self.db, path, self.user_id)
+        self.db.commit()
+
+        self.assertEqual(result["successCount"], 2)
+        self.assertIn({"rowIndex": 4, "errorMessage": "物料编码不能为空"}, result["errorDetails"])
+        order = self.db.query(OutboundOrder).filter(OutboundOrder.material_voucher == "4900000001").one()
+        self.assertEqual(order.voucher_date, date(2025, 2, 1))
+        self.assertEqual(order.department, "一车间")
+        self.assertEqual(order.total_amount, 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
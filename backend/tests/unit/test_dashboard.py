@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import redis
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.purchase_order import PurchaseOrder
+from app.models.warehouse import Inventory, InventoryTransaction, InventoryTransactionType
+from app.models.workflow import WorkflowInstance, WorkflowType, WorkflowStatus
+from app.services.dashboard import build_leadership_dashboard, build_operation_dashboard, dashboard_period
+from app.services import dashboard_cache
+from app.services.dashboard_cache import get_dashboard
+from app.tasks.message_handlers import handle_dashboard_refresh_message
+from tests.unit.test_import_jobs import FakeChannel
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestLeadershipDashboard(unittest.TestCase):
+    """领导层看板统计测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def test_dashboard_period(self):
+        """测试统计区间"""
+        self.assertEqual(dashboard_period("TODAY", date(2025, 3, 12)), (date(2025, 3, 12), date(2025, 3, 12)))
+        self.assertEqual(dashboard_period("WEEK", date(2025, 3, 12)), (date(2025, 3, 10), date(2025, 3, 16)))
+        self.assertEqual(dashboard_period("MONTH", date(2025, 12, 5)), (date(2025, 12, 1), date(2025, 12, 31)))
+
+    def test_build_dashboard(self):
+        """测试合计、分布、趋势补零和库存预警"""
+        now = datetime.now()
+        today = now.date()
+        self.db.add_all([
+            PurchaseOrder(order_no="P1", order_date=today, category="钢材", user_unit="一厂",
+                          total_amount=100, create_time=now.replace(minute=0)),
+            PurchaseOrder(order_no="P2", order_date=today, category="钢材", user_unit="二厂",
+                          total_amount=50, create_time=now.replace(minute=0)),
+            PurchaseOrder(order_no="P3", order_date=today, category=None, user_unit="一厂",
+                          total_amount=None, create_time=now - timedelta(days=2)),
+            Inventory(material_code="M1", quantity=5, total_value=20),
+            Inventory(material_code="M2", quantity=50, total_value=30),
+        ])
+        self.db.commit()
+
+        data = build_leadership_dashboard(self.db, "TODAY")
+
+        self.assertEqual(data["orderCount"], 3)
+        self.assertEqual(data["orderAmount"], 150)
+        self.assertEqual(data["inventoryValue"], 50)
+        self.assertEqual(data["qualityPassRate"], 1.0)
+        self.assertEqual(data["categoryDistribution"], [
+            {"category": "钢材", "count": 2, "amount": 150, "percentage": 2 / 3}
+        ])
+        self.assertEqual(sorted(item["userUnit"] for item in data["userUnitDistribution"]), ["一厂", "二厂"])
+
+        self.assertEqual(len(data["orderTrend"]), 24)
+        current_hour = data["orderTrend"][now.hour]
+        self.assertEqual((current_hour["date"], current_hour["count"], current_hour["amount"]),
+                         (f"{now.hour:02d}:00", 2, 150))
+        self.assertEqual(sum(point["count"] for point in data["orderTrend"]), 2)
+
+        self.assertEqual([alert["type"] for alert in data["alerts"]], ["LOW_INVENTORY"])
+
+    def test_build_operation_dashboard(self):
+        """测试运营看板的工作流、出入库和库存统计"""
+        start = datetime(2025, 3, 1, 8, 0)
+        self.db.add_all([
+            WorkflowInstance(process_instance_id="W1", workflow_type=WorkflowType.QUALITY_INSPECTION,
+                             status=WorkflowStatus.COMPLETED, create_time=start, update_time=start + timedelta(hours=2)),
+            WorkflowInstance(process_instance_id="W2", workflow_type=WorkflowType.QUALITY_INSPECTION,
+                             status=WorkflowStatus.COMPLETED, create_time=start, update_time=start + timedelta(hours=4)),
+            WorkflowInstance(process_instance_id="W3", workflow_type=WorkflowType.OUTBOUND,
+                             status=WorkflowStatus.RUNNING, create_time=start, update_time=start),
+            Inventory(material_code="M1", category="钢材", quantity=5, total_value=20),
+            InventoryTransaction(inventory_id=1, transaction_type=InventoryTransactionType.INBOUND, quantity=5, operator_id=1),
+            InventoryTransaction(inventory_id=1, transaction_type=InventoryTransactionType.INBOUND, quantity=5, operator_id=1),
+            InventoryTransaction(inventory_id=1, transaction_type=InventoryTransactionType.OUTBOUND, quantity=5, operator_id=1),
+        ])
+        self.db.commit()
+
+        data = build_operation_dashboard(self.db)
+
+        workflow_stats = data["workflowStats"]
+        self.assertEqual((workflow_stats["total"], workflow_stats["running"], workflow_stats["completed"]), (3, 1, 2))
+        self.assertAlmostEqual(workflow_stats["avgProcessTime"], 3)
+        self.assertEqual(
+            {item["type"]: item["count"] for item in workflow_stats["byType"]},
+            {WorkflowType.QUALITY_INSPECTION: 2, WorkflowType.OUTBOUND: 1},
+        )
+        storage_stats = data["storageStats"]
+        self.assertEqual((storage_stats["inboundCount"], storage_stats["outboundCount"]), (2, 1))
+        self.assertEqual(storage_stats["turnoverRate"], 0.5)
+        self.assertEqual(storage_stats["byCategory"], [{"category": "钢材", "quantity": 5, "value": 20}])
+        self.assertEqual(data["qualityStats"]["passRate"], 1.0)
+
+    def test_dashboard_without_redis(self):
+        """测试 Redis 不可用时直接计算看板"""
+        self.db.add(Inventory(material_code="M1", quantity=5, total_value=20))
+        self.db.commit()
+
+        client = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.1)
+        data = get_dashboard(self.db, "leadership", "UNKNOWN", client=client)
+
+        self.assertEqual(data["inventoryValue"], 20)
+        self.assertEqual(len(data["orderTrend"]), (dashboard_period("MONTH", date.today())[1].day))
+
+    def test_local_refresh_coalesced(self):
+        """测试 RabbitMQ 不可用时连续的刷新事件由一个后台线程合并处理"""
+        calls = []
+        done = threading.Event()
+
+        def refresh(requested_at):
+            calls.append((requested_at, threading.current_thread().ident))
+            time.sleep(0.05)
+            done.set()
+
+        with mock.patch.object(dashboard_cache, "LOCAL_REFRESH_DELAY", 0.05), \
+                mock.patch.object(dashboard_cache, "refresh_or_invalidate", side_effect=refresh):
+            for requested_at in range(1, 6):
+                dashboard_cache._schedule_local_refresh(float(requested_at))
+            self.assertTrue(done.wait(2))
+            # 后台线程退出前又到达一个事件，由同一线程再刷新一次
+            dashboard_cache._schedule_local_refresh(6.0)
+            deadline = time.monotonic() + 2
+            while dashboard_cache._local_refresh_running and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        self.assertEqual([requested_at for requested_at, _ in calls], [5.0, 6.0])
+        self.assertEqual(len({ident for _, ident in calls}), 1)
+
+
+class FakeRedis:
+    """只支持看板缓存用到的 get/set/delete 的内存 Redis"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = str(value)
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+class TestDashboardRefresh(unittest.TestCase):
+    """看板后台刷新测试"""
+
+    def setUp(self):
+        self.client = FakeRedis()
+        patchers = [
+            mock.patch.object(dashboard_cache, "get_redis", return_value=self.client),
+            mock.patch("app.db.session.ReportingSessionLocal", TestingSessionLocal),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_failed_refresh_invalidates(self):
+        """测试刷新失败时删除看板缓存且不记录刷新时间，之前发布的事件仍会刷新"""
+        stale = dashboard_cache.dashboard_cache_key("operation", "ALL")
+        self.client.set(stale, "{}")
+
+        def compute(db, name, time_range):
+            if name == "operation":
+                raise RuntimeError("statement timeout")
+            return {"name": name}
+
+        with mock.patch.object(dashboard_cache, "_compute", side_effect=compute):
+            with self.assertRaises(RuntimeError):
+                dashboard_cache.refresh_or_invalidate(1.0)
+        self.assertNotIn(stale, self.client.values)
+        self.assertNotIn(dashboard_cache.REFRESHED_AT_KEY, self.client.values)
+
+        with mock.patch.object(dashboard_cache, "_compute", return_value={}):
+            self.assertTrue(dashboard_cache.refresh_dashboards(1.0))
+        self.assertIn(stale, self.client.values)
+        self.assertFalse(dashboard_cache.refresh_dashboards(0.5))
+
+    def test_message_acked_after_refresh(self):
+        """测试刷新消息交给刷新线程执行，刷新结束后才确认，失败时不重新入队"""
+        for outcome, expected in ((None, ([7], [])), (RuntimeError("failed"), ([], [(7, False)]))):
+            future = Future()
+            executor = mock.Mock()
+            executor.submit.return_value = future
+            channel = FakeChannel()
+            with mock.patch.object(dashboard_cache, "get_refresh_executor", return_value=executor):
+                handle_dashboard_refresh_message(
+                    channel, SimpleNamespace(delivery_tag=7), None, json.dumps({"requestedAt": 1.0})
+                )
+            executor.submit.assert_called_once_with(dashboard_cache.refresh_or_invalidate, 1.0)
+            self.assertEqual((channel.acks, channel.nacks), ([], []))
+
+            if outcome is None:
+                future.set_result(None)
+            else:
+                future.set_exception(outcome)
+            self.assertEqual((channel.acks, channel.nacks), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
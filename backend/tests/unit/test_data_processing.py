@@ -0,0 +1,80 @@
+import importlib.util
+import unittest
+
+import pandas as pd
+
+from app.utils.data_processing import PandasEngine, get_engine
+from app.utils.excel import ExcelChunkReader
+from tests.unit.test_excel import build_workbook
+
+HAS_POLARS = importlib.util.find_spec("polars") is not None and importlib.util.find_spec("fastexcel") is not None
+
+
+class WholeSheetPandasEngine(PandasEngine):
+    """整表读取 .xlsx 的 pandas 引擎，用于验证整表分块路径"""
+    reads_whole_sheet = True
+
+
+def read_all(source, frame_engine=None):
+    with ExcelChunkReader(source, chunk_size=2, frame_engine=frame_engine) as reader:
+        reader.drop_columns(["序号"])
+        chunks = list(reader)
+        return chunks, reader.rows_read
+
+
+class TestDataFrameEngine(unittest.TestCase):
+    """DataFrame 引擎测试"""
+
+    def setUp(self):
+        rows = [["序号", "物料凭证", "实拨数量"]]
+        rows += [[i + 1, f"V{i % 2}", i] for i in range(4)]
+        rows += [[None, None, None], [6, "V1", 5]]
+        self.rows = rows
+
+    def test_get_engine(self):
+        """测试按名称选择引擎"""
+        self.assertEqual(get_engine().name, "pandas")
+        self.assertIs(get_engine("pandas"), get_engine("PANDAS"))
+        with self.assertRaises(ValueError):
+            get_engine("spark")
+
+    @unittest.skipIf(HAS_POLARS, "polars 已安装")
+    def test_polars_fallback(self):
+        """测试未安装 polars 时回退到 pandas"""
+        with self.assertLogs("app.utils.data_processing", level="WARNING"):
+            self.assertEqual(get_engine("polars").name, "pandas")
+
+    def test_whole_sheet_chunks(self):
+        """测试整表读取后分块与流式读取结果一致"""
+        streamed, streamed_rows = read_all(build_workbook(self.rows))
+        whole, whole_rows = read_all(build_workbook(self.rows), WholeSheetPandasEngine())
+
+        self.assertEqual(whole_rows, streamed_rows)
+        self.assertEqual(
+            [chunk.index.tolist() for chunk in whole if not chunk.empty],
+            [chunk.index.tolist() for chunk in streamed],
+        )
+        self.assertEqual(pd.concat(whole)["物料凭证"].tolist(), pd.concat(streamed)["物料凭证"].tolist())
+
+    def test_sum_by(self):
+        """测试分组求和"""
+        totals = PandasEngine().sum_by(pd.Series([1.0, 2.0, 3.0]), pd.Series(["a", "b", "a"]))
+        self.assertEqual(totals.to_dict(), {"a": 4.0, "b": 2.0})
+
+    @unittest.skipUnless(HAS_POLARS, "未安装 polars")
+    def test_polars_engine(self):
+        """测试 polars 引擎的分块和分组求和与 pandas 一致"""
+        engine = get_engine("polars")
+        chunks, rows_read = read_all(build_workbook(self.rows), engine)
+        streamed, streamed_rows = read_all(build_workbook(self.rows))
+
+        self.assertEqual(rows_read, streamed_rows)
+        self.assertEqual([chunk.index.tolist() for chunk in chunks], [chunk.index.tolist() for chunk in streamed])
+        self.assertEqual(pd.concat(chunks)["实拨数量"].tolist(), pd.concat(streamed)["实拨数量"].tolist())
+
+        totals = engine.sum_by(pd.Series([1.0, 2.0, 3.0]), pd.Series(["a", "b", "a"]))
+        self.assertEqual(totals.to_dict(), {"a": 4.0, "b": 2.0})
+
+
+if __name__ == "__main__":
+    unittest.main()
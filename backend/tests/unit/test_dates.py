@@ -0,0 +1,49 @@
+import unittest
+from datetime import date, datetime
+
+import pandas as pd
+
+from app.utils.dates import detect_date_format, normalize_date_column, parse_date
+
+
+class TestNormalizeDateColumn(unittest.TestCase):
+    """日期列规范化测试"""
+
+    def test_mixed_column(self):
+        """测试混合日期单元格、Excel序列号、YYYYMMDD 和字符串"""
+        values = pd.Series([
+            45658, 45658.75, 20250216, "2025/01/02", " 2025年1月3日 ",
+            datetime(2025, 2, 1, 3), date(2025, 3, 1), None, "  ", "bad",
+        ], dtype=object)
+        default = date(2000, 1, 1)
+
+        with self.assertLogs("app.utils.dates", level="WARNING") as logs:
+            result = normalize_date_column(values, default, "voucher_date")
+
+        self.assertEqual(result.tolist(), [
+            date(2025, 1, 1), date(2025, 1, 1), date(2025, 2, 16), date(2025, 1, 2), date(2025, 1, 3),
+            date(2025, 2, 1), date(2025, 3, 1), default, default, default,
+        ])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("1 voucher_date values", logs.output[0])
+
+    def test_detect_string_format(self):
+        """测试按样本探测整列格式，不符合的值逐个尝试"""
+        self.assertEqual(detect_date_format(["13/01/2025", "01/02/2025"]), "%d/%m/%Y")
+        self.assertEqual(detect_date_format(["20250102"]), "%Y%m%d")
+        self.assertIsNone(detect_date_format(["bad"]))
+
+        result = normalize_date_column(pd.Series(["2025-01-02", "2025/01/03", "2025-01-02"]))
+        self.assertEqual(result.tolist(), [date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 2)])
+
+    def test_numeric_and_empty(self):
+        """测试数值列、空列和单值解析"""
+        result = normalize_date_column(pd.Series([45658.0, None]))
+        self.assertEqual(result.tolist(), [date(2025, 1, 1), None])
+        self.assertTrue(normalize_date_column(pd.Series([], dtype=object)).empty)
+        self.assertEqual(parse_date("2025.01.02"), date(2025, 1, 2))
+        self.assertEqual(parse_date(None, date(2000, 1, 1)), date(2000, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
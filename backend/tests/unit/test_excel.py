@@ -0,0 +1,51 @@
+import io
+import unittest
+
+from openpyxl import Workbook
+
+from app.utils.excel import ExcelChunkReader, detect_excel_engine
+
+
+def build_workbook(rows):
+    """构建内存中的 .xlsx 文件"""
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+class TestExcelChunkReader(unittest.TestCase):
+    """Excel分块读取测试"""
+
+    def test_detect_engine(self):
+        """测试根据文件头识别格式"""
+        self.assertEqual(detect_excel_engine(build_workbook([["a"]])), "openpyxl")
+        self.assertEqual(detect_excel_engine(io.BytesIO(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 8)), "xlrd")
+        with self.assertRaises(ValueError):
+            detect_excel_engine(io.BytesIO(b"not an excel file"))
+
+    def test_read_chunks(self):
+        """测试分块读取：行号与整表读取一致，空行被跳过"""
+        rows = [["序号", " 物料凭证 ", None, "实拨数量"]]
+        rows += [[i + 1, f"V{i}", None, i] for i in range(5)]
+        rows += [[None, None, None, None], [7, "V6", None, 6]]
+
+        with ExcelChunkReader(build_workbook(rows), chunk_size=2) as reader:
+            self.assertEqual(reader.columns, ["序号", "物料凭证", "Unnamed: 2", "实拨数量"])
+            reader.drop_columns(["序号", "Unnamed: 2"])
+            reader.rename_columns({"实拨数量": "数量"})
+            chunks = list(reader)
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 2])
+        self.assertEqual(list(chunks[0].columns), ["物料凭证", "数量"])
+        self.assertEqual(chunks[-1].index.tolist(), [4, 6])
+        self.assertEqual(chunks[-1]["物料凭证"].tolist(), ["V4", "V6"])
+        self.assertEqual(reader.rows_read, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
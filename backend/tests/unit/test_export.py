@@ -0,0 +1,125 @@
+import asyncio
+import csv
+import io
+import unittest
+from datetime import date
+from unittest import mock
+
+from openpyxl import load_workbook
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.api_v1.endpoints.outbounds import EXPORT_COLUMNS, _filter_outbounds
+from app.db.session import Base
+from app.models.outbound import OutboundItem, OutboundOrder, OutboundStatus
+from app.models.user import User
+from app.services.export import ExportFormat, iter_csv, iter_xlsx, stream_export
+from app.services.outbound_import import ImportMode, import_outbound_file
+from tests.unit.test_excel import build_workbook
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+COLUMNS = [(title, column.key) for title, column in EXPORT_COLUMNS]
+
+
+def export_query(db, **filters):
+    """与出库导出接口相同的明细查询"""
+    query = _filter_outbounds(db.query(OutboundOrder), **filters)
+    return query.outerjoin(OutboundItem, OutboundItem.outbound_id == OutboundOrder.id).with_entities(
+        *[column for _, column in EXPORT_COLUMNS]
+    ).order_by(OutboundOrder.id, OutboundItem.id)
+
+
+class TestExport(unittest.TestCase):
+    """列表流式导出测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        user = User(username="exporter", email="exporter@example.com", hashed_password="x", full_name="导出员")
+        self.db.add(user)
+        self.db.flush()
+        self.user_id = user.id
+        for n, department in enumerate(["一车间", "二车间", "一车间"], start=1):
+            order = OutboundOrder(
+                material_voucher=f"V{n}", voucher_date=date(2025, 3, n), department=department,
+                user_unit=department, status=OutboundStatus.PENDING, total_amount=0, operator_id=user.id,
+            )
+            self.db.add(order)
+            self.db.flush()
+            for line in range(n):
+                self.db.add(OutboundItem(
+                    outbound_id=order.id, material_code=f"M{line}", material_description="螺栓 <M8>\x01",
+                    unit="个", actual_quantity=line + 1, requested_quantity=line + 1,
+                    outbound_price=1.5, outbound_amount=1.5 * (line + 1), purchase_order_no="PO-1",
+                ))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def test_xlsx(self):
+        """测试流式 .xlsx：分批产出，openpyxl 可以读取，日期、数字和特殊字符正确"""
+        chunks = list(iter_xlsx(export_query(self.db), COLUMNS, "出库明细", batch_size=2))
+        self.assertGreater(len(chunks), 3)
+
+        workbook = load_workbook(io.BytesIO(b"".join(chunks)))
+        sheet = workbook["出库明细"]
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), [title for title, _ in COLUMNS])
+        self.assertEqual(len(rows), 7)
+        header = {title: i for i, (title, _) in enumerate(COLUMNS)}
+        last = rows[-1]
+        self.assertEqual(last[header["物料凭证"]], "V3")
+        self.assertEqual(last[header["开单日期"]].date(), date(2025, 3, 3))
+        self.assertEqual(last[header["出库金额"]], 4.5)
+        self.assertEqual(last[header["状态"]], "PENDING")
+        self.assertEqual(last[header["物资名称及规格型号"]], "螺栓 <M8>")
+        self.assertIsNone(last[header["备注"]])
+
+    def test_csv_filters(self):
+        """测试 CSV 导出使用列表的过滤条件"""
+        content = b"".join(iter_csv(export_query(self.db, department="一车间"), COLUMNS, batch_size=1))
+        self.assertTrue(content.startswith("\ufeff".encode("utf-8")))
+        rows = list(csv.DictReader(io.StringIO(content.decode("utf-8-sig"))))
+        self.assertEqual([row["物料凭证"] for row in rows], ["V1", "V3", "V3", "V3"])
+        self.assertEqual(rows[0]["开单日期"], "2025-03-01")
+        self.assertEqual(rows[0]["实拨数量"], "1.0")
+
+    def test_stream_response_round_trip(self):
+        """测试导出响应在独立会话中查询，导出的文件可以重新导入"""
+        async def read_body(response):
+            return b"".join([chunk async for chunk in response.body_iterator])
+
+        imported = build_workbook([
+            ["物料凭证", "开单日期", "物料编码", "实拨数量", "出库单价", "具体用料部门", "工程编码"],
+            ["V9", "2025/03/09", "1001", 2, 1.5, "三车间", "P-1"],
+            ["V9", "2025/03/09", "1002", 1, 3, "三车间", None],
+        ])
+        import_outbound_file(self.db, imported, self.user_id)
+        self.db.commit()
+
+        with mock.patch("app.db.session.ReportingSessionLocal", TestingSessionLocal):
+            response = stream_export(
+                lambda db: export_query(db, material_voucher="V9"), COLUMNS, ExportFormat.XLSX, "outbound"
+            )
+            content = asyncio.run(read_body(response))
+        self.assertIn('filename="outbound.xlsx"', response.headers["content-disposition"])
+
+        source = io.BytesIO(content)
+        source.name = "outbound.xlsx"
+        result = import_outbound_file(self.db, source, self.user_id, mode=ImportMode.UPSERT)
+        self.assertEqual(result["successCount"], 2)
+        self.assertEqual(result["itemChanges"], {"inserted": 0, "deleted": 0, "unchanged": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
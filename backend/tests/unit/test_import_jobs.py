@@ -0,0 +1,113 @@
+import json
+import time
+import unittest
+from concurrent.futures import Future
+from types import SimpleNamespace
+from unittest import mock
+
+from app.core.config import settings
+from app.services import import_jobs
+from app.tasks.message_handlers import handle_import_job_message
+
+
+class FakeChannel:
+    """记录确认结果的通道，add_callback_threadsafe 中的回调直接执行"""
+
+    def __init__(self):
+        self.acks = []
+        self.nacks = []
+        self.connection = SimpleNamespace(add_callback_threadsafe=lambda callback: callback())
+
+    def basic_ack(self, delivery_tag):
+        self.acks.append(delivery_tag)
+
+    def basic_nack(self, delivery_tag, requeue=True):
+        self.nacks.append((delivery_tag, requeue))
+
+
+class TestImportJobMessages(unittest.TestCase):
+    """导入任务消息测试"""
+
+    def handle(self, future):
+        channel = FakeChannel()
+        executor = mock.Mock()
+        executor.submit.return_value = future
+        with mock.patch.object(import_jobs, "get_executor", return_value=executor):
+            handle_import_job_message(channel, SimpleNamespace(delivery_tag=7), None, json.dumps({"jobId": "job1"}))
+        executor.submit.assert_called_once_with(import_jobs.run_import_job, "job1")
+        return channel
+
+    def test_ack_after_job_finished(self):
+        """测试消息处理立即返回，任务结束后才确认"""
+        future = Future()
+        channel = self.handle(future)
+        self.assertEqual(channel.acks, [])
+
+        future.set_result({})
+        self.assertEqual(channel.acks, [7])
+
+        failed = Future()
+        channel = self.handle(failed)
+        failed.set_exception(RuntimeError("worker died"))
+        self.assertEqual((channel.acks, channel.nacks), ([], [(7, True)]))
+
+    def test_run_only_pending_job(self):
+        """测试已被其他消费者开始执行的任务直接跳过"""
+        job = {"jobId": "job1", "status": import_jobs.ImportJobStatus.RUNNING.value}
+        with mock.patch.object(import_jobs, "get_import_job", return_value=job), \
+                mock.patch.object(import_jobs, "claim_import_job", return_value=False), \
+                mock.patch.object(import_jobs, "_open_reader_and_create_engine") as open_reader:
+            self.assertEqual(import_jobs.run_import_job("job1"), {})
+        open_reader.assert_not_called()
+
+
+    def test_stale_running_job(self):
+        """测试处理中但心跳超时的任务在查询时标记为失败，心跳正常的任务不受影响"""
+        running = import_jobs.ImportJobStatus.RUNNING.value
+        failed = {"jobId": "job1", "status": import_jobs.ImportJobStatus.FAILED.value}
+        client = mock.Mock()
+        client.eval.return_value = 1
+        stale = time.time() - settings.IMPORT_JOB_HEARTBEAT_TIMEOUT - 1
+        with mock.patch.object(import_jobs, "get_redis", return_value=client), \
+                mock.patch.object(import_jobs, "get_hash_all", side_effect=[
+                    {"jobId": "job1", "status": running, "heartbeatAt": stale}, failed,
+                ]):
+            self.assertEqual(import_jobs.get_import_job("job1"), failed)
+        self.assertEqual(client.eval.call_args[0][0], import_jobs.EXPIRE_JOB_SCRIPT)
+
+        client.eval.reset_mock()
+        job = {"jobId": "job1", "status": running, "heartbeatAt": time.time()}
+        with mock.patch.object(import_jobs, "get_redis", return_value=client), \
+                mock.patch.object(import_jobs, "get_hash_all", return_value=job):
+            self.assertEqual(import_jobs.get_import_job("job1"), job)
+        client.eval.assert_not_called()
+
+    def test_claim_stale_job(self):
+        """测试领取任务时把心跳超时的处理中任务视为可重新领取"""
+        client = mock.Mock()
+        client.eval.return_value = 1
+        with mock.patch.object(import_jobs, "get_redis", return_value=client):
+            self.assertTrue(import_jobs.claim_import_job("job1"))
+        args = client.eval.call_args[0]
+        self.assertEqual(args[0], import_jobs.CLAIM_JOB_SCRIPT)
+        now, stale_before = args[-2:]
+        self.assertAlmostEqual(now - stale_before, settings.IMPORT_JOB_HEARTBEAT_TIMEOUT)
+
+    def test_heartbeat(self):
+        """测试任务执行期间后台线程定期刷新心跳，结束后停止"""
+        with mock.patch.object(settings, "IMPORT_JOB_HEARTBEAT_INTERVAL", 0.01), \
+                mock.patch.object(import_jobs, "set_hash_fields") as set_fields:
+            with import_jobs._job_heartbeat("job1"):
+                deadline = time.monotonic() + 2
+                while not set_fields.called and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            calls = set_fields.call_count
+            time.sleep(0.05)
+        self.assertGreater(calls, 0)
+        self.assertEqual(set_fields.call_count, calls)
+        self.assertEqual(set_fields.call_args[0][0], "import_job:job1")
+        self.assertIn("heartbeatAt", set_fields.call_args[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.outbound import OutboundItem, OutboundOrder, OutboundStatus
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus
+from app.models.user import User
+from app.services.outbound_import import ImportMode, OutboundImportEngine, import_outbound_file
+from app.services.purchase_import import PurchaseImportEngine, import_purchase_file
+from tests.unit.test_excel import build_workbook
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+OUTBOUND_HEADER = ["物料凭证", "物料编码", "实拨数量", "出库单价", "具体用料部门"]
+PURCHASE_HEADER = ["采购订单号", "行项目号", "物资编码", "申请数量", "签约单价"]
+
+
+class TestOutboundImportModes(unittest.TestCase):
+    """出库导入模式测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        user = User(username="importer", email="importer@example.com", hashed_password="x", full_name="导入员")
+        self.db.add(user)
+        self.db.commit()
+        self.user_id = user.id
+
+        result = import_outbound_file(self.db, build_workbook([
+            OUTBOUND_HEADER,
+            ["V1", "1001", 2, 1, "一车间"],
+            ["V1", "1002", 1, 3, "一车间"],
+            ["V2", "1001", 5, 1, "二车间"],
+        ]), self.user_id)
+        self.db.commit()
+        self.assertEqual(result["successCount"], 3)
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def _items(self, voucher):
+        order = self.db.query(OutboundOrder).filter(OutboundOrder.material_voucher == voucher).one()
+        return order, self.db.query(OutboundItem).filter(OutboundItem.outbound_id == order.id).all()
+
+    def test_insert_rejects_existing(self):
+        """测试默认的 insert 模式拒绝已存在的凭证"""
+        result = import_outbound_file(self.db, build_workbook([
+            OUTBOUND_HEADER, ["V1", "1001", 2, 1, "一车间"],
+        ]), self.user_id)
+        self.assertEqual(result["errorDetails"], [{"rowIndex": 2, "errorMessage": "物料凭证 V1 已存在"}])
+        self.assertNotIn("importMode", result)
+
+    def test_upsert_touches_changed_items(self):
+        """测试 upsert 只增删有变化的出库项，未变化的行保留原ID"""
+        order, items = self._items("V1")
+        kept_id = next(item.id for item in items if item.material_code == "1001")
+
+        result = import_outbound_file(self.db, build_workbook([
+            OUTBOUND_HEADER,
+            ["V1", "1001", 2, 1, "三车间"],
+            ["V1", "1003", 4, 1, "三车间"],
+            ["V3", "1001", 1, 1, "一车间"],
+        ]), self.user_id, chunk_size=2, mode=ImportMode.UPSERT)
+        self.db.commit()
+
+        self.assertEqual(result["successCount"], 3)
+        self.assertEqual(result["overwrittenCount"], 1)
+        self.assertEqual(result["itemChanges"], {"inserted": 1, "deleted": 1, "unchanged": 1})
+
+        self.db.expire_all()
+        order, items = self._items("V1")
+        self.assertEqual(order.department, "三车间")
+        self.assertEqual(order.total_amount, 6)
+        self.assertEqual(sorted(item.material_code for item in items), ["1001", "1003"])
+        self.assertIn(kept_id, [item.id for item in items])
+        self.assertEqual(self.db.query(OutboundOrder).count(), 3)
+        self.assertEqual(len(self._items("V2")[1]), 1)
+
+    def test_replace_rewrites_items(self):
+        """测试 replace 删除被覆盖出库单的全部出库项后重新写入"""
+        result = import_outbound_file(self.db, build_workbook([
+            OUTBOUND_HEADER, ["V1", "1001", 2, 1, "一车间"],
+        ]), self.user_id, mode=ImportMode.REPLACE)
+        self.db.commit()
+
+        self.assertEqual(result["itemChanges"], {"inserted": 1, "deleted": 2, "unchanged": 0})
+        self.db.expire_all()
+        order, items = self._items("V1")
+        self.assertEqual([item.material_code for item in items], ["1001"])
+        self.assertEqual(order.total_amount, 2)
+
+    def test_processed_order_is_locked(self):
+        """测试已处理的出库单不能被覆盖"""
+        order, _ = self._items("V2")
+        order.status = OutboundStatus.COMPLETED
+        self.db.commit()
+
+        result = import_outbound_file(self.db, build_workbook([
+            OUTBOUND_HEADER, ["V2", "1001", 9, 1, "二车间"],
+        ]), self.user_id, mode=ImportMode.UPSERT)
+        self.db.commit()
+
+        self.assertEqual(result["successCount"], 0)
+        self.assertEqual(result["errorDetails"], [{"rowIndex": 2, "errorMessage": "物料凭证 V2 已处理，不能覆盖"}])
+        self.db.expire_all()
+        self.assertEqual(self._items("V2")[1][0].actual_quantity, 5)
+
+    def test_order_processed_during_import(self):
+        """测试检查凭证后被其他事务处理的出库单不被覆盖，全部行无效的出库单保留原出库项"""
+        order, _ = self._items("V2")
+        order.status = OutboundStatus.COMPLETED
+        self.db.commit()
+
+        # 检查凭证时出库单仍是待处理
+        pending = {"V1": OutboundStatus.PENDING, "V2": OutboundStatus.PENDING}
+        with mock.patch.object(OutboundImportEngine, "_existing_vouchers", return_value=pending):
+            result = import_outbound_file(self.db, build_workbook([
+                OUTBOUND_HEADER,
+                ["V1", "", 2, 1, "一车间"],
+                ["V2", "1001", 9, 1, "二车间"],
+            ]), self.user_id, mode=ImportMode.UPSERT)
+        self.db.commit()
+
+        self.assertEqual((result["successCount"], result["errorCount"]), (0, 2))
+        errors = [detail for detail in result["errorDetails"] if not detail["errorMessage"].startswith("警告")]
+        self.assertEqual(errors, [
+            {"rowIndex": 2, "errorMessage": "物料编码不能为空"},
+            {"rowIndex": 3, "errorMessage": "物料凭证 V2 已处理，不能覆盖"},
+        ])
+        self.assertEqual(result["itemChanges"], {"inserted": 0, "deleted": 0, "unchanged": 0})
+        self.db.expire_all()
+        self.assertEqual(len(self._items("V1")[1]), 2)
+        self.assertEqual(self._items("V2")[1][0].actual_quantity, 5)
+
+
+class TestPurchaseImportModes(unittest.TestCase):
+    """采购订单导入模式测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        import_purchase_file(self.db, build_workbook([
+            PURCHASE_HEADER,
+            ["PO-1", "10", "M1", 2, 1],
+            ["PO-1", "20", "M2", 1, 5],
+            ["PO-2", "10", "M1", 1, 1],
+        ]))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def test_upsert(self):
+        """测试 upsert 更新订单金额、只增删变化的订单项，并拒绝已处理的订单"""
+        self.db.query(PurchaseOrder).filter(PurchaseOrder.order_no == "PO-2").update(
+            {"status": PurchaseOrderStatus.CONFIRMED}
+        )
+        self.db.commit()
+        order = self.db.query(PurchaseOrder).filter(PurchaseOrder.order_no == "PO-1").one()
+        kept_id = self.db.query(PurchaseOrderItem.id).filter(
+            PurchaseOrderItem.order_id == order.id, PurchaseOrderItem.line_item_number == "10"
+        ).scalar()
+
+        result = import_purchase_file(self.db, build_workbook([
+            PURCHASE_HEADER,
+            ["PO-1", "10", "M1", 2, 1],
+            ["PO-1", "20", "M2", 3, 5],
+            ["PO-2", "10", "M1", 4, 1],
+        ]), mode=ImportMode.UPSERT)
+        self.db.commit()
+
+        self.assertEqual(result["successCount"], 2)
+        self.assertEqual(result["errorDetails"], [{"rowIndex": 4, "errorMessage": "采购订单号 PO-2 已处理，不能覆盖"}])
+        self.assertEqual(result["itemChanges"], {"inserted": 1, "deleted": 1, "unchanged": 1})
+
+        self.db.expire_all()
+        self.assertEqual(order.total_amount, 17)
+        self.assertEqual(order.status, PurchaseOrderStatus.PENDING)
+        items = self.db.query(PurchaseOrderItem).filter(PurchaseOrderItem.order_id == order.id).all()
+        self.assertEqual(sorted(item.requested_quantity for item in items), [2, 3])
+        self.assertIn(kept_id, [item.id for item in items])
+
+    def test_order_processed_during_import(self):
+        """测试检查订单号后被其他事务处理的订单不被覆盖"""
+        self.db.query(PurchaseOrder).filter(PurchaseOrder.order_no == "PO-2").update(
+            {"status": PurchaseOrderStatus.CONFIRMED}
+        )
+        self.db.commit()
+
+        # 检查订单号时订单仍是待处理
+        existing = {"PO-2": (PurchaseOrderStatus.PENDING, None)}
+        with mock.patch.object(PurchaseImportEngine, "_existing_order_nos", return_value=existing):
+            result = import_purchase_file(self.db, build_workbook([
+                PURCHASE_HEADER,
+                ["PO-2", "10", "M1", 4, 1],
+                ["PO-3", "10", "M1", 1, 1],
+            ]), mode=ImportMode.UPSERT)
+        self.db.commit()
+
+        self.assertEqual(result["successCount"], 1)
+        self.assertEqual(result["errorDetails"], [{"rowIndex": 2, "errorMessage": "采购订单号 PO-2 已处理，不能覆盖"}])
+        self.assertEqual(result["overwrittenCount"], 0)
+        order = self.db.query(PurchaseOrder).filter(PurchaseOrder.order_no == "PO-2").one()
+        self.assertEqual(
+            [item.requested_quantity for item in self.db.query(PurchaseOrderItem).filter_by(order_id=order.id)], [1]
+        )
+        self.assertEqual(self.db.query(PurchaseOrder).count(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
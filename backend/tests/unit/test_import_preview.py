@@ -0,0 +1,124 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.import_file import ImportFile
+from app.models.outbound import OutboundItem, OutboundOrder
+from app.models.user import User
+from app.models.warehouse import Inventory
+from app.services.import_jobs import ImportType
+from app.services.import_preview import commit_preview, discard_preview, preview_import
+from tests.unit.test_excel import build_workbook
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestImportPreview(unittest.TestCase):
+    """两阶段导入测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        user = User(username="importer", email="importer@example.com", hashed_password="x", full_name="导入员")
+        self.db.add(user)
+        self.db.add(Inventory(material_code="1001", material_description="螺栓", quantity=10))
+        self.db.commit()
+        self.user_id = user.id
+
+        self.temp_dir = tempfile.mkdtemp()
+        for name, value in (("IMPORT_UPLOAD_DIR", "uploads"), ("IMPORT_PREVIEW_DIR", "previews")):
+            patcher = mock.patch.object(settings, name, os.path.join(self.temp_dir, value))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        # 同一份文件内容（openpyxl 生成的文件带有保存时间）
+        self.content = build_workbook([
+            ["序号", "物料凭证", "物料编码", "实拨数量", "具体用料部门"],
+            [1, "V1", "1001", 5, "生产部"],
+            [2, "V1", "1001", 20, "生产部"],
+            [3, "V2", None, 1, "生产部"],
+        ]).getvalue()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+        shutil.rmtree(self.temp_dir)
+
+    def preview(self, **kwargs):
+        return preview_import(
+            self.db, ImportType.OUTBOUND, io.BytesIO(self.content), "out.xlsx", self.user_id, {}, **kwargs
+        )
+
+    def test_preview_then_commit(self):
+        """测试预览只校验不写入，提交时使用缓存写入并记录导入结果"""
+        preview = self.preview()
+
+        self.assertEqual(preview["totalCount"], 3)
+        self.assertEqual(preview["validCount"], 2)
+        self.assertEqual(preview["errorCount"], 1)
+        self.assertEqual([d["rowIndex"] for d in preview["errorDetails"]], [3, 4])  # 库存提示 + 物料编码为空
+        self.assertEqual(self.db.query(OutboundOrder).count(), 0)
+
+        # 提交时不再读取 Excel
+        with mock.patch("app.services.import_preview.open_import_reader") as open_reader:
+            import_type, result = commit_preview(self.db, preview["token"], self.user_id)
+        self.db.commit()
+        discard_preview(preview["token"])
+
+        open_reader.assert_not_called()
+        self.assertEqual(import_type, ImportType.OUTBOUND)
+        self.assertEqual(result["successCount"], 2)
+        self.assertEqual(result["errorCount"], 1)
+        self.assertEqual(self.db.query(OutboundOrder).count(), 2)
+        self.assertEqual(self.db.query(OutboundItem).count(), 2)
+        self.assertEqual(self.db.query(ImportFile).one().import_id, result["importId"])
+
+        # 缓存已删除；同一文件再次预览直接返回之前的结果
+        with self.assertRaises(HTTPException) as ctx:
+            commit_preview(self.db, preview["token"], self.user_id)
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.assertTrue(self.preview()["duplicate"])
+
+    def test_commit_in_chunks(self):
+        """测试预览按块写入缓存，提交时逐块读出，结果与一次处理相同"""
+        with mock.patch.object(settings, "IMPORT_CHUNK_SIZE", 1):
+            preview = self.preview()
+            self.assertEqual(preview["totalCount"], 3)
+            _, result = commit_preview(self.db, preview["token"], self.user_id)
+        self.db.commit()
+
+        self.assertEqual(result["successCount"], 2)
+        self.assertEqual(result["errorCount"], 1)
+        self.assertEqual(self.db.query(OutboundItem).count(), 2)
+        self.assertEqual(os.listdir(settings.IMPORT_PREVIEW_DIR), [f"{preview['token']}.pkl"])
+
+    def test_invalid_token(self):
+        """测试令牌属于其他用户、已过期或格式错误"""
+        token = self.preview()["token"]
+        for args in ((token, self.user_id + 1), ("../../etc/passwd", self.user_id)):
+            with self.assertRaises(HTTPException):
+                commit_preview(self.db, *args)
+        with mock.patch.object(settings, "IMPORT_PREVIEW_TTL", -1):
+            with self.assertRaises(HTTPException):
+                commit_preview(self.db, token, self.user_id)
+        self.assertEqual(self.db.query(OutboundOrder).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import unittest
+
+import redis
+
+from app.core.loop_monitor import LOOP_BLOCKED, LoopLagMonitor
+from app.core.metrics import REGISTRY, Registry, Counter, Gauge, Histogram
+from app.core.redis import REDIS_ERRORS, REDIS_SECONDS, InstrumentedRedis
+from app.db.session import collect_pool_metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """进程内指标测试"""
+
+    def test_render(self):
+        """测试计数器和直方图的 Prometheus 文本格式"""
+        registry = Registry()
+        requests = registry.register(Counter("requests_total", "请求数", ["method"]))
+        latency = registry.register(Histogram("latency_seconds", "延迟", buckets=(0.1, 1)))
+        self.assertIs(registry.register(Counter("requests_total", "请求数", ["method"])), requests)
+
+        requests.inc(method="GET")
+        requests.inc(2, method="GET")
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(3)
+
+        text = registry.render()
+        self.assertIn('requests_total{method="GET"} 3.0', text)
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("latency_seconds_count 3", text)
+        with self.assertRaises(ValueError):
+            requests.inc(path="/")
+
+    def test_time_and_collector(self):
+        """测试 Histogram.time() 在异常时同样记录，回调在导出前执行，失败的回调不影响导出"""
+        registry = Registry()
+        latency = registry.register(Histogram("job_seconds", "耗时", ["job"]))
+        size = registry.register(Gauge("pool_size", "连接数"))
+        registry.add_collector(lambda: size.set(7))
+        registry.add_collector(lambda: 1 / 0)
+
+        with latency.time(job="a"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with latency.time(job="a"):
+                raise RuntimeError()
+        self.assertEqual(latency.count(job="a"), 2)
+
+        with self.assertLogs("app.core.metrics", level="WARNING"):
+            text = registry.render()
+        self.assertIn("pool_size 7", text)
+
+    def test_pool_and_redis_metrics(self):
+        """测试连接池仪表在抓取时更新，Redis 命令失败时记录耗时和失败次数"""
+        collect_pool_metrics()
+        self.assertIn("db_pool_checked_out", REGISTRY.render())
+
+        client = InstrumentedRedis(host="127.0.0.1", port=1, socket_connect_timeout=0.1)
+        before = REDIS_ERRORS.get(command="get")
+        with self.assertRaises(redis.ConnectionError):
+            client.get("key")
+        self.assertEqual(REDIS_ERRORS.get(command="get"), before + 1)
+        self.assertGreaterEqual(REDIS_SECONDS.count(command="get"), 1)
+        with self.assertRaises(redis.ConnectionError):
+            client.pipeline().get("key").execute()
+        self.assertGreaterEqual(REDIS_ERRORS.get(command="pipeline"), 1)
+
+
+class TestLoopLagMonitor(unittest.TestCase):
+    """事件循环延迟监控测试"""
+
+    def test_detects_blocking_handler(self):
+        """测试阻塞事件循环的协程被记录为阻塞来源"""
+
+        async def blocking_handler():
+            time.sleep(0.3)
+
+        async def main():
+            monitor = LoopLagMonitor(interval=0.05, threshold=0.05)
+            monitor.start()
+            await asyncio.sleep(0.1)
+            await blocking_handler()
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+
+        with self.assertLogs("app.core.loop_monitor", level="WARNING") as logs:
+            asyncio.run(main())
+
+        handlers = [key[0] for key, _ in LOOP_BLOCKED._values.items()]
+        self.assertTrue(any(handler.startswith("blocking_handler") for handler in handlers), handlers)
+        self.assertTrue(any("blocked by blocking_handler" in line for line in logs.output), logs.output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.outbound import OutboundOrder, OutboundItem, OutboundStatus
+from app.models.warehouse import Inventory, InventoryTransaction
+from app.services.outbound_completion import complete_outbound_order
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestCompleteOutbound(unittest.TestCase):
+    """出库完成测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        self.db.add_all([
+            Inventory(material_code="M1", quantity=10, unit_price=2, total_value=20),
+            Inventory(material_code="M2", quantity=5, unit_price=None, total_value=0),
+        ])
+        order = OutboundOrder(
+            material_voucher="V1",
+            voucher_date=date(2025, 1, 1),
+            department="生产部",
+            user_unit="生产部",
+            status=OutboundStatus.PENDING,
+        )
+        self.db.add(order)
+        self.db.flush()
+        self.order_id = order.id
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def add_item(self, material_code, quantity):
+        self.db.add(OutboundItem(outbound_id=self.order_id, material_code=material_code,
+                                 material_description="物料", unit="个", actual_quantity=quantity))
+        self.db.commit()
+
+    def inventory(self, material_code):
+        return self.db.query(Inventory).filter(Inventory.material_code == material_code).one()
+
+    def test_complete(self):
+        """测试同一物料多行合并扣减、总价值重算和库存事务"""
+        self.add_item("M1", 3)
+        self.add_item("M1", 4)
+        self.add_item("M2", 5)
+
+        order = complete_outbound_order(self.db, self.order_id, operator_id=1)
+        self.db.commit()
+
+        self.assertEqual(order.status, OutboundStatus.COMPLETED)
+        self.assertEqual((self.inventory("M1").quantity, self.inventory("M1").total_value), (3, 6))
+        self.assertEqual((self.inventory("M2").quantity, self.inventory("M2").total_value), (0, 0))
+        self.assertEqual(
+            sorted(t.quantity for t in self.db.query(InventoryTransaction)), [3, 4, 5]
+        )
+
+        with self.assertRaises(HTTPException) as ctx:
+            complete_outbound_order(self.db, self.order_id, operator_id=1)
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_insufficient_inventory(self):
+        """测试合并后库存不足时不做任何修改"""
+        self.add_item("M1", 6)
+        self.add_item("M1", 6)
+
+        with self.assertRaises(HTTPException) as ctx:
+            complete_outbound_order(self.db, self.order_id, operator_id=1)
+        self.db.rollback()
+
+        self.assertIn("库存不足", ctx.exception.detail)
+        self.assertEqual(self.inventory("M1").quantity, 10)
+        self.assertEqual(self.db.query(InventoryTransaction).count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from datetime import date
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.outbound import OutboundOrder, OutboundItem, OutboundStatus
+from app.models.user import User
+from app.models.warehouse import Inventory
+from app.services.outbound_import import (
+    IMPORT_ROWS, IMPORT_ROWS_PER_SECOND, OutboundImportEngine, import_outbound_file, normalize_code_column,
+)
+from tests.unit.test_excel import build_workbook
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestOutboundImportEngine(unittest.TestCase):
+    """出库导入引擎测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        user = User(username="importer", email="importer@example.com", hashed_password="x", full_name="导入员")
+        self.db.add(user)
+        self.db.add(Inventory(material_code="1001", material_description="螺栓", quantity=100))
+        self.db.add(OutboundOrder(
+            material_voucher="V-OLD",
+            voucher_date=date(2025, 1, 1),
+            department="生产部",
+            user_unit="生产部",
+            status=OutboundStatus.PENDING,
+        ))
+        self.db.commit()
+        self.user_id = user.id
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def test_normalize_code_column(self):
+        """测试编码列规范化"""
+        series = pd.Series([1001.0, " A-01 ", "1.2e+3", None, "0012"], dtype=object)
+        self.assertEqual(normalize_code_column(series).tolist(), ["1001", "A-01", "1200", "", "0012"])
+
+    def test_import_dataframe(self):
+        """测试整表导入"""
+        df = pd.DataFrame({
+            "物料凭证": [4900001.0, 4900001.0, 4900002.0, "V-OLD", 4900002.0],
+            "开单日期": [45658, 45658, "2025/01/05", "2025-01-01", None],
+            "物料编码": [1001.0, "2002", "1001", "1001", None],
+            "实拨数量": [5, 3, 200, 1, 1],
+            "出库单价": [2.0, 0, 1.5, 1, 1],
+            "出库金额": [None, 9.0, None, None, None],
+            "具体用料部门": ["一车间", "一车间", "二车间", "三车间", "二车间"],
+        })
+
+        engine_ = OutboundImportEngine(self.db, self.user_id, purchase_order_no="PO-1")
+        engine_.process(df)
+        engine_.finish()
+        self.db.commit()
+        result = engine_.result()
+
+        self.assertEqual(result["totalCount"], 5)
+        self.assertEqual(result["successCount"], 3)
+        self.assertEqual(result["errorCount"], 2)
+        messages = [detail["errorMessage"] for detail in result["errorDetails"]]
+        self.assertIn("物料凭证 V-OLD 已存在", messages)
+        self.assertIn("物料编码不能为空", messages)
+        self.assertTrue(any(message.startswith("警告: 物料 2002") for message in messages))
+
+        order = self.db.query(OutboundOrder).filter(OutboundOrder.material_voucher == "4900001").one()
+        self.assertEqual(order.voucher_date, date(2025, 1, 1))
+        self.assertEqual(order.user_unit, "一车间")
+        self.assertEqual(order.total_amount, 19.0)
+
+        items = self.db.query(OutboundItem).filter(OutboundItem.outbound_id == order.id).order_by(OutboundItem.id).all()
+        self.assertEqual([item.material_code for item in items], ["1001", "2002"])
+        self.assertEqual(items[0].outbound_amount, 10.0)
+        self.assertEqual(items[0].unit, "件")
+        self.assertEqual(items[0].purchase_order_no, "PO-1")
+
+    def test_voucher_spanning_chunks(self):
+        """测试跨批次的同一凭证追加到同一出库单"""
+        df = pd.DataFrame({
+            "物料凭证": ["V1", "V1", "V1"],
+            "物料编码": ["1001", "1001", "1001"],
+            "实拨数量": [1, 2, 3],
+            "出库单价": [1, 1, 1],
+            "具体用料部门": ["一车间"] * 3,
+        })
+
+        engine_ = OutboundImportEngine(self.db, self.user_id)
+        engine_.process(df.iloc[:2])
+        engine_.process(df.iloc[2:])
+        engine_.finish()
+        self.db.commit()
+
+        orders = self.db.query(OutboundOrder).filter(OutboundOrder.material_voucher == "V1").all()
+        self.assertEqual(len(orders), 1)
+        self.assertEqual(orders[0].total_amount, 6.0)
+        self.assertEqual(engine_.result()["successCount"], 3)
+
+    def test_import_file_in_chunks(self):
+        """测试分块读取文件导入，错误行号与Excel行号一致"""
+        rows = [["物料凭证", "开单日期", "物料编码", "实拨数量", "出库单价", "具体用料部门"]]
+        rows += [["V2", "2025-02-01", 1001, 1, 2, "一车间"] for _ in range(4)]
+        rows += [["V3", "2025-02-01", None, 1, 2, "一车间"]]
+
+        before = IMPORT_ROWS.get(import_type="outbound", result="success")
+        result = import_outbound_file(self.db, build_workbook(rows), self.user_id, chunk_size=2)
+        self.db.commit()
+
+        self.assertEqual(result["successCount"], 4)
+        self.assertEqual(IMPORT_ROWS.get(import_type="outbound", result="success"), before + 4)
+        self.assertGreater(IMPORT_ROWS_PER_SECOND.get(import_type="outbound"), 0)
+        self.assertEqual(result["errorDetails"], [{"rowIndex": 6, "errorMessage": "物料编码不能为空"}])
+        order = self.db.query(OutboundOrder).filter(OutboundOrder.material_voucher == "V2").one()
+        self.assertEqual(order.total_amount, 8.0)
+        self.assertEqual(order.voucher_date, date(2025, 2, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
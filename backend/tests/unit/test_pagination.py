@@ -0,0 +1,66 @@
+import unittest
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.outbound import OutboundOrder
+from app.utils.pagination import count_total, decode_cursor, encode_cursor, paginate_keyset
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """游标分页测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        # 多条记录使用相同的创建时间，验证 id 作为第二排序键
+        for i in range(7):
+            self.db.add(OutboundOrder(
+                material_voucher=f"V{i}",
+                voucher_date=date(2025, 1, 1),
+                department="生产部",
+                user_unit="生产部",
+                create_time=datetime(2025, 1, 1 + i // 3),
+            ))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def test_cursor_round_trip(self):
+        """测试游标编码和解码"""
+        values = [datetime(2025, 1, 2, 3, 4, 5), 42]
+        self.assertEqual(decode_cursor(encode_cursor(values), 2), values)
+        with self.assertRaises(HTTPException):
+            decode_cursor("not-a-cursor", 2)
+
+    def test_paginate_keyset(self):
+        """测试逐页读取不重复、不遗漏"""
+        query = self.db.query(OutboundOrder)
+        keys = (OutboundOrder.create_time, OutboundOrder.id)
+
+        seen = []
+        cursor = ""
+        while cursor is not None:
+            rows, cursor = paginate_keyset(query, keys, cursor, 2)
+            seen.extend(row.material_voucher for row in rows)
+
+        self.assertEqual(seen, ["V6", "V5", "V4", "V3", "V2", "V1", "V0"])
+        self.assertEqual(count_total(query, exact=False), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
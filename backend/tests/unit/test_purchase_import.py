@@ -0,0 +1,101 @@
+import unittest
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem, PurchaseOrderStatus
+from app.services.purchase_import import import_purchase_file
+from tests.unit.test_excel import build_workbook
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+HEADER = ["序号", "采购订单号", "行项目号", "物资编码", "物资描述", "申请数量", "签约单价", "签约金额", "订单生成日期", "用户单位"]
+
+
+class TestPurchaseImport(unittest.TestCase):
+    """采购订单导入测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        self.db.add(PurchaseOrder(order_no="PO-OLD", status=PurchaseOrderStatus.PENDING, total_amount=0))
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def test_import_across_chunks(self):
+        """测试跨批次的同一订单、已存在订单和空物料编码"""
+        workbook = build_workbook([
+            HEADER,
+            [1, "PO-1", "10", 100200300, "螺栓", 2, 3.5, None, "2025/01/02", "一车间"],
+            [2, "PO-OLD", "10", "M1", "螺母", 1, 1, 1, None, None],
+            [3, "PO-2", "10", None, "垫片", 1, 1, 1, None, None],
+            [4, "PO-1", "20", " M2 ", "螺母", 4, 1, 5, None, None],
+            [5, "PO-2", "20", "M3", "垫片", 3, 2, None, None, None],
+        ])
+
+        result = import_purchase_file(self.db, workbook, chunk_size=2)
+        self.db.commit()
+
+        self.assertEqual(result["totalCount"], 5)
+        self.assertEqual(result["successCount"], 3)
+        self.assertEqual(result["errorDetails"], [
+            {"rowIndex": 3, "errorMessage": "采购订单号 PO-OLD 已存在"},
+            {"rowIndex": 4, "errorMessage": "物料编码不能为空"},
+        ])
+
+        orders = {order.order_no: order for order in self.db.query(PurchaseOrder).all()}
+        self.assertEqual(set(orders), {"PO-OLD", "PO-1", "PO-2"})
+        self.assertEqual(orders["PO-1"].total_amount, 12)
+        self.assertEqual(orders["PO-1"].order_date, date(2025, 1, 2))
+        self.assertEqual(orders["PO-1"].user_unit, "一车间")
+        self.assertEqual(orders["PO-2"].total_amount, 6)
+
+        items = self.db.query(PurchaseOrderItem).filter(
+            PurchaseOrderItem.order_id == orders["PO-1"].id
+        ).order_by(PurchaseOrderItem.line_item_number).all()
+        self.assertEqual([item.material_code for item in items], ["100200300", "M2"])
+        self.assertEqual(items[0].contract_amount, 7)
+        self.assertEqual(items[0].purchase_order_quantity, 2)
+        self.assertIsNotNone(items[0].create_time)
+
+    def test_numeric_order_numbers(self):
+        """测试数字单元格的订单号与已存在的文本订单号视为同一订单"""
+        self.db.add_all([
+            PurchaseOrder(order_no="4500001234", status=PurchaseOrderStatus.PENDING, total_amount=0),
+            PurchaseOrder(order_no="4500001235", status=PurchaseOrderStatus.PENDING, total_amount=0),
+        ])
+        self.db.commit()
+        workbook = build_workbook([
+            HEADER,
+            [1, 4500001234, "10", "M1", "螺栓", 1, 1, None, None, None],
+            [2, "4500001235", "10", "M1", "螺栓", 1, 1, None, None, None],
+            [3, 4500001236.0, "10", "M1", "螺栓", 1, 1, None, None, None],
+        ])
+
+        result = import_purchase_file(self.db, workbook)
+        self.db.commit()
+
+        self.assertEqual(result["errorDetails"], [
+            {"rowIndex": 2, "errorMessage": "采购订单号 4500001234 已存在"},
+            {"rowIndex": 3, "errorMessage": "采购订单号 4500001235 已存在"},
+        ])
+        self.assertEqual(self.db.query(PurchaseOrder).filter(PurchaseOrder.order_no.like("45%")).count(), 3)
+        self.assertEqual(self.db.query(PurchaseOrder.order_no).filter(
+            PurchaseOrder.order_no == "4500001236"
+        ).scalar(), "4500001236")
+
+
+if __name__ == "__main__":
+    unittest.main()
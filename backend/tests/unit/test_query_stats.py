@@ -0,0 +1,92 @@
+import json
+import unittest
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.executor import run_blocking, shutdown_blocking_executor
+from app.core.query_stats import REQUEST_DB_QUERIES, QueryStatsMiddleware, install_query_listeners
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+install_query_listeners(engine)
+
+
+def run_queries(count):
+    with engine.connect() as conn:
+        for i in range(count):
+            conn.execute(text("SELECT :value"), {"value": i})
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/sync/{count}")
+    def sync_endpoint(count: int):
+        run_queries(count)
+        return {}
+
+    @app.get("/blocking")
+    async def blocking_endpoint():
+        await run_blocking(run_queries, 2)
+        return {}
+
+    @app.get("/stream")
+    def stream_endpoint():
+        def generate():
+            run_queries(4)
+            yield b"done"
+        return StreamingResponse(generate())
+
+    return app
+
+
+class TestQueryStats(unittest.TestCase):
+    """请求查询统计测试"""
+
+    def setUp(self):
+        self.client = TestClient(build_app())
+        self.addCleanup(shutdown_blocking_executor)
+
+    def test_server_timing_and_log(self):
+        """测试同步接口的查询次数写入 Server-Timing 响应头、日志和按路由分组的直方图"""
+        before = REQUEST_DB_QUERIES.count(method="GET", route="/sync/{count}")
+        with self.assertLogs("app.core.query_stats", level="INFO") as logs:
+            response = self.client.get("/sync/3")
+
+        self.assertIn('desc="3 queries"', response.headers["server-timing"])
+        record = json.loads(logs.output[-1].split("request ", 1)[1])
+        self.assertEqual(record["route"], "/sync/{count}")
+        self.assertEqual(record["queries"], 3)
+        self.assertEqual(record["slowest_statement"], "SELECT ?")
+        self.assertEqual(REQUEST_DB_QUERIES.count(method="GET", route="/sync/{count}"), before + 1)
+
+    def test_context_propagation(self):
+        """测试 run_blocking 线程池和流式响应生成器中的查询计入当前请求"""
+        response = self.client.get("/blocking")
+        self.assertIn('desc="2 queries"', response.headers["server-timing"])
+
+        # 流式响应的查询发生在响应头之后，只出现在日志中
+        with self.assertLogs("app.core.query_stats", level="INFO") as logs:
+            response = self.client.get("/stream")
+        self.assertEqual(response.content, b"done")
+        self.assertIn('desc="0 queries"', response.headers["server-timing"])
+        self.assertEqual(json.loads(logs.output[-1].split("request ", 1)[1])["queries"], 4)
+
+    def test_unmatched_route(self):
+        """测试未匹配的路径不按原始路径生成指标序列"""
+        with self.assertLogs("app.core.query_stats", level="INFO") as logs:
+            self.client.get("/missing/123")
+        self.assertEqual(json.loads(logs.output[-1].split("request ", 1)[1])["route"], "unmatched")
+
+
+if __name__ == "__main__":
+    unittest.main()
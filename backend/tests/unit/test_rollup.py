@@ -0,0 +1,126 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.purchase_order import PurchaseOrder
+from app.models.rollup import DailyOrderStat, DailyTaskStat, DailyTransactionStat, RollupStaleDay
+from app.models.warehouse import InventoryTransaction, InventoryTransactionType
+from app.models.workflow import WorkflowTask, TaskStatus
+from app.services.dashboard import build_daily_report
+from app.services.rollup import _contiguous_ranges, refresh_daily_rollups, rollup_complete_until
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestDailyRollups(unittest.TestCase):
+    """日汇总测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        self.today = date.today()
+        self.yesterday = self.today - timedelta(days=1)
+        yesterday_noon = datetime.combine(self.yesterday, datetime.min.time()) + timedelta(hours=12)
+        rows = [
+            PurchaseOrder(order_no="P1", order_date=self.yesterday, category="钢材", user_unit="一厂", total_amount=100),
+            PurchaseOrder(order_no="P2", order_date=self.yesterday, category=None, user_unit="一厂", total_amount=50),
+            PurchaseOrder(order_no="P3", order_date=self.today, category="钢材", user_unit="二厂", total_amount=10),
+            InventoryTransaction(inventory_id=1, transaction_type=InventoryTransactionType.INBOUND,
+                                 quantity=5, operator_id=1, transaction_time=yesterday_noon),
+            InventoryTransaction(inventory_id=1, transaction_type=InventoryTransactionType.OUTBOUND,
+                                 quantity=2, operator_id=1, transaction_time=yesterday_noon),
+            WorkflowTask(task_id="T1", workflow_instance_id=1, task_name="质检员确认", status=TaskStatus.COMPLETED,
+                         result="APPROVED", complete_time=yesterday_noon),
+            WorkflowTask(task_id="T2", workflow_instance_id=1, task_name="质检员确认", status=TaskStatus.COMPLETED,
+                         result="REJECTED", complete_time=yesterday_noon),
+        ]
+        # 明细在一小时前写入，之后只有被修改的行落在增量汇总的查找范围内
+        for row in rows:
+            row.update_time = datetime.now() - timedelta(hours=1)
+        self.db.add_all(rows)
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def report_day(self, report, day):
+        return next(item for item in report["days"] if item["date"] == day.strftime("%Y-%m-%d"))
+
+    def test_contiguous_ranges(self):
+        """测试日期合并为连续区间"""
+        days = [date(2025, 3, 3), date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 9)]
+        self.assertEqual(_contiguous_ranges(days), [
+            (date(2025, 3, 1), date(2025, 3, 3)), (date(2025, 3, 9), date(2025, 3, 9))
+        ])
+
+    def test_refresh_and_report(self):
+        """测试全量汇总、报表合并汇总表与当天明细、以及增量汇总"""
+        live_report = build_daily_report(self.db, self.yesterday, self.today)
+        self.assertIsNone(rollup_complete_until(self.db))
+
+        refresh_daily_rollups(self.db)
+        self.assertEqual(rollup_complete_until(self.db), self.yesterday)
+        self.assertEqual(
+            sorted((stat.category, stat.user_unit, stat.order_count, stat.order_amount)
+                   for stat in self.db.query(DailyOrderStat)),
+            [("", "一厂", 1, 50), ("钢材", "一厂", 1, 100), ("钢材", "二厂", 1, 10)],
+        )
+        self.assertEqual(self.db.query(DailyTransactionStat).count(), 2)
+        self.assertEqual(self.db.query(DailyTaskStat).count(), 2)
+
+        report = build_daily_report(self.db, self.yesterday, self.today)
+        self.assertEqual(report, live_report)
+        yesterday = self.report_day(report, self.yesterday)
+        self.assertEqual((yesterday["orderCount"], yesterday["orderAmount"]), (2, 150))
+        self.assertEqual((yesterday["inboundCount"], yesterday["outboundQuantity"]), (1, 2))
+        self.assertEqual((yesterday["inspectionCount"], yesterday["passCount"]), (2, 1))
+        self.assertEqual(self.report_day(report, self.today)["orderCount"], 1)
+
+        # 修改昨天的订单后，增量汇总只重新计算昨天
+        order = self.db.query(PurchaseOrder).filter(PurchaseOrder.order_no == "P1").one()
+        order.total_amount = 300
+        self.db.commit()
+        result = refresh_daily_rollups(self.db)
+        self.assertEqual(result, {"ranges": 1, "days": 1})
+        self.assertEqual(self.report_day(build_daily_report(self.db, self.yesterday, self.today),
+                                         self.yesterday)["orderAmount"], 350)
+
+    def test_moved_and_deleted_rows(self):
+        """测试订单日期被修改、明细被删除后，增量汇总重新计算原来的日期"""
+        refresh_daily_rollups(self.db)
+
+        # 昨天的订单改到今天，删除昨天的一条入库事务和一个质检任务
+        order = self.db.query(PurchaseOrder).filter(PurchaseOrder.order_no == "P1").one()
+        order.order_date = self.today
+        self.db.delete(self.db.query(InventoryTransaction).filter(
+            InventoryTransaction.transaction_type == InventoryTransactionType.INBOUND
+        ).one())
+        self.db.delete(self.db.query(WorkflowTask).filter(WorkflowTask.task_id == "T2").one())
+        self.db.commit()
+        self.assertEqual(sorted(day for (day,) in self.db.query(RollupStaleDay.day)), [self.yesterday])
+
+        result = refresh_daily_rollups(self.db)
+        self.assertEqual(result, {"ranges": 1, "days": 2})
+        self.assertEqual(self.db.query(RollupStaleDay).count(), 0)
+
+        report = build_daily_report(self.db, self.yesterday, self.today)
+        yesterday = self.report_day(report, self.yesterday)
+        self.assertEqual((yesterday["orderCount"], yesterday["orderAmount"]), (1, 50))
+        self.assertEqual((yesterday["inboundCount"], yesterday["inspectionCount"]), (0, 1))
+        today = self.report_day(report, self.today)
+        self.assertEqual((today["orderCount"], today["orderAmount"]), (2, 110))
+
+
+if __name__ == "__main__":
+    unittest.main()
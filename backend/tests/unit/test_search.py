@@ -0,0 +1,56 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.session import Base
+from app.models.warehouse import Inventory
+from app.utils.search import apply_search_filters, escape_like
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestSearchFilters(unittest.TestCase):
+    """模糊搜索条件测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        self.db.add_all([
+            Inventory(material_code="A100", material_description="螺栓 M8", location="一号库"),
+            Inventory(material_code="A1_00", material_description="螺母 50%", location="二号库"),
+            Inventory(material_code="B200", material_description="垫片", location="一号库"),
+        ])
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+
+    def search(self, **filters):
+        query = apply_search_filters(self.db.query(Inventory), [
+            (getattr(Inventory, column), keyword) for column, keyword in filters.items()
+        ])
+        return sorted(inventory.material_code for inventory in query.all())
+
+    def test_escape_like(self):
+        """测试通配符转义"""
+        self.assertEqual(escape_like("5%_\\"), "5\\%\\_\\\\")
+
+    def test_apply_search_filters(self):
+        """测试子串匹配、空关键字跳过以及通配符按字面匹配"""
+        self.assertEqual(self.search(material_code="a1"), ["A100", "A1_00"])
+        self.assertEqual(self.search(material_code="1_0"), ["A1_00"])
+        self.assertEqual(self.search(material_description="50%"), ["A1_00"])
+        self.assertEqual(self.search(material_code=" ", location="一号"), ["A100", "B200"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.db.session import Base
+from app.models.import_file import ImportFile
+from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
+from app.services.outbound_import import ImportMode
+from app.services.purchase_import import import_purchase_file
+from app.services import upload_store
+from app.services.upload_store import import_stored_upload, store_upload
+from tests.unit.test_excel import build_workbook
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class TestUploadStore(unittest.TestCase):
+    """上传文件内容寻址存储测试"""
+
+    def setUp(self):
+        Base.metadata.create_all(bind=engine)
+        self.db = TestingSessionLocal()
+        self.upload_dir = tempfile.mkdtemp()
+        patcher = mock.patch.object(settings, "IMPORT_UPLOAD_DIR", self.upload_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # 同一份文件内容只生成一次（openpyxl 生成的文件带有保存时间，每次生成的字节不同）
+        self.content = build_workbook([
+            ["采购订单号", "行项目号", "物料编码", "申请数量", "签约单价"],
+            ["PO-1", "10", "M1", 2, 3],
+        ]).getvalue()
+
+    def tearDown(self):
+        self.db.close()
+        Base.metadata.drop_all(bind=engine)
+        shutil.rmtree(self.upload_dir)
+
+    def workbook(self):
+        return io.BytesIO(self.content)
+
+    def test_store_upload(self):
+        """测试相同内容只保存一份"""
+        first = store_upload(self.workbook(), "a.XLSX")
+        second = store_upload(self.workbook(), "b.xlsx")
+
+        self.assertEqual(first.sha256, second.sha256)
+        self.assertEqual(first.path, os.path.join(self.upload_dir, first.sha256[:2], f"{first.sha256}.xlsx"))
+        self.assertTrue(os.path.exists(first.path))
+        self.assertEqual(os.path.getsize(first.path), first.size)
+        self.assertEqual([name for name in os.listdir(self.upload_dir) if name.endswith(".part")], [])
+
+    def test_duplicate_upload(self):
+        """测试重复上传直接返回之前的结果，force 时重新导入"""
+        calls = []
+
+        def run_import(path):
+            calls.append(path)
+            return import_purchase_file(self.db, path)
+
+        result = import_stored_upload(self.db, "purchase", self.workbook(), "po.xlsx", run_import, force=False)
+        self.db.commit()
+        self.assertEqual(result["successCount"], 1)
+
+        again = import_stored_upload(self.db, "purchase", self.workbook(), "po-retry.xlsx", run_import)
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(again["duplicate"])
+        self.assertEqual(again["importId"], result["importId"])
+        self.assertEqual(again["successCount"], 1)
+        self.assertEqual(self.db.query(PurchaseOrder).count(), 1)
+
+        # force 时重新导入并覆盖记录
+        self.db.query(PurchaseOrder).delete()
+        forced = import_stored_upload(self.db, "purchase", self.workbook(), "po.xlsx", run_import, force=True)
+        self.db.commit()
+        self.assertEqual(len(calls), 2)
+        self.assertNotIn("duplicate", forced)
+        self.assertEqual(self.db.query(ImportFile).count(), 1)
+        self.assertEqual(self.db.query(ImportFile).one().filename, "po.xlsx")
+
+    def test_reupload_with_options(self):
+        """测试同一文件以 upsert 模式重新上传时覆盖已有订单，以不同选项上传时不视为重复"""
+        import_stored_upload(
+            self.db, "purchase", self.workbook(), "po.xlsx", lambda path: import_purchase_file(self.db, path)
+        )
+        self.db.commit()
+        self.db.query(PurchaseOrderItem).update({"requested_quantity": 9})
+        self.db.commit()
+
+        options = {"importMode": ImportMode.UPSERT.value}
+        upserted = import_stored_upload(
+            self.db, "purchase", self.workbook(), "po.xlsx",
+            lambda path: import_purchase_file(self.db, path, mode=ImportMode.UPSERT), options=options,
+        )
+        self.db.commit()
+        self.assertNotIn("duplicate", upserted)
+        self.assertEqual(self.db.query(PurchaseOrderItem.requested_quantity).scalar(), 2)
+        self.assertEqual(self.db.query(ImportFile).one().import_id, upserted["importId"])
+
+        # 选项不同时单独记录；相同选项再次上传返回之前的结果
+        calls = []
+
+        def run_import(path):
+            calls.append(path)
+            return {"totalCount": 1, "successCount": 1, "errorCount": 0, "errorDetails": [], "importId": "IMP2"}
+
+        options = {"purchaseOrderNo": "PO-9", "importMode": ImportMode.INSERT.value}
+        for _ in range(2):
+            again = import_stored_upload(self.db, "purchase", self.workbook(), "po.xlsx", run_import, options=options)
+            self.db.commit()
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(again["duplicate"])
+        self.assertEqual(again["importId"], "IMP2")
+        self.assertEqual(self.db.query(ImportFile).count(), 2)
+
+    def test_concurrent_upload(self):
+        """测试并发上传的同一文件先提交了导入记录时，回滚本次写入并返回之前的结果"""
+        first = import_stored_upload(
+            self.db, "purchase", self.workbook(), "po.xlsx", lambda path: import_purchase_file(self.db, path)
+        )
+        self.db.commit()
+
+        def run_import(path):
+            self.db.add(PurchaseOrder(order_no="PO-2"))
+            return {"totalCount": 1, "successCount": 1, "errorCount": 0, "errorDetails": [], "importId": "IMP2"}
+
+        # 本次请求检查时另一个请求的导入记录尚未提交
+        find = upload_store.find_import_record
+        calls = []
+
+        def find_after_conflict(*args):
+            calls.append(args)
+            return find(*args) if len(calls) > 2 else None
+
+        with mock.patch.object(upload_store, "find_import_record", side_effect=find_after_conflict):
+            result = import_stored_upload(self.db, "purchase", self.workbook(), "po-retry.xlsx", run_import)
+
+        self.assertEqual(len(calls), 3)
+
+        self.assertTrue(result["duplicate"])
+        self.assertEqual(result["importId"], first["importId"])
+        self.assertEqual([order.order_no for order in self.db.query(PurchaseOrder)], ["PO-1"])
+        self.assertEqual(self.db.query(ImportFile).one().filename, "po.xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()